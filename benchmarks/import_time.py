@@ -0,0 +1,113 @@
+"""
+User Code Import Time Benchmark
+==============================
+
+Compare how long a generated app spends importing its inlined user code
+with and without tree shaking (``generate_fastapi_app_source(treeshake=...)``).
+
+Without tree shaking every top-level statement of the uploaded module runs
+on each reload; with it, only the definitions the endpoints need do, and
+top-level computations wait for the first call.
+
+Measured per module (``mytest.py``, ``examples/*.py`` and a module with a
+precomputed lookup table):
+
+* user_ms: the user code section, as recorded in ``_user_code_stats``
+* exec_ms: executing the whole generated module
+
+Usage:
+    python benchmarks/import_time.py [--repeat 20]
+"""
+
+import sys
+import time
+import types
+import argparse
+from pathlib import Path
+from typing import Dict
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from utils.generator import generate_fastapi_app_source
+from utils.parser import extract_functions_from_source
+
+# A module whose import-time work dwarfs its function definitions
+TABLE_SOURCE = '''
+import json
+
+def _sieve(limit):
+    flags = [True] * (limit + 1)
+    flags[0] = flags[1] = False
+    for i in range(2, int(limit ** 0.5) + 1):
+        if flags[i]:
+            flags[i * i::i] = [False] * len(flags[i * i::i])
+    return [i for i, prime in enumerate(flags) if prime]
+
+PRIMES = _sieve(2_000_000)
+PRIME_SET = set(PRIMES)
+# Not used by any function
+REPORT = json.dumps({"count": len(PRIMES)})
+assert len(PRIMES) == 148933
+
+def is_prime(n: int) -> bool:
+    return n in PRIME_SET
+
+def nth_prime(n: int) -> int:
+    return PRIMES[n]
+'''
+
+
+def load_sources() -> Dict[str, str]:
+    """The modules to measure, keyed by name."""
+    sources = {"mytest.py": (ROOT / "mytest.py").read_text()}
+    for path in sorted((ROOT / "examples").glob("*.py")):
+        if path.name != "__init__.py":
+            sources[f"examples/{path.name}"] = path.read_text()
+    sources["prime_table"] = TABLE_SOURCE
+    return sources
+
+
+def measure(source: str, treeshake: bool, repeat: int) -> Dict[str, float]:
+    """
+    Execute the generated app repeatedly and keep the fastest run.
+
+    Args:
+        source: Module source
+        treeshake: Whether the generator tree-shakes the user code
+        repeat: Executions to take the minimum over
+
+    Returns:
+        Milliseconds for the user code section and the whole module
+    """
+    functions = extract_functions_from_source(source)
+    code, _ = generate_fastapi_app_source(source, functions, treeshake=treeshake)
+    compiled = compile(code, "import_time_benchmark_app", "exec")
+
+    user_ms = exec_ms = float("inf")
+    for _ in range(repeat):
+        module = types.ModuleType("import_time_benchmark_app")
+        started = time.perf_counter()
+        exec(compiled, module.__dict__)
+        exec_ms = min(exec_ms, (time.perf_counter() - started) * 1000)
+        user_ms = min(user_ms, module.get_user_code_stats()["import_ms"])
+        module._shutdown_executors()
+    return {"user_ms": user_ms, "exec_ms": exec_ms}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark user code import time with and without tree shaking")
+    parser.add_argument("--repeat", type=int, default=20, help="Executions per measurement")
+    args = parser.parse_args()
+
+    print(f"{'module':<28}{'user (ms)':>12}{'shaken':>10}{'exec (ms)':>12}{'shaken':>10}")
+    for name, source in load_sources().items():
+        full = measure(source, treeshake=False, repeat=args.repeat)
+        shaken = measure(source, treeshake=True, repeat=args.repeat)
+        print(f"{name:<28}{full['user_ms']:>12.3f}{shaken['user_ms']:>10.3f}"
+              f"{full['exec_ms']:>12.2f}{shaken['exec_ms']:>10.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
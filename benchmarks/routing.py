@@ -0,0 +1,116 @@
+"""
+Route Dispatch Benchmark
+=======================
+
+Measure per-request latency of generated apps as their number of endpoints
+grows, with Starlette's ordered route scan and with the dict-lookup
+dispatcher generated apps install (``SWAGGERMCP_ROUTE_DISPATCH``).
+
+For each size, an app is generated for that many one-line functions and
+``POST /{name}`` of the last function (the worst case for the scan) is
+called through the ASGI interface, so no network or client overhead is
+included. Functions run inline to keep thread hops out of the numbers.
+
+Usage:
+    python benchmarks/routing.py [--sizes 10,100,1000,10000] [--requests 500]
+"""
+
+import sys
+import time
+import types
+import asyncio
+import argparse
+from pathlib import Path
+from typing import Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from utils.generator import generate_fastapi_app_source
+from utils.parser import extract_functions_from_source
+
+
+def build_app(size: int) -> types.ModuleType:
+    """Generate and load an app with ``size`` endpoints (plus their batch variants)."""
+    source = "".join(f"def f{i}(x: int) -> int:\n    return x + {i}\n\n" for i in range(size))
+    functions = extract_functions_from_source(source)
+    code, _ = generate_fastapi_app_source(
+        source, functions,
+        default_execution_mode="inline", memoize=False, vectorize=False, stream=False
+    )
+    module = types.ModuleType(f"routing_benchmark_app_{size}")
+    sys.modules[module.__name__] = module
+    exec(compile(code, module.__name__, "exec"), module.__dict__)
+    return module
+
+
+async def time_requests(app, path: str, requests: int) -> float:
+    """Mean microseconds per request to ``POST path?x=1``."""
+    statuses = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            statuses.append(message["status"])
+
+    def scope():
+        return {
+            "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+            "method": "POST", "scheme": "http", "path": path, "raw_path": path.encode(),
+            "root_path": "", "query_string": b"x=1", "headers": [],
+            "client": ("127.0.0.1", 1), "server": ("testserver", 80)
+        }
+
+    for _ in range(min(100, requests)):
+        await app(scope(), receive, send)
+    started = time.perf_counter()
+    for _ in range(requests):
+        await app(scope(), receive, send)
+    elapsed = time.perf_counter() - started
+    assert set(statuses) == {200}, statuses[-1]
+    return elapsed / requests * 1e6
+
+
+def run(sizes: List[int], requests: int) -> Dict[int, Dict[str, float]]:
+    """
+    Time the last endpoint of each app size with and without the dispatcher.
+
+    Returns:
+        Per size: number of routes and microseconds per request for each strategy
+    """
+    results = {}
+    for size in sizes:
+        module = build_app(size)
+        router = module.app.router
+        dispatcher = router.middleware_stack
+        path = f"/f{size - 1}"
+
+        router.middleware_stack = dispatcher.fallback
+        scan_us = asyncio.run(time_requests(module.app, path, requests))
+        router.middleware_stack = dispatcher
+        dispatch_us = asyncio.run(time_requests(module.app, path, requests))
+
+        results[size] = {"routes": len(router.routes), "scan_us": scan_us, "dispatch_us": dispatch_us}
+        module._shutdown_executors()
+        del sys.modules[module.__name__]
+    return results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark route dispatch of generated apps")
+    parser.add_argument("--sizes", default="10,100,1000,10000", help="Comma-separated endpoint counts")
+    parser.add_argument("--requests", type=int, default=500, help="Requests per measurement")
+    args = parser.parse_args()
+
+    print(f"{'endpoints':>10}{'routes':>8}{'scan (us)':>12}{'dispatch (us)':>15}{'speedup':>10}")
+    sizes = [int(size) for size in args.sizes.split(",")]
+    for size, timing in run(sizes, args.requests).items():
+        speedup = timing["scan_us"] / timing["dispatch_us"]
+        print(f"{size:>10}{timing['routes']:>8}{timing['scan_us']:>12.1f}"
+              f"{timing['dispatch_us']:>15.1f}{speedup:>9.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -8,12 +8,20 @@ for converting Python functions to REST APIs with automatic Swagger documentatio
 
 import os
 import sys
+import time
+import types
+import base64
 import asyncio
+import logging
+import threading
 import subprocess
 from pathlib import Path
-from typing import Dict, List, Optional, Any
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, List, Optional, Any, Tuple, Union
 
-from fastapi import FastAPI, HTTPException, UploadFile, File
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.openapi.utils import get_openapi
 from fastapi.responses import JSONResponse
 from mcp.server.fastmcp import FastMCP
 from mcp.types import TextContent
@@ -22,18 +30,55 @@ from mcp.types import TextContent
 PROJECT_ROOT = Path(__file__).parent.parent
 sys.path.insert(0, str(PROJECT_ROOT))
 
-from utils.parser import extract_functions_from_source
-from utils.generator import generate_fastapi_app_source
+from utils.cache import GenerationCache, NoFunctionsError
+from utils.generator import EXECUTION_MODES, compile_generated_source, generate_function_patch_source
+from utils.artifacts import ArtifactStore, artifact_id_for
+from utils.hotload import HotRouterSwapper, exec_generated_code, unload_module
+from utils.registry import APIRegistry, sanitize_api_name
+from utils.logs import LogBuffer, LogBufferHandler
+from utils.workers import WorkerPool, WorkerPoolFullError
+from utils.uploads import UploadStore, UploadRejectedError, receive_multipart_upload
+from utils.archives import ARCHIVE_SUFFIXES, ArchiveError, archive_suffix, is_archive_name, read_archive_modules
 
 # Configuration
 PORT = int(os.getenv("PORT", "8000"))
 DEBUG = os.getenv("DEBUG", "false").lower() == "true"
+# Mount generated endpoints into this app in-process instead of relying on a restart
+HOT_MOUNT = os.getenv("HOT_MOUNT", "true").lower() == "true"
+# Approximate memory budget for compiled APIs kept loaded by the registry
+REGISTRY_MEMORY_MB = int(os.getenv("REGISTRY_MEMORY_MB", "256"))
+# Number of parse/generate results kept for repeated submissions
+GENERATION_CACHE_SIZE = int(os.getenv("GENERATION_CACHE_SIZE", "64"))
+# Default execution mode of generated endpoints: inline, thread or process
+EXECUTION_MODE = os.getenv("EXECUTION_MODE", "thread")
+# Cache results of functions classified as pure
+MEMOIZE = os.getenv("MEMOIZE", "true").lower() == "true"
+# Load each generated function's code on its first request instead of at startup
+LAZY_FUNCTIONS = os.getenv("LAZY_FUNCTIONS", "false").lower() == "true"
+# Router shards per generated app, compiled in parallel (for very large modules)
+GENERATION_SHARDS = int(os.getenv("GENERATION_SHARDS", "1"))
+# Recent log lines kept in memory for /logs and get_server_logs
+LOG_BUFFER_LINES = int(os.getenv("LOG_BUFFER_LINES", "2000"))
+# Optional file that also receives every log line (size-rotated)
+LOG_FILE = os.getenv("LOG_FILE")
+# Worker threads running the parse -> generate -> deploy pipeline of submissions
+PIPELINE_WORKERS = int(os.getenv("PIPELINE_WORKERS", "2"))
+# Submissions that may wait for a pipeline worker before new ones are refused
+PIPELINE_QUEUE = int(os.getenv("PIPELINE_QUEUE", "16"))
+# Largest accepted upload in bytes
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", str(10 * 1024 * 1024)))
+# Processes parsing and generating the modules of an archive upload in parallel
+ARCHIVE_WORKERS = int(os.getenv("ARCHIVE_WORKERS", str(os.cpu_count() or 2)))
+# Most Python modules, and uncompressed bytes of them, read from one archive
+MAX_ARCHIVE_MODULES = int(os.getenv("MAX_ARCHIVE_MODULES", "500"))
+MAX_ARCHIVE_BYTES = int(os.getenv("MAX_ARCHIVE_BYTES", str(64 * 1024 * 1024)))
 
 # Paths
 BASE_DIR = Path(__file__).parent
 GENERATED_APP_PATH = BASE_DIR / "generated_api.py"
 UPLOADS_DIR = BASE_DIR / "uploads"
-UPLOADS_DIR.mkdir(exist_ok=True)
+REGISTRY_DIR = BASE_DIR / "registry"
+ARTIFACTS_DIR = BASE_DIR / "artifacts"
 
 # FastAPI app
 app = FastAPI(
@@ -47,16 +92,587 @@ app = FastAPI(
 # MCP server
 mcp = FastMCP(name="SwaggerMCP")
 
+# Swaps generated routers into `app` without restarting
+swapper = HotRouterSwapper(app)
+
+# Generated apps with their bytecode and OpenAPI schema, keyed by content hash
+artifact_store = ArtifactStore(ARTIFACTS_DIR)
+
+# Every uploaded API, versioned, under /apis/{name}/v{n}
+registry = APIRegistry(
+    REGISTRY_DIR,
+    memory_budget=REGISTRY_MEMORY_MB * 1024 * 1024,
+    artifact_store=artifact_store
+)
+app.mount("/apis", registry)
+
+# Parse/generate results keyed by (source, generator version, options)
+generation_cache = GenerationCache(max_entries=GENERATION_CACHE_SIZE)
+
+# Server and generated-endpoint log output, tail/follow-able
+server_logs = LogBuffer(max_lines=LOG_BUFFER_LINES, log_file=Path(LOG_FILE) if LOG_FILE else None)
+_log_handler = LogBufferHandler(server_logs, source="server")
+_log_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+
+# Uploaded sources, stored once per distinct content
+upload_store = UploadStore(UPLOADS_DIR, max_bytes=MAX_UPLOAD_BYTES)
+
+# Parsing, generation, compiling and file writes run here, off the event loop
+pipeline_pool = WorkerPool(max_workers=PIPELINE_WORKERS, max_queue=PIPELINE_QUEUE, name="swaggermcp-pipeline")
+
+# Parses and generates archive modules, and compiles the router shards of
+# generated apps, in parallel; started on first use
+_archive_executor: Optional[ProcessPoolExecutor] = None
+_archive_executor_lock = threading.Lock()
+
+# Key and artifact of the generation currently mounted and written to GENERATED_APP_PATH
+_deployed_key: Optional[str] = None
+_deployed_artifact: Optional[str] = None
+# Serializes deployments from concurrent pipeline workers
+_deploy_lock = threading.Lock()
+
+# Schema of the static server routes; generated paths are merged in per generation
+_core_openapi_schema: Optional[Dict[str, Any]] = None
+
+
+def custom_openapi() -> Dict[str, Any]:
+    """Build the OpenAPI schema from the core routes plus the generated app's own schema."""
+    global _core_openapi_schema
+    
+    if app.openapi_schema:
+        return app.openapi_schema
+    
+    if _core_openapi_schema is None:
+        generated_routes = {id(route) for route in swapper.routes}
+        _core_openapi_schema = get_openapi(
+            title=app.title,
+            version=app.version,
+            description=app.description,
+            routes=[route for route in app.routes if id(route) not in generated_routes]
+        )
+    
+    schema = dict(_core_openapi_schema)
+    schema["paths"] = dict(schema.get("paths", {}))
+    components = dict(schema.get("components", {}))
+    components["schemas"] = dict(components.get("schemas", {}))
+    
+    # Generated apps loaded from the artifact store carry a precomputed schema
+    generated_app = getattr(swapper.module, "app", None)
+    if generated_app is not None:
+        generated = generated_app.openapi()
+        for path, item in generated.get("paths", {}).items():
+            # Core routes take precedence in routing, so they do here too
+            schema["paths"].setdefault(path, item)
+        for name, component in generated.get("components", {}).get("schemas", {}).items():
+            components["schemas"].setdefault(name, component)
+    
+    if components["schemas"]:
+        schema["components"] = components
+    
+    app.openapi_schema = schema
+    return schema
+
+app.openapi = custom_openapi
+
 @app.on_event("startup")
 async def startup_event():
     """Initialize the server on startup."""
+    # uvicorn's loggers don't propagate to the root logger, so attach to them
+    # as well; done here because uvicorn configures logging before import
+    for logger_name in ("", "uvicorn", "uvicorn.access"):
+        target = logging.getLogger(logger_name)
+        if _log_handler not in target.handlers:
+            target.addHandler(_log_handler)
+    
+    # Load the last deployed generation straight from the artifact store
+    current_artifact = artifact_store.get_current()
+    if current_artifact:
+        try:
+            _activate_artifact(current_artifact, write_file=False)
+            return
+        except Exception as e:
+            print(f"⚠️ Could not load artifact {current_artifact}: {e}")
+    
     # Ensure generated app exists
     if not GENERATED_APP_PATH.exists():
         GENERATED_APP_PATH.write_text("""
-from fastapi import FastAPI
+from fastapi import APIRouter, FastAPI
 app = FastAPI(title="SwaggerMCP Generated API")
+router = APIRouter()
+app.include_router(router)
 """)
 
+    if HOT_MOUNT:
+        try:
+            _mount_generated(GENERATED_APP_PATH.read_text())
+        except Exception as e:
+            print(f"⚠️ Could not mount generated API: {e}")
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop the pipeline workers."""
+    pipeline_pool.shutdown()
+    if _archive_executor is not None:
+        _archive_executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _execution_options(spec: Optional[str]) -> Dict[str, Any]:
+    """
+    Build generator execution options from a ``name=mode,...`` spec.
+
+    A bare mode (``process``) sets the default for every function.
+
+    Raises:
+        ValueError: If a mode is unknown or an entry is malformed
+    """
+    modes: Dict[str, str] = {}
+    default_mode = EXECUTION_MODE
+    for item in filter(None, (part.strip() for part in (spec or "").split(","))):
+        name, sep, mode = item.partition("=")
+        if not sep:
+            name, mode = "", name
+        mode = mode.strip()
+        if mode not in EXECUTION_MODES:
+            raise ValueError(f"Unknown execution mode {mode!r} (expected one of {', '.join(EXECUTION_MODES)})")
+        if name.strip():
+            modes[name.strip()] = mode
+        else:
+            default_mode = mode
+    return {"execution_modes": modes, "default_execution_mode": default_mode, "memoize": MEMOIZE,
+            "lazy_functions": LAZY_FUNCTIONS, "shards": GENERATION_SHARDS}
+
+
+def _result_cache_stats() -> Optional[Dict[str, Any]]:
+    """Per-endpoint memoization statistics of the mounted generation."""
+    get_stats = getattr(swapper.module, "get_cache_stats", None)
+    return get_stats() if callable(get_stats) else None
+
+
+def _mount_generated(generated_source: str) -> Optional[Dict[str, Any]]:
+    """Hot-mount generated source into the running app if enabled."""
+    if not HOT_MOUNT:
+        return None
+    return swapper.load_source(generated_source, filename=str(GENERATED_APP_PATH))
+
+
+def _deploy_generation(generation: Dict[str, Any], source: Optional[str] = None,
+                       options: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Store, mount and persist a generation unless it is already the live one.
+
+    Mounting happens before writing so a broken generation never replaces
+    a working one on disk. ``reload_ms`` covers compiling, executing and
+    mounting; ``write_ms`` storing the artifact and writing the file.
+    ``user_code`` has the user module's import time and tree-shaking report.
+
+    Given the ``source`` and generator ``options`` it came from, a generation
+    differing from the mounted one only in some functions is patched into
+    it instead (see ``_patch_generation``); ``patched`` then lists them.
+    """
+    with _deploy_lock:
+        if generation["key"] == _deployed_key:
+            return {"reloaded": False, "reload_ms": None, "write_ms": 0.0, "artifact_id": _deployed_artifact,
+                    "user_code": None, "patched": None}
+        
+        plan = _plan_patch(generation) if HOT_MOUNT and source is not None else None
+        if plan is None:
+            return _replace_generation(generation)
+        deploy_info, openapi = _patch_generation(generation, source, options or {}, *plan)
+    
+    # Storing compiles the full generation; other deploys needn't wait for it
+    started_at = time.perf_counter()
+    _store_patched_generation(generation, openapi)
+    deploy_info["write_ms"] = round(deploy_info["write_ms"] + (time.perf_counter() - started_at) * 1000, 3)
+    return deploy_info
+
+
+def _replace_generation(generation: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Compile, store, mount and write a whole generation.
+
+    Called with ``_deploy_lock`` held.
+    """
+    global _deployed_key, _deployed_artifact
+    
+    start_time = time.perf_counter()
+    code = _compile_generation(generation["source"])
+    module = exec_generated_code(code, filename=str(GENERATED_APP_PATH))
+    loaded_at = time.perf_counter()
+    user_code = module.get_user_code_stats() if hasattr(module, "get_user_code_stats") else None
+    
+    try:
+        artifact_id = artifact_store.put(
+            generation["source"],
+            generation["endpoints"],
+            key=generation["key"],
+            code=code,
+            module=module
+        )
+        stored_at = time.perf_counter()
+        mount_info = swapper.swap_module(module, started_at=start_time) if HOT_MOUNT else None
+    except Exception:
+        unload_module(module)
+        raise
+    mounted_at = time.perf_counter()
+    
+    if not HOT_MOUNT:
+        unload_module(module)
+    
+    GENERATED_APP_PATH.write_text(generation["source"])
+    artifact_store.set_current(artifact_id)
+    _deployed_key = generation["key"]
+    _deployed_artifact = artifact_id
+    written_at = time.perf_counter()
+    
+    reload_ms = None
+    if mount_info:
+        reload_ms = round(((loaded_at - start_time) + (mounted_at - stored_at)) * 1000, 3)
+    return {
+        "reloaded": True,
+        "reload_ms": reload_ms,
+        "write_ms": round(((stored_at - loaded_at) + (written_at - mounted_at)) * 1000, 3),
+        "artifact_id": artifact_id,
+        "user_code": user_code,
+        "patched": None
+    }
+
+
+def _plan_patch(generation: Dict[str, Any]) -> Optional[Tuple[List[str], List[str]]]:
+    """
+    Compare a generation's fingerprints with the mounted module's.
+
+    Returns:
+        Tuple of (functions new or changed, functions dropped), or None if
+        the generation must be deployed whole: nothing patchable is mounted,
+        what all endpoints share changed, or every function did
+    """
+    live = swapper.module
+    fingerprints = generation.get("fingerprints")
+    if (not fingerprints or not hasattr(live, "apply_function_patch")
+            or getattr(live, "_app_fingerprint", None) != fingerprints["app"]):
+        return None
+    
+    mounted = live._function_fingerprints
+    changed = [name for name, fingerprint in fingerprints["functions"].items() if mounted.get(name) != fingerprint]
+    removed = [name for name in mounted if name not in fingerprints["functions"]]
+    if len(changed) == len(fingerprints["functions"]):
+        return None
+    return changed, removed
+
+
+def _patch_generation(generation: Dict[str, Any], source: str, options: Dict[str, Any],
+                      changed: List[str], removed: List[str]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """
+    Deploy a generation by redefining only its changed functions in the mounted module.
+
+    Unchanged endpoints keep their routes, warm result caches and worker
+    pools. Only the patch is compiled here; the generation is written to
+    disk, but storing its artifact is left to ``_store_patched_generation``
+    once the lock is released. Called with ``_deploy_lock`` held.
+
+    Returns:
+        Tuple of (deploy info, OpenAPI schema of the patched app)
+    """
+    global _deployed_key, _deployed_artifact
+    
+    start_time = time.perf_counter()
+    mount_info = None
+    if changed or removed:
+        patch_source, _ = generate_function_patch_source(source, generation["functions"], changed, **options)
+        code = compile(patch_source, str(GENERATED_APP_PATH), "exec")
+        mount_info = swapper.patch_module(code, changed + removed, started_at=start_time)
+    patched_at = time.perf_counter()
+    
+    module = swapper.module
+    # The stored schema must match this generation even if another patch
+    # is mounted before the artifact is stored
+    openapi = module.app.openapi()
+    artifact_id = artifact_id_for(generation["source"])
+    GENERATED_APP_PATH.write_text(generation["source"])
+    _deployed_key = generation["key"]
+    _deployed_artifact = artifact_id
+    
+    return {
+        "reloaded": True,
+        "reload_ms": mount_info["reload_ms"] if mount_info else 0.0,
+        "write_ms": round((time.perf_counter() - patched_at) * 1000, 3),
+        "artifact_id": artifact_id,
+        "user_code": module.get_user_code_stats(),
+        "patched": {"changed": changed, "removed": removed}
+    }, openapi
+
+
+def _store_patched_generation(generation: Dict[str, Any], openapi: Dict[str, Any]) -> None:
+    """
+    Compile and store the artifact of a patched generation, without ``_deploy_lock``.
+
+    It becomes the current artifact only if no other generation was
+    deployed in the meantime.
+    """
+    code = _compile_generation(generation["source"])
+    artifact_id = artifact_store.put(
+        generation["source"],
+        generation["endpoints"],
+        key=generation["key"],
+        code=code,
+        openapi=openapi
+    )
+    with _deploy_lock:
+        if _deployed_artifact == artifact_id:
+            artifact_store.set_current(artifact_id)
+
+
+def _compile_generation(source: str) -> Tuple[types.CodeType, ...]:
+    """Compile a generated app, its router shards in parallel if it has several."""
+    global _archive_executor
+    
+    executor = _get_archive_executor() if GENERATION_SHARDS > 1 else None
+    try:
+        return compile_generated_source(source, str(GENERATED_APP_PATH), executor)
+    except BrokenProcessPool:
+        # A worker died; start a fresh pool next time and compile here
+        with _archive_executor_lock:
+            if _archive_executor is executor:
+                _archive_executor = None
+        return compile_generated_source(source, str(GENERATED_APP_PATH))
+
+
+def _activate_artifact(artifact_id: str, write_file: bool = True) -> Dict[str, Any]:
+    """Deploy a stored artifact; only files are read, nothing is compiled."""
+    global _deployed_key, _deployed_artifact
+    
+    with _deploy_lock:
+        start_time = time.perf_counter()
+        meta = artifact_store.get_meta(artifact_id)
+        mount_info = None
+        if HOT_MOUNT:
+            mount_info = swapper.swap_module(artifact_store.load(artifact_id), started_at=start_time)
+        
+        if write_file:
+            GENERATED_APP_PATH.write_text(artifact_store.get_source(artifact_id))
+        artifact_store.set_current(artifact_id)
+        _deployed_key = meta.get("key")
+        _deployed_artifact = artifact_id
+    
+    return {
+        "artifact_id": artifact_id,
+        "endpoints": meta.get("endpoints", []),
+        "reload_ms": mount_info["reload_ms"] if mount_info else None
+    }
+
+
+class _PipelineError(Exception):
+    """A stage of ``_run_pipeline`` failed with ``error``."""
+    
+    def __init__(self, stage: str, error: Exception):
+        super().__init__(str(error))
+        self.stage = stage
+        self.error = error
+
+
+# Status and message of each failing pipeline stage
+_PIPELINE_FAILURES = {
+    "archive": (400, "Invalid archive"),
+    "generate": (500, "Failed to generate API"),
+    "deploy": (500, "Failed to load generated API"),
+    "publish": (500, "Failed to register API")
+}
+
+
+def _run_pipeline(source: str, app_title: str, api_name: str,
+                  execution_options: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Generate, deploy and publish an API for submitted source.
+
+    Blocking; runs on a ``pipeline_pool`` worker so the event loop keeps
+    serving requests and MCP calls meanwhile.
+
+    Args:
+        source: Python source
+        app_title: Title of the generated app
+        api_name: Registry name to publish under
+        execution_options: Generator options from ``_execution_options``
+
+    Returns:
+        Dictionary with the generation, whether it was cached, the deploy
+        and publish results, and ``timings`` (parse_ms, generate_ms,
+        write_ms, reload_ms)
+
+    Raises:
+        _PipelineError: If a stage fails
+    """
+    timings: Dict[str, Any] = {}
+    
+    try:
+        generation, cache_hit = generation_cache.generate(
+            source,
+            app_title=app_title,
+            timings=timings,
+            **execution_options
+        )
+    except Exception as e:
+        raise _PipelineError("generate", e) from e
+    
+    try:
+        deploy_info = _deploy_generation(
+            generation,
+            source,
+            dict(execution_options, app_title=app_title)
+        )
+    except Exception as e:
+        raise _PipelineError("deploy", e) from e
+    write_ms = deploy_info["write_ms"]
+    
+    # Keep this submission addressable after later ones replace the root mount
+    started_at = time.perf_counter()
+    try:
+        published = registry.publish(
+            api_name,
+            generation["source"],
+            generation["endpoints"],
+            key=generation["key"],
+            artifact_id=deploy_info["artifact_id"]
+        )
+    except Exception as e:
+        raise _PipelineError("publish", e) from e
+    write_ms += (time.perf_counter() - started_at) * 1000
+    
+    timings["write_ms"] = round(write_ms, 3)
+    timings["reload_ms"] = deploy_info["reload_ms"]
+    return {
+        "generation": generation,
+        "cache_hit": cache_hit,
+        "deploy": deploy_info,
+        "published": published,
+        "timings": timings
+    }
+
+
+def _get_archive_executor() -> ProcessPoolExecutor:
+    """The process pool for archive modules and app shards, (re)started if needed."""
+    global _archive_executor
+    with _archive_executor_lock:
+        if _archive_executor is None:
+            _archive_executor = ProcessPoolExecutor(max_workers=max(1, ARCHIVE_WORKERS))
+        return _archive_executor
+
+
+def _archive_api_name(base: str, module: str) -> str:
+    """Registry name of an archive module: ``<base>-<dotted-path-with-dashes>``."""
+    return sanitize_api_name(f"{base}-{module.replace('.', '-')}")
+
+
+def _run_archive_pipeline(archive: Union[Path, bytes], archive_name: str, api_base: str,
+                          execution_options: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Generate and publish an API per module of a zip or tar archive.
+
+    Modules are parsed and generated in parallel on the archive process
+    pool (cached ones are reused), then each is published to the registry
+    under its own prefix, ``/apis/<api_base>-<module>/v<n>``. The root
+    mount is left as it is. Blocking; runs on a ``pipeline_pool`` worker.
+
+    Args:
+        archive: Archive content, or the path of a stored upload
+        archive_name: File name of the archive, used in app titles
+        api_base: Registry name prefix of the modules
+        execution_options: Generator options from ``_execution_options``
+
+    Returns:
+        Dictionary with the published ``modules``, the modules ``skipped``
+        for having no functions, per-module ``errors`` and ``timings``
+        (read_ms, generate_ms, publish_ms)
+
+    Raises:
+        _PipelineError: If the archive can't be read or has no modules
+    """
+    global _archive_executor
+    
+    started_at = time.perf_counter()
+    try:
+        data = archive.read_bytes() if isinstance(archive, Path) else archive
+        sources = read_archive_modules(data, max_modules=MAX_ARCHIVE_MODULES, max_total_bytes=MAX_ARCHIVE_BYTES)
+    except (ArchiveError, OSError) as e:
+        raise _PipelineError("archive", e) from e
+    if not sources:
+        raise _PipelineError("archive", ArchiveError("Archive contains no Python modules"))
+    read_at = time.perf_counter()
+    
+    executor = _get_archive_executor() if len(sources) > 1 else None
+    results = generation_cache.generate_many(
+        sources,
+        executor,
+        app_titles={module: f"API from {archive_name}: {module}" for module in sources},
+        **execution_options
+    )
+    generated_at = time.perf_counter()
+    
+    modules, skipped, errors = [], [], {}
+    for module, result in results.items():
+        error = result.get("error")
+        if isinstance(error, BrokenProcessPool):
+            # A worker died; start a fresh pool for the next archive
+            with _archive_executor_lock:
+                if _archive_executor is executor:
+                    _archive_executor = None
+        if isinstance(error, NoFunctionsError):
+            skipped.append(module)
+            continue
+        if error is not None:
+            errors[module] = str(error) or type(error).__name__
+            continue
+        
+        entry = result["entry"]
+        try:
+            published = registry.publish(
+                _archive_api_name(api_base, module),
+                entry["source"],
+                entry["endpoints"],
+                key=entry["key"]
+            )
+        except Exception as e:
+            errors[module] = f"Failed to register API: {e}"
+            continue
+        modules.append({
+            "module": module,
+            "endpoints": entry["endpoints"],
+            "api_name": published["name"],
+            "api_version": published["version"],
+            "api_url": f"http://localhost:{PORT}/apis{published['base_path']}",
+            "cache_hit": result["cache_hit"],
+            "timings": result["timings"]
+        })
+    published_at = time.perf_counter()
+    
+    return {
+        "modules": modules,
+        "skipped": skipped,
+        "errors": errors,
+        "timings": {
+            "read_ms": round((read_at - started_at) * 1000, 3),
+            "generate_ms": round((generated_at - read_at) * 1000, 3),
+            "publish_ms": round((published_at - generated_at) * 1000, 3)
+        }
+    }
+
+
+async def _submit_pipeline(pipeline, *args: Any, **kwargs: Any) -> Dict[str, Any]:
+    """Run a pipeline on a worker, adding queue and total wall time to its timings."""
+    started_at = time.perf_counter()
+    result, queue_ms = await pipeline_pool.run(pipeline, *args, **kwargs)
+    result["timings"]["queue_ms"] = queue_ms
+    result["timings"]["total_ms"] = round((time.perf_counter() - started_at) * 1000, 3)
+    return result
+
+
+def _format_timings(timings: Dict[str, Any]) -> str:
+    """One-line summary of pipeline stage timings."""
+    stages = ("queue", "parse", "generate", "write", "reload")
+    return " · ".join(
+        f"{stage} {timings[f'{stage}_ms']:.1f} ms" for stage in stages
+        if timings.get(f"{stage}_ms") is not None
+    )
+
 # ============================================================================
 # FastAPI Endpoints
 # ============================================================================
@@ -71,49 +687,136 @@ async def root():
         "version": "1.0.0"
     }
 
-@app.post("/upload")
-async def upload_python_file(file: UploadFile = File(...)):
-    """Upload a Python file and convert its functions to API endpoints."""
+# Multipart body of /upload, documented by hand since it is parsed as a stream
+_UPLOAD_OPENAPI = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "multipart/form-data": {
+                "schema": {
+                    "type": "object",
+                    "properties": {"file": {"type": "string", "format": "binary"}},
+                    "required": ["file"]
+                }
+            }
+        }
+    }
+}
+
+@app.post("/upload", openapi_extra=_UPLOAD_OPENAPI)
+async def upload_python_file(request: Request, name: Optional[str] = None,
+                             execution: Optional[str] = None):
+    """
+    Upload a Python file and convert its functions to API endpoints.
+    
+    ``execution`` selects how endpoints run their function, e.g.
+    ``fibonacci=process,add=inline`` (a bare mode sets the default).
     
-    if not file.filename.endswith(".py"):
-        raise HTTPException(status_code=400, detail="Only .py files are accepted")
+    The file is hashed, size-checked, decoded and stored as it streams in;
+    files over ``MAX_UPLOAD_BYTES`` or not UTF-8 are rejected without
+    reading the rest, and identical files are stored once.
+    """
     
-    # Save uploaded file
-    file_path = UPLOADS_DIR / file.filename
-    with file_path.open("wb") as f:
-        content = await file.read()
-        f.write(content)
+    try:
+        execution_options = _execution_options(execution)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
-    # Read and parse source
-    source = content.decode("utf-8")
+    # Allow for the multipart framing around the file
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > MAX_UPLOAD_BYTES + 64 * 1024:
+        raise HTTPException(status_code=413, detail=f"Upload exceeds {MAX_UPLOAD_BYTES} bytes")
     
+    started_at = time.perf_counter()
     try:
-        functions = extract_functions_from_source(source)
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=f"Failed to parse functions: {e}")
+        upload = await receive_multipart_upload(
+            request.stream(),
+            request.headers.get("content-type", ""),
+            upload_store,
+            suffixes=(".py",) + ARCHIVE_SUFFIXES
+        )
+    except UploadRejectedError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+    upload_ms = round((time.perf_counter() - started_at) * 1000, 3)
+    filename = upload["filename"]
     
-    if not functions:
-        raise HTTPException(status_code=400, detail="No top-level functions found")
+    if is_archive_name(filename):
+        return await _upload_archive(upload, name, execution_options, upload_ms)
     
-    # Generate API
+    # Save, parse, generate, mount and publish on a pipeline worker
+    # (generation is cached for identical submissions)
     try:
-        generated_source, endpoints = generate_fastapi_app_source(
-            raw_source=source,
-            functions=functions,
-            app_title=f"API from {file.filename}"
+        outcome = await _submit_pipeline(
+            _run_pipeline,
+            upload["source"],
+            f"API from {filename}",
+            sanitize_api_name(name or Path(filename).stem),
+            execution_options
         )
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to generate API: {e}")
+    except WorkerPoolFullError as e:
+        raise HTTPException(status_code=503, detail=f"Server busy: {e}", headers={"Retry-After": "1"})
+    except _PipelineError as e:
+        if isinstance(e.error, NoFunctionsError):
+            raise HTTPException(status_code=400, detail="No top-level functions found")
+        if e.stage == "generate" and isinstance(e.error, ValueError):
+            raise HTTPException(status_code=400, detail=f"Failed to parse functions: {e}")
+        status_code, message = _PIPELINE_FAILURES[e.stage]
+        raise HTTPException(status_code=status_code, detail=f"{message}: {e}")
     
-    # Write generated file
-    GENERATED_APP_PATH.write_text(generated_source)
+    published = outcome["published"]
+    deploy_info = outcome["deploy"]
+    api_url = f"http://localhost:{PORT}/apis{published['base_path']}"
     
     return JSONResponse({
         "message": "API generated successfully",
         "swagger_url": f"http://localhost:{PORT}/docs",
         "openapi_url": f"http://localhost:{PORT}/openapi.json",
-        "endpoints": endpoints,
-        "file_saved": str(file_path.name)
+        "endpoints": outcome["generation"]["endpoints"],
+        "file_saved": upload["path"].name,
+        "upload_sha256": upload["digest"],
+        "upload_deduplicated": upload["deduplicated"],
+        "api_name": published["name"],
+        "api_version": published["version"],
+        "api_url": api_url,
+        "api_swagger_url": f"{api_url}/docs",
+        "cache_hit": outcome["cache_hit"],
+        "artifact_id": deploy_info["artifact_id"],
+        "reloaded": deploy_info["reloaded"],
+        "reload_ms": deploy_info["reload_ms"],
+        "user_code": deploy_info["user_code"],
+        "patched": deploy_info["patched"],
+        "timings": dict(outcome["timings"], upload_ms=upload_ms)
+    })
+
+async def _upload_archive(upload: Dict[str, Any], name: Optional[str],
+                          execution_options: Dict[str, Any], upload_ms: float) -> JSONResponse:
+    """Generate the APIs of an uploaded archive and describe them per module."""
+    filename = upload["filename"]
+    api_base = sanitize_api_name(name or filename[:-len(archive_suffix(filename))])
+    try:
+        outcome = await _submit_pipeline(_run_archive_pipeline, upload["path"], filename, api_base, execution_options)
+    except WorkerPoolFullError as e:
+        raise HTTPException(status_code=503, detail=f"Server busy: {e}", headers={"Retry-After": "1"})
+    except _PipelineError as e:
+        status_code, message = _PIPELINE_FAILURES[e.stage]
+        raise HTTPException(status_code=status_code, detail=f"{message}: {e}")
+    
+    if not outcome["modules"]:
+        detail = "No top-level functions found in any module"
+        if outcome["errors"]:
+            detail = {"message": "No module could be converted", "errors": outcome["errors"]}
+        raise HTTPException(status_code=400, detail=detail)
+    
+    return JSONResponse({
+        "message": f"APIs generated for {len(outcome['modules'])} modules",
+        "archive": filename,
+        "file_saved": upload["path"].name,
+        "upload_sha256": upload["digest"],
+        "upload_deduplicated": upload["deduplicated"],
+        "modules": outcome["modules"],
+        "skipped": outcome["skipped"],
+        "errors": outcome["errors"],
+        "timings": dict(outcome["timings"], upload_ms=upload_ms)
     })
 
 @app.get("/status")
@@ -123,9 +826,61 @@ async def get_status():
         "server": "running",
         "port": PORT,
         "debug": DEBUG,
-        "docs_url": f"http://localhost:{PORT}/docs"
+        "docs_url": f"http://localhost:{PORT}/docs",
+        "hot_mount": swapper.get_status() if HOT_MOUNT else None,
+        "result_caches": _result_cache_stats(),
+        "registry": registry.get_stats(),
+        "generation_cache": generation_cache.get_stats(),
+        "pipeline": pipeline_pool.get_stats(),
+        "uploads": upload_store.get_stats(),
+        "logs": server_logs.get_stats()
+    }
+
+@app.get("/logs")
+async def get_logs(lines: int = 100, since: Optional[int] = None, timeout: float = 0.0):
+    """
+    Tail the server log, or follow it from a sequence number.
+    
+    Without ``since`` the last ``lines`` lines are returned. With ``since``
+    (the ``next`` value of a previous call) only newer lines are returned,
+    waiting up to ``timeout`` seconds for some to arrive.
+    """
+    if since is None:
+        return {"lines": server_logs.tail(lines), "stats": server_logs.get_stats()}
+    timeout = min(max(timeout, 0.0), 30.0)
+    return await asyncio.to_thread(server_logs.follow, since, timeout, lines)
+
+@app.get("/registry")
+async def list_registered_apis():
+    """List every registered API with its latest and currently loaded versions."""
+    return {
+        "apis": registry.list_apis(),
+        "stats": registry.get_stats()
+    }
+
+@app.get("/artifacts")
+async def list_artifacts():
+    """List stored generations, newest first, and the currently deployed one."""
+    return {
+        "current": _deployed_artifact,
+        "artifacts": artifact_store.history()
     }
 
+@app.post("/rollback/{artifact_id}")
+async def rollback(artifact_id: str):
+    """Redeploy a previously stored generation without recompiling it."""
+    if not artifact_store.exists(artifact_id):
+        raise HTTPException(status_code=404, detail=f"Unknown artifact: {artifact_id}")
+    
+    try:
+        info, _ = await pipeline_pool.run(_activate_artifact, artifact_id)
+    except WorkerPoolFullError as e:
+        raise HTTPException(status_code=503, detail=f"Server busy: {e}", headers={"Retry-After": "1"})
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to load artifact: {e}")
+    
+    return {"message": "Rolled back", **info}
+
 @app.get("/endpoints")
 async def list_endpoints():
     """List all available API endpoints."""
@@ -146,36 +901,64 @@ async def list_endpoints():
 # ============================================================================
 
 @mcp.tool()
-async def convert_python_to_api(source_code: str, group: Optional[str] = None) -> TextContent:
-    """Convert Python code to API endpoints with automatic Swagger documentation."""
+async def convert_python_to_api(source_code: str, group: Optional[str] = None,
+                                execution: Optional[str] = None) -> TextContent:
+    """
+    Convert Python code to API endpoints with automatic Swagger documentation.
+    
+    Args:
+        source_code: Python source with top-level functions
+        group: API name to publish under
+        execution: How endpoints run, e.g. "fibonacci=process,add=inline"
+            (modes: inline, thread, process; a bare mode sets the default)
+    """
     
     try:
-        # Parse functions
-        functions = extract_functions_from_source(source_code)
-        
-        if not functions:
+        # Parse, generate, mount and publish on a pipeline worker
+        # (generation is cached for identical submissions)
+        try:
+            outcome = await _submit_pipeline(
+                _run_pipeline,
+                source_code,
+                f"Generated API{f' - {group}' if group else ''}",
+                sanitize_api_name(group or "default"),
+                _execution_options(execution)
+            )
+        except WorkerPoolFullError as e:
             return TextContent(
                 type="text",
-                text="⚠️ No top-level functions found in the provided code."
+                text=f"⏳ Server busy, try again shortly: {e}"
             )
-        
-        # Generate API
-        generated_source, endpoints = generate_fastapi_app_source(
-            raw_source=source_code,
-            functions=functions,
-            app_title=f"Generated API{f' - {group}' if group else ''}"
-        )
-        
-        # Write generated file
-        GENERATED_APP_PATH.write_text(generated_source)
+        except _PipelineError as e:
+            if isinstance(e.error, NoFunctionsError):
+                return TextContent(
+                    type="text",
+                    text="⚠️ No top-level functions found in the provided code."
+                )
+            raise
+        endpoints = outcome["generation"]["endpoints"]
+        deploy_info = outcome["deploy"]
+        published = outcome["published"]
         
         # Format response
         endpoint_list = ", ".join(endpoints)
+        if not deploy_info["reloaded"]:
+            reload_note = "\n♻️ Unchanged since last generation - nothing reloaded"
+        elif deploy_info["patched"] is not None:
+            patched = deploy_info["patched"]["changed"] + deploy_info["patched"]["removed"]
+            reload_note = (f"\n⚡ Patched {', '.join(patched) or 'nothing'} in {deploy_info['reload_ms']:.1f} ms;"
+                           f" other endpoints kept their caches")
+        elif deploy_info["reload_ms"] is not None:
+            reload_note = f"\n⚡ Hot-mounted in {deploy_info['reload_ms']:.1f} ms"
+        else:
+            reload_note = ""
         response_text = f"""✅ API generated successfully!
 
 🌐 Swagger UI: http://localhost:{PORT}/docs
 📋 OpenAPI Spec: http://localhost:{PORT}/openapi.json
-🔗 Endpoints: {endpoint_list}
+🔗 Endpoints: {endpoint_list}{reload_note}
+⏱️ {_format_timings(outcome["timings"])}
+🗂️ Versioned API: http://localhost:{PORT}/apis{published['base_path']}/docs
 
 💡 Tip: Refresh the Swagger UI to see the latest endpoints."""
         
@@ -192,6 +975,22 @@ async def restart_server(random_string: str) -> TextContent:
     """Restart the API server to ensure all endpoints are loaded."""
     
     try:
+        if HOT_MOUNT and _deployed_artifact:
+            # Re-mount the deployed generation from its stored bytecode
+            info, _ = await pipeline_pool.run(_activate_artifact, _deployed_artifact, write_file=False)
+            return TextContent(
+                type="text",
+                text=f"🔄 Generated API reloaded in {info['reload_ms']:.1f} ms on port {PORT}.\nRefresh the Swagger UI to see updates."
+            )
+        
+        if HOT_MOUNT and GENERATED_APP_PATH.exists():
+            # Re-mount the generated app from disk without dropping the process
+            mount_info, _ = await pipeline_pool.run(lambda: _mount_generated(GENERATED_APP_PATH.read_text()))
+            return TextContent(
+                type="text",
+                text=f"🔄 Generated API reloaded in {mount_info['reload_ms']:.1f} ms on port {PORT}.\nRefresh the Swagger UI to see updates."
+            )
+        
         # For Smithery, we'll just return success since the server restarts automatically
         return TextContent(
             type="text",
@@ -203,6 +1002,91 @@ async def restart_server(random_string: str) -> TextContent:
             text=f"❌ Error restarting server: {str(e)}"
         )
 
+@mcp.tool()
+async def rollback_api(artifact_id: str) -> TextContent:
+    """Roll the generated API back to a previously stored generation."""
+    
+    if not artifact_store.exists(artifact_id):
+        history = artifact_store.history()[:10]
+        listing = "\n".join(
+            f"• {meta['id']} ({', '.join(meta.get('endpoints', []))})" for meta in history
+        ) or "(no stored generations)"
+        return TextContent(
+            type="text",
+            text=f"❌ Unknown artifact: {artifact_id}\n\n📦 Recent generations:\n{listing}"
+        )
+    
+    try:
+        info, _ = await pipeline_pool.run(_activate_artifact, artifact_id)
+        reload_note = f" in {info['reload_ms']:.1f} ms" if info["reload_ms"] is not None else ""
+        return TextContent(
+            type="text",
+            text=f"⏪ Rolled back to {artifact_id[:12]}{reload_note}.\n🔗 Endpoints: {', '.join(info['endpoints'])}"
+        )
+    except Exception as e:
+        return TextContent(
+            type="text",
+            text=f"❌ Error rolling back: {str(e)}"
+        )
+
+@mcp.tool()
+async def convert_archive_to_api(archive_path: Optional[str] = None, archive_base64: Optional[str] = None,
+                                 group: Optional[str] = None, execution: Optional[str] = None) -> TextContent:
+    """
+    Convert every module of a zip or tar archive to API endpoints.
+    
+    Each module with top-level functions is published under its own
+    prefix, /apis/<group>-<module>/v<n>.
+    
+    Args:
+        archive_path: Path of a .zip/.tar(.gz) archive on the server
+        archive_base64: Base64-encoded archive content (instead of a path)
+        group: API name prefix for the modules
+        execution: How endpoints run, e.g. "fibonacci=process,add=inline"
+            (modes: inline, thread, process; a bare mode sets the default)
+    """
+    
+    try:
+        if archive_path:
+            path = Path(archive_path).expanduser()
+            if path.stat().st_size > MAX_UPLOAD_BYTES:
+                return TextContent(type="text", text=f"❌ Archive exceeds {MAX_UPLOAD_BYTES} bytes")
+            archive, archive_name = path, path.name
+        elif archive_base64:
+            archive, archive_name = base64.b64decode(archive_base64, validate=True), "archive"
+            if len(archive) > MAX_UPLOAD_BYTES:
+                return TextContent(type="text", text=f"❌ Archive exceeds {MAX_UPLOAD_BYTES} bytes")
+        else:
+            return TextContent(type="text", text="❌ Provide archive_path or archive_base64")
+        
+        api_base = sanitize_api_name(group or archive_name[:-len(archive_suffix(archive_name))] or archive_name)
+        try:
+            outcome = await _submit_pipeline(
+                _run_archive_pipeline,
+                archive,
+                archive_name,
+                api_base,
+                _execution_options(execution)
+            )
+        except WorkerPoolFullError as e:
+            return TextContent(type="text", text=f"⏳ Server busy, try again shortly: {e}")
+        
+        lines = [f"✅ {len(outcome['modules'])} modules converted in {outcome['timings']['total_ms']:.1f} ms", ""]
+        for module in outcome["modules"]:
+            lines.append(f"📦 {module['module']}: {module['api_url']}/docs")
+            lines.append(f"   🔗 {', '.join(module['endpoints'])}")
+        if outcome["skipped"]:
+            lines.append(f"\n⏭️ No functions: {', '.join(outcome['skipped'])}")
+        for module, error in outcome["errors"].items():
+            lines.append(f"⚠️ {module}: {error}")
+        return TextContent(type="text", text="\n".join(lines))
+        
+    except Exception as e:
+        return TextContent(
+            type="text",
+            text=f"❌ Error converting archive: {str(e)}"
+        )
+
 @mcp.tool()
 async def test_endpoints(random_string: str) -> TextContent:
     """Test all available endpoints and report their status."""
@@ -304,6 +1188,34 @@ async def get_server_status() -> TextContent:
     
     return TextContent(type="text", text=status_text)
 
+@mcp.tool()
+async def get_server_logs(lines: int = 50, since: Optional[int] = None, timeout: float = 0.0) -> TextContent:
+    """
+    Read the server log.
+    
+    Args:
+        lines: Number of recent lines to return (or maximum when following)
+        since: Sequence number to follow from; pass the `next` value of the
+            previous call to get only newer lines
+        timeout: Seconds to wait for new lines when following
+    """
+    if since is None:
+        entries = server_logs.tail(lines)
+        next_seq = entries[-1]["seq"] + 1 if entries else 0
+        skipped = 0
+    else:
+        result = await asyncio.to_thread(server_logs.follow, since, min(max(timeout, 0.0), 30.0), lines)
+        entries, next_seq, skipped = result["lines"], result["next"], result["skipped"]
+    
+    if not entries:
+        return TextContent(type="text", text=f"📭 No new log lines (next: {next_seq})")
+    
+    text = f"📜 Server log ({len(entries)} lines, next: {next_seq}):\n"
+    if skipped:
+        text += f"⚠️ {skipped} older lines were dropped from the buffer\n"
+    text += "\n".join(entry["line"] for entry in entries)
+    return TextContent(type="text", text=text)
+
 # ============================================================================
 # Main Entry Point
 # ============================================================================
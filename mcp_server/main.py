@@ -19,10 +19,11 @@ Response:
     }
 """
 import os
-import shutil
+import codecs
+import hashlib
 import tempfile
 from pathlib import Path
-from typing import List
+from typing import List, Tuple
 
 from fastapi import FastAPI, UploadFile, File, HTTPException
 from fastapi.responses import JSONResponse
@@ -35,9 +36,12 @@ BASE_DIR = Path(__file__).parent.resolve()
 GENERATED_APP_PATH = BASE_DIR / "generated_fastapi_app.py"
 UPLOADS_DIR = BASE_DIR / "uploads"
 UPLOADS_DIR.mkdir(exist_ok=True)
+# Largest accepted upload in bytes
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", str(10 * 1024 * 1024)))
+UPLOAD_CHUNK_SIZE = 64 * 1024
 
-# Runner instance (global, single)
-runner = APIServerRunner(app_module_path=GENERATED_APP_PATH, port=8001)
+# Runner instance (global, single); blue/green keeps port 8001 up across restarts
+runner = APIServerRunner(app_module_path=GENERATED_APP_PATH, port=8001, blue_green=True)
 
 app = FastAPI(
     title="MCP Conversion Orchestrator",
@@ -58,18 +62,50 @@ async def shutdown():
     runner.stop()
 
 
+async def _store_upload(file: UploadFile) -> Tuple[Path, str]:
+    """
+    Hash, size-check, decode and save an upload in a single pass.
+
+    Uploads are saved as ``uploads/<sha256>.py``, so identical files are
+    stored once. Returns the saved path and the decoded source.
+    """
+    digest = hashlib.sha256()
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    text = []
+    size = 0
+    fd, tmp_name = tempfile.mkstemp(suffix=".part", dir=UPLOADS_DIR)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                size += len(chunk)
+                if size > MAX_UPLOAD_BYTES:
+                    raise HTTPException(status_code=413, detail=f"Upload exceeds {MAX_UPLOAD_BYTES} bytes.")
+                text.append(decoder.decode(chunk))
+                digest.update(chunk)
+                f.write(chunk)
+            text.append(decoder.decode(b"", final=True))
+    except UnicodeDecodeError:
+        os.unlink(tmp_name)
+        raise HTTPException(status_code=400, detail="Upload is not UTF-8 text.")
+    except BaseException:
+        os.unlink(tmp_name)
+        raise
+
+    path = UPLOADS_DIR / f"{digest.hexdigest()}.py"
+    if path.exists():
+        os.unlink(tmp_name)
+    else:
+        os.replace(tmp_name, path)
+    return path, "".join(text)
+
+
 @app.post("/upload")
 async def upload_python_file(file: UploadFile = File(...)):
     if not file.filename.endswith(".py"):
         raise HTTPException(status_code=400, detail="Only .py files are accepted.")
 
-    # Save uploaded file
-    temp_path = UPLOADS_DIR / file.filename
-    with temp_path.open("wb") as f:
-        shutil.copyfileobj(file.file, f)
-
-    # Read source
-    source = temp_path.read_text()
+    # Save and read the upload in one pass
+    temp_path, source = await _store_upload(file)
 
     # Parse functions
     try:
@@ -100,6 +100,10 @@ class MCPServer:
                                     "params": {
                                         "type": "object",
                                         "description": "Query parameters for the endpoint"
+                                    },
+                                    "body": {
+                                        "type": "object",
+                                        "description": "JSON body fields (list/dict parameters)"
                                     }
                                 },
                                 "required": ["endpoint", "params"]
@@ -270,9 +274,14 @@ class MCPServer:
         """Call a generated API endpoint."""
         endpoint = arguments.get("endpoint", "")
         params = arguments.get("params", {})
+        body = arguments.get("body")
         
         url = f"{self.api_base_url}{endpoint}"
-        response = requests.get(url, params=params)
+        # Endpoints taking collections are POST with a JSON body
+        if body is not None:
+            response = requests.post(url, params=params, json=body)
+        else:
+            response = requests.get(url, params=params)
         
         if response.status_code == 200:
             return response.json()
@@ -111,7 +111,10 @@ async def convert_python_to_api(source_code: str) -> TextContent:  # noqa: D401
     if not fns:
         return TextContent(type="text", text="⚠️ No top‑level functions found.")
 
-    APP_PATH.write_text(_build_app_source(fns), encoding="utf‑8")
+    # Unchanged output isn't rewritten, so `--reload` doesn't restart the server for nothing
+    app_source = _build_app_source(fns)
+    if not APP_PATH.exists() or APP_PATH.read_text(encoding="utf‑8") != app_source:
+        APP_PATH.write_text(app_source, encoding="utf‑8")
     _ensure_server_running()  # first call launches server; later writes trigger reload
 
     endpoints = ", ".join(f"/{fn.name}" for fn in fns)
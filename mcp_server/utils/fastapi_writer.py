@@ -1,8 +1,11 @@
 """
 Generate FastAPI source code that:
 - Imports the user source (inlined for MVP)
-- Re-exports a FastAPI app with one GET endpoint per function
-- Performs basic type coercion of query params
+- Re-exports a FastAPI app with one endpoint per function: GET with query
+  params, or POST when it takes collections, which go in a JSON body
+- Resolves each parameter's type once, at generation time: annotated
+  scalars are validated by FastAPI, structured types are parsed from JSON
+  and only unannotated params fall back to runtime coercion
 """
 
 from __future__ import annotations
@@ -16,13 +19,32 @@ IMPORT_NOTE = """# === AUTO-GENERATED FILE ===
 #
 # Regeneration Strategy:
 # - Each upload replaces entire file.
-# - Endpoints use query parameters (strings) and attempt runtime type coercion.
+# - Endpoints use typed query parameters; unannotated ones attempt runtime type coercion.
+# - List/dict/tuple parameters are fields of a JSON body (POST).
 #
 # Security Note:
 #   Executing uploaded code is dangerous. Use sandboxing in production.
 """
 
+# Annotation name -> (FastAPI query type, converter applied after validation);
+# a None type means the parameter is a field of the JSON body
+PARAM_PLANS = {
+    "int": ("int", None),
+    "float": ("float", None),
+    "bool": ("bool", None),
+    "str": ("str", None),
+    "list": (None, None),
+    "List": (None, None),
+    "dict": (None, None),
+    "Dict": (None, None),
+    "tuple": (None, None),
+    "Tuple": (None, None),
+}
+UNTYPED_PLAN = ("str", "_coerce_param")
+
 TYPE_COERCE_FN = r"""
+import json
+
 def _coerce_param(value: str):
     # Try int
     try:
@@ -40,7 +62,6 @@ def _coerce_param(value: str):
         return low == "true"
     # Try JSON literal
     try:
-        import json
         return json.loads(value)
     except Exception:
         pass
@@ -48,6 +69,18 @@ def _coerce_param(value: str):
     return value
 """
 
+def _param_plan(type_hint: str | None) -> Tuple[str, str | None]:
+    """Pick the FastAPI type and converter for a parameter annotation."""
+    if not type_hint:
+        return UNTYPED_PLAN
+    hint = type_hint.strip()
+    if hint.startswith("Optional[") and hint.endswith("]"):
+        hint = hint[len("Optional["):-1]
+    elif hint.endswith("| None"):
+        hint = hint[:-len("| None")].strip()
+    hint = hint.split("[", 1)[0].split(".")[-1]
+    return PARAM_PLANS.get(hint, UNTYPED_PLAN)
+
 def generate_fastapi_app_source(
     raw_source: str,
     functions: List[Dict[str, Any]],
@@ -68,27 +101,36 @@ def generate_fastapi_app_source(
         endpoint_path = f"/{fname}"
         endpoint_paths.append(endpoint_path)
 
-        # Build param signature for FastAPI function: required and optional
+        type_hints = fmeta.get("type_hints", {})
+        plans = {a: _param_plan(type_hints.get(a)) for a in args}
+
+        # Build param signature for FastAPI function: required and optional.
+        # Body fields keep the user's annotation (its names are in scope, the
+        # user source is inlined above the endpoints)
         param_sig_parts = []
         for a in args:
+            ptype = plans[a][0] or f"Annotated[{type_hints[a]}, Body(embed=True)]"
             if a in defaults:
-                param_sig_parts.append(f"{a}: str = None")
+                param_sig_parts.append(f"{a}: {ptype} = None")
             else:
-                param_sig_parts.append(f"{a}: str")
+                param_sig_parts.append(f"{a}: {ptype}")
         param_sig = ", ".join(param_sig_parts)
+        method = "post" if any(plans[a][0] is None for a in args) else "get"
 
-        # Build conversion + call body
-        # We'll build arglist expression: coerce each, pass None if not provided
+        # Build conversion + call body: one direct converter call per
+        # argument that still needs one, defaults when not provided
         coerced_args_expr_parts = []
         for a in args:
+            converter = plans[a][1]
+            value = f"{converter}({a})" if converter else a
             if a in defaults:
-                coerced_args_expr_parts.append(f"_coerce_param({a}) if {a} is not None else None")
+                coerced_args_expr_parts.append(f"{value} if {a} is not None else {defaults[a]}")
             else:
-                coerced_args_expr_parts.append(f"_coerce_param({a})")
+                coerced_args_expr_parts.append(value)
         coerced_args_expr = ", ".join(coerced_args_expr_parts)
 
         endpoint_block = f"""
-@app.get("{endpoint_path}", summary="{fname}", description={repr(doc)})
+@app.{method}("{endpoint_path}", summary="{fname}", description={repr(doc)})
 def {fname}_endpoint({param_sig}):
     try:
         result = {fname}({coerced_args_expr})
@@ -101,7 +143,9 @@ def {fname}_endpoint({param_sig}):
     # Build final code
     code = f"""{IMPORT_NOTE}
 
-from fastapi import FastAPI
+from typing import Annotated
+
+from fastapi import Body, FastAPI
 
 app = FastAPI(title={repr(app_title)})
 
@@ -4,21 +4,40 @@ Utility to start/stop/restart a uvicorn subprocess for the generated FastAPI app
 Strategy:
 - We shell out to `uvicorn generated_fastapi_app:app --port <port>`
 - When regenerating, we terminate old proc and start a new one.
+- With `blue_green=True` we instead keep the listening socket open in this
+  process and hand it to every generation (via `serve.py`). A restart starts
+  the new generation next to the old one serving only a private port,
+  health-checks it there, tells it over a go pipe to accept on the shared
+  socket, and only then drains and stops the old one - the port never
+  closes, and a generation failing its check never sees public traffic.
+  Generations report readiness over an inherited pipe instead of being polled.
 """
 
 import subprocess
 import sys
 import os
+import select
 import signal
+import socket
+import threading
 import time
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Tuple
+
+from .serve import GO_MESSAGE
+
+SERVE_SCRIPT = Path(__file__).with_name("serve.py")
 
 class APIServerRunner:
-    def __init__(self, app_module_path: Path, port: int = 8001):
+    def __init__(self, app_module_path: Path, port: int = 8001,
+                 blue_green: bool = False, drain_timeout: int = 30):
         self.app_module_path = Path(app_module_path)
         self.port = port
+        # Inheriting sockets needs fork/exec semantics
+        self.blue_green = blue_green and os.name != "nt"
+        self.drain_timeout = drain_timeout
         self._proc: Optional[subprocess.Popen] = None
+        self._listen_sock: Optional[socket.socket] = None
 
     def is_running(self) -> bool:
         return self._proc is not None and self._proc.poll() is None
@@ -26,24 +45,133 @@ class APIServerRunner:
     def start(self):
         if self.is_running():
             return
-        self._proc = self._spawn()
+        if self.blue_green:
+            proc, _, ready_fd, _ = self._spawn_generation(probe=False)
+            if not self._wait_ready(ready_fd):
+                self._terminate(proc, timeout=2)
+                raise RuntimeError("API server failed to start")
+            self._proc = proc
+        else:
+            self._proc = self._spawn()
 
     def stop(self):
-        if not self.is_running():
-            return
-        self._proc.terminate()
-        try:
-            self._proc.wait(timeout=5)
-        except subprocess.TimeoutExpired:
-            self._proc.kill()
+        if self.is_running():
+            self._terminate(self._proc, timeout=5)
         self._proc = None
+        if self._listen_sock is not None:
+            self._listen_sock.close()
+            self._listen_sock = None
 
     def restart(self):
+        if self.blue_green and self.is_running():
+            self._blue_green_restart()
+            return
         self.stop()
         # Slight delay to release port
         time.sleep(0.5)
         self.start()
 
+    def _blue_green_restart(self, timeout: float = 10.0):
+        old_proc = self._proc
+        new_proc, probe_port, ready_fd, go_fd = self._spawn_generation()
+        try:
+            healthy = (self._wait_ready(ready_fd, timeout, close=False)
+                       and self._probe(probe_port)
+                       and self._go_live(ready_fd, go_fd, timeout))
+        finally:
+            # EOF on the go pipe keeps a rejected generation off the shared socket
+            os.close(go_fd)
+            os.close(ready_fd)
+        if not healthy:
+            # New generation is broken; keep serving the old one
+            self._terminate(new_proc, timeout=2)
+            return
+        self._proc = new_proc
+        # Drain the old generation in the background
+        threading.Thread(
+            target=self._terminate, args=(old_proc, self.drain_timeout + 1), daemon=True
+        ).start()
+
+    @staticmethod
+    def _terminate(proc: subprocess.Popen, timeout: float):
+        proc.terminate()
+        try:
+            proc.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+
+    @staticmethod
+    def _wait_ready(ready_fd: int, timeout: float = 10.0, close: bool = True) -> bool:
+        # Blocks until the child writes to the pipe; EOF means it died first
+        try:
+            readable, _, _ = select.select([ready_fd], [], [], timeout)
+            return bool(readable) and bool(os.read(ready_fd, 64))
+        finally:
+            if close:
+                os.close(ready_fd)
+
+    @classmethod
+    def _go_live(cls, ready_fd: int, go_fd: int, timeout: float) -> bool:
+        # The child answers GO with a second message once it accepts on the shared socket
+        try:
+            os.write(go_fd, GO_MESSAGE)
+        except OSError:
+            return False
+        return cls._wait_ready(ready_fd, timeout, close=False)
+
+    @staticmethod
+    def _probe(probe_port: int) -> bool:
+        import requests
+
+        try:
+            return requests.get(f"http://127.0.0.1:{probe_port}/openapi.json", timeout=2).status_code == 200
+        except requests.RequestException:
+            return False
+
+    def _spawn_generation(self, probe: bool = True) -> Tuple[subprocess.Popen, Optional[int], int, Optional[int]]:
+        """
+        Launch a generation on the shared public socket, or with `probe` on a
+        private probe socket only, holding the shared one back until `_go_live`.
+
+        Returns (process, probe port, readiness pipe read end, go pipe write end).
+        """
+        if self._listen_sock is None:
+            self._listen_sock = _listen("0.0.0.0", self.port)
+        probe_sock = _listen("127.0.0.1", 0) if probe else None
+        ready_read, ready_write = os.pipe()
+        go_read, go_write = os.pipe() if probe else (None, None)
+        try:
+            cmd = [sys.executable, str(SERVE_SCRIPT), f"{self.app_module_path.stem}:app",
+                   "--timeout-graceful-shutdown", str(self.drain_timeout),
+                   "--ready-fd", str(ready_write)]
+            shared = self._listen_sock.fileno()
+            probe_port = None
+            if probe_sock is not None:
+                probe_port = probe_sock.getsockname()[1]
+                fds = [probe_sock.fileno(), shared, go_read]
+                cmd += ["--fd", str(probe_sock.fileno()), "--standby-fd", str(shared),
+                        "--go-fd", str(go_read)]
+            else:
+                fds = [shared]
+                cmd += ["--fd", str(shared)]
+            cwd = str(self.app_module_path.parent)
+            env = os.environ.copy()
+            env["PYTHONPATH"] = cwd + os.pathsep + env.get("PYTHONPATH", "")
+            proc = subprocess.Popen(cmd, env=env, cwd=cwd, pass_fds=fds + [ready_write])
+        except BaseException:
+            os.close(ready_read)
+            if go_write is not None:
+                os.close(go_write)
+            raise
+        finally:
+            # The child has its own copies; ours would mask the EOF of a dead child
+            os.close(ready_write)
+            if go_read is not None:
+                os.close(go_read)
+            if probe_sock is not None:
+                probe_sock.close()
+        return proc, probe_port, ready_read, go_write
+
     def _spawn(self) -> subprocess.Popen:
         """
         Launch uvicorn in a subprocess. We use `python -m uvicorn` so we inherit env.
@@ -62,4 +190,12 @@ class APIServerRunner:
         # Ensure Python can import the generated file
         env["PYTHONPATH"] = cwd + os.pathsep + env.get("PYTHONPATH", "")
         
-        return subprocess.Popen(cmd, env=env, cwd=cwd)
\ No newline at end of file
+        return subprocess.Popen(cmd, env=env, cwd=cwd)
+
+
+def _listen(host: str, port: int) -> socket.socket:
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    return sock
@@ -0,0 +1,130 @@
+"""
+Child entry point for blue/green restarts.
+
+Serves `<module>:app` with uvicorn on listening sockets inherited from the
+runner (`--fd`, repeatable) instead of binding a port itself, so a new
+server generation can share the public socket with the one it replaces.
+With `--ready-fd` it writes to an inherited pipe once lifespan startup is
+done, so the runner doesn't have to poll.
+
+Sockets passed as `--standby-fd` are only served once the runner writes
+GO_MESSAGE to the `--go-fd` pipe (after its health check passed); the
+child then writes LIVE_MESSAGE to the readiness pipe. EOF on the go pipe
+means the generation was rejected and never touches those sockets.
+
+    python serve.py generated_fastapi_app:app --fd 5 --fd 6 --ready-fd 7
+    python serve.py generated_fastapi_app:app --fd 6 --standby-fd 5 --ready-fd 7 --go-fd 8
+"""
+import argparse
+import asyncio
+import os
+import socket
+import sys
+
+import uvicorn
+
+# Pause between closing the listeners and closing idle connections on shutdown
+ACCEPT_GRACE_SECONDS = 0.25
+
+READY_MESSAGE = b"ready\n"
+GO_MESSAGE = b"go\n"
+LIVE_MESSAGE = b"live\n"
+
+
+class _DrainingServer(uvicorn.Server):
+    def __init__(self, config, ready_fd=None, go_fd=None, standby=()):
+        super().__init__(config)
+        self.ready_fd = ready_fd
+        self.go_fd = go_fd
+        self.standby = list(standby)
+        self._go_task = None
+
+    async def startup(self, sockets=None):
+        try:
+            await super().startup(sockets=sockets)
+        finally:
+            if self.ready_fd is not None:
+                # Closing without writing means startup failed; with standby
+                # sockets the pipe stays open to report going live
+                self._signal(READY_MESSAGE if self.started else None,
+                             keep_open=self.started and bool(self.standby))
+        if self.started and self.standby:
+            asyncio.get_running_loop().add_reader(self.go_fd, self._on_go)
+
+    def _signal(self, message, keep_open=False):
+        try:
+            if message is not None:
+                os.write(self.ready_fd, message)
+        except OSError:
+            pass
+        finally:
+            if not keep_open:
+                os.close(self.ready_fd)
+                self.ready_fd = None
+
+    def _on_go(self):
+        loop = asyncio.get_running_loop()
+        loop.remove_reader(self.go_fd)
+        try:
+            message = os.read(self.go_fd, 64)
+        except OSError:
+            message = b""
+        os.close(self.go_fd)
+        self.go_fd = None
+        if message == GO_MESSAGE:
+            self._go_task = loop.create_task(self._serve_standby())
+        elif self.ready_fd is not None:
+            self._signal(None)
+
+    async def _serve_standby(self):
+        # Same protocol setup as uvicorn's own startup
+        config = self.config
+        loop = asyncio.get_running_loop()
+
+        def create_protocol(_loop=None):
+            return config.http_protocol_class(
+                config=config, server_state=self.server_state,
+                app_state=self.lifespan.state, _loop=_loop,
+            )
+
+        try:
+            for sock in self.standby:
+                self.servers.append(await loop.create_server(
+                    create_protocol, sock=sock, ssl=config.ssl, backlog=config.backlog))
+        except OSError:
+            self._signal(None)
+            return
+        self._signal(LIVE_MESSAGE)
+
+    async def shutdown(self, sockets=None):
+        # Stop accepting first so just-accepted connections still get served
+        for server in getattr(self, "servers", []):
+            server.close()
+        await asyncio.sleep(ACCEPT_GRACE_SECONDS)
+        await super().shutdown(sockets=sockets)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("app")
+    parser.add_argument("--fd", type=int, action="append", required=True)
+    parser.add_argument("--timeout-graceful-shutdown", type=int, default=None)
+    parser.add_argument("--ready-fd", type=int, default=None)
+    parser.add_argument("--standby-fd", type=int, action="append", default=[])
+    parser.add_argument("--go-fd", type=int, default=None)
+    args = parser.parse_args(argv)
+    if args.standby_fd and (args.go_fd is None or args.ready_fd is None):
+        parser.error("--standby-fd requires --go-fd and --ready-fd")
+
+    # The generated app lives in the working directory
+    sys.path.insert(0, ".")
+    sockets = [socket.socket(fileno=fd) for fd in args.fd]
+    standby = [socket.socket(fileno=fd) for fd in args.standby_fd]
+    config = uvicorn.Config(args.app, timeout_graceful_shutdown=args.timeout_graceful_shutdown)
+    server = _DrainingServer(config, ready_fd=args.ready_fd, go_fd=args.go_fd, standby=standby)
+    server.run(sockets=sockets)
+    return 0 if server.started else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
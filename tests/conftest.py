@@ -0,0 +1,43 @@
+"""
+Shared fixtures: build a generated app from source and serve it in-process.
+"""
+
+import sys
+import types
+import itertools
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from utils.generator import generate_fastapi_app_source
+from utils.parser import extract_functions_from_source
+
+_counter = itertools.count(1)
+
+
+@pytest.fixture
+def make_app():
+    """
+    Generate and execute an app for module source.
+
+    Returns a function ``(source, **options) -> (module, client)``; the
+    modules' worker pools are shut down after the test.
+    """
+    modules = []
+
+    def make(source: str, **options):
+        functions = extract_functions_from_source(source)
+        code, _ = generate_fastapi_app_source(source, functions, **options)
+        module = types.ModuleType(f"test_generated_app_{next(_counter)}")
+        sys.modules[module.__name__] = module
+        exec(compile(code, module.__name__, "exec"), module.__dict__)
+        modules.append(module)
+        return module, TestClient(module.app)
+
+    yield make
+    for module in modules:
+        module._shutdown_executors()
+        sys.modules.pop(module.__name__, None)
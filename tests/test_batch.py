@@ -0,0 +1,26 @@
+"""
+Batch endpoints: /{name}/batch with and without the process pool.
+"""
+
+import pytest
+
+SOURCE = '''
+def square(n: int) -> int:
+    return n * n
+'''
+
+
+@pytest.mark.parametrize("chunk_size", ["0", "-1"])
+def test_rejects_invalid_chunk_size(make_app, chunk_size):
+    _, client = make_app(SOURCE, execution_modes={"square": "process"})
+    response = client.post(f"/square/batch?parallel=true&chunk_size={chunk_size}", json=[{"n": 2}])
+    assert response.status_code == 422
+
+
+@pytest.mark.parametrize("query", ["", "&chunk_size=1", "&chunk_size=2"])
+def test_parallel_batch_keeps_input_order(make_app, query):
+    # Without chunk_size the batch is split into one chunk per worker
+    _, client = make_app(SOURCE, memoize=False)
+    response = client.post(f"/square/batch?parallel=true{query}", json=[{"n": n} for n in range(5)])
+    assert response.status_code == 200
+    assert [item["result"] for item in response.json()["results"]] == [0, 1, 4, 9, 16]
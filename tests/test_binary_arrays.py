@@ -0,0 +1,59 @@
+"""
+Binary array bodies: octet-stream and .npy uploads of numeric list parameters.
+"""
+
+import io
+from array import array
+
+import pytest
+
+# .npy bodies, and the arrays built here, need NumPy
+np = pytest.importorskip("numpy")
+
+SOURCE = '''
+from typing import List
+
+def total(values: List[int]) -> int:
+    return sum(values)
+
+def mean(values: List[float]) -> float:
+    return sum(values) / len(values)
+'''
+
+NPY = "application/x-npy"
+OCTET = "application/octet-stream"
+
+
+def npy(values: np.ndarray) -> bytes:
+    buffer = io.BytesIO()
+    np.save(buffer, values)
+    return buffer.getvalue()
+
+
+@pytest.mark.parametrize("mode", ["inline", "process"])
+def test_accepts_supported_dtypes(make_app, mode):
+    _, client = make_app(SOURCE, default_execution_mode=mode)
+    assert client.post("/total", content=npy(np.arange(5, dtype=np.int32)),
+                       headers={"Content-Type": NPY}).json()["result"] == 10
+    assert client.post("/total", content=array("h", [1, 2, 3]).tobytes(),
+                       headers={"Content-Type": f"{OCTET}; dtype=int16"}).json()["result"] == 6
+    assert client.post("/mean", content=npy(np.array([1.0, 2.0], dtype=np.float32)),
+                       headers={"Content-Type": NPY}).json()["result"] == 1.5
+
+
+@pytest.mark.parametrize("mode", ["inline", "process"])
+def test_rejects_dtypes_without_type_code(make_app, mode):
+    _, client = make_app(SOURCE, default_execution_mode=mode)
+    response = client.post("/mean", content=npy(np.array([1.0, 2.0], dtype=np.float16)),
+                           headers={"Content-Type": NPY})
+    assert response.status_code == 422
+    assert "float16" in response.json()["detail"]
+
+
+def test_rejects_dtypes_of_another_kind(make_app):
+    _, client = make_app(SOURCE)
+    override = client.post("/total", content=array("f", [1.5, 2.5]).tobytes(),
+                           headers={"Content-Type": f"{OCTET}; dtype=float32"})
+    assert override.status_code == 422
+    floats = client.post("/total", content=npy(np.array([1.5, 2.5])), headers={"Content-Type": NPY})
+    assert floats.status_code == 422
@@ -0,0 +1,38 @@
+"""
+Draining child output into a LogBuffer.
+"""
+
+import io
+import subprocess
+import sys
+
+import pytest
+
+from utils.logs import MAX_LINE_BYTES, LogBuffer, drain_stream
+
+CHILD = (
+    "import sys\n"
+    "sys.stdout.buffer.write(b'bad \\xff\\n')\n"
+    "sys.stdout.flush()\n"
+    "for i in range(3):\n"
+    "    print('line', i, flush=True)\n"
+)
+
+
+@pytest.mark.parametrize("text", [False, True], ids=["binary", "text"])
+def test_invalid_utf8_does_not_stop_the_drain(text):
+    buffer = LogBuffer()
+    process = subprocess.Popen([sys.executable, "-c", CHILD], stdout=subprocess.PIPE,
+                               stderr=subprocess.STDOUT, text=text)
+    thread = drain_stream(process.stdout, buffer, source="child")
+    assert process.wait(timeout=10) == 0
+    thread.join(timeout=10)
+    assert [entry["line"] for entry in buffer.tail(10)] == [
+        "bad �", "line 0", "line 1", "line 2"
+    ]
+
+
+def test_long_lines_are_split():
+    buffer = LogBuffer()
+    drain_stream(io.BytesIO(b"x" * (MAX_LINE_BYTES * 2 + 10)), buffer).join(timeout=10)
+    assert [len(entry["line"]) for entry in buffer.tail(10)] == [MAX_LINE_BYTES, MAX_LINE_BYTES, 10]
@@ -0,0 +1,126 @@
+"""
+In-place function patches of live generated apps
+(generate_function_patch_source / apply_function_patch) and the
+fingerprints that decide what gets patched.
+"""
+
+import pytest
+
+from utils.generator import generate_fastapi_app_source, generate_function_patch_source
+from utils.parser import extract_functions_from_source
+from utils.treeshake import ModuleShaker
+
+SOURCE = '''
+FACTOR = 2
+
+def _scale(x):
+    return x * FACTOR
+
+def double(x: int) -> int:
+    return _scale(x)
+
+def shifted(x: int) -> int:
+    return _scale(x) + 1
+
+def square(x: int) -> int:
+    return x * x
+'''
+
+
+def fingerprints(source, **options):
+    collected = {}
+    generate_fastapi_app_source(source, extract_functions_from_source(source), fingerprints=collected, **options)
+    return collected
+
+
+def changed_functions(old, new):
+    return sorted(name for name, fingerprint in new["functions"].items() if old["functions"].get(name) != fingerprint)
+
+
+def patch(module, source, names, **options):
+    patch_source, _ = generate_function_patch_source(source, extract_functions_from_source(source), names, **options)
+    return module.apply_function_patch(compile(patch_source, "<patch>", "exec"), names)
+
+
+def test_fingerprints_ignore_formatting_and_comments():
+    shaker = ModuleShaker(SOURCE)
+    reformatted = ModuleShaker(SOURCE.replace("return x * x", "return x*x  # squared") + "\n# trailing\n")
+    assert shaker.fingerprint(["square"]) == reformatted.fingerprint(["square"])
+    assert fingerprints(SOURCE) == fingerprints(SOURCE + "\n\n# comment only\n")
+
+
+def test_changed_helper_changes_every_dependent():
+    old = fingerprints(SOURCE)
+    new = fingerprints(SOURCE.replace("x * FACTOR", "x * FACTOR * 10"))
+    assert new["app"] == old["app"]
+    assert changed_functions(old, new) == ["_scale", "double", "shifted"]
+
+    # Constants count as dependencies too
+    constant = fingerprints(SOURCE.replace("FACTOR = 2", "FACTOR = 3"))
+    assert changed_functions(old, constant) == ["_scale", "double", "shifted"]
+
+
+def test_effect_statements_change_the_app_fingerprint():
+    assert fingerprints(SOURCE)["app"] != fingerprints(SOURCE + "\nprint('loaded')\n")["app"]
+
+
+@pytest.mark.parametrize("options", [{}, {"lazy_functions": True}])
+def test_patch_replaces_dependents_and_keeps_other_caches(make_app, options):
+    module, client = make_app(SOURCE, **options)
+    assert client.post("/double?x=3").json()["result"] == 6
+    assert client.post("/square?x=3").json()["result"] == 9
+    square_cache = module._result_caches["square"]
+    route_count = len(module.app.router.routes)
+
+    new_source = SOURCE.replace("x * FACTOR", "x * FACTOR * 10")
+    old, new = fingerprints(SOURCE, **options), fingerprints(new_source, **options)
+    names = changed_functions(old, new)
+    removed, added = patch(module, new_source, names, **options)
+
+    assert {route.path for route in removed} == {route.path for route in added}
+    assert len(module.app.router.routes) == route_count
+    assert module._function_fingerprints == new["functions"]
+    assert client.post("/double?x=3").json()["result"] == 60
+    assert client.post("/shifted?x=3").json()["result"] == 61
+    # Unchanged endpoints keep their warm cache
+    assert module._result_caches["square"] is square_cache
+    assert client.post("/square?x=3").json()["result"] == 9
+    assert square_cache.stats()["hits"] == 1
+
+
+def test_patch_drops_removed_functions(make_app):
+    module, client = make_app(SOURCE)
+    new_source = SOURCE.replace("def square(x: int) -> int:\n    return x * x\n", "")
+    old, new = fingerprints(SOURCE), fingerprints(new_source)
+    assert changed_functions(old, new) == []
+    dropped = sorted(set(old["functions"]) - set(new["functions"]))
+    assert dropped == ["square"]
+
+    patch_source, _ = generate_function_patch_source(new_source, extract_functions_from_source(new_source), [])
+    removed, added = module.apply_function_patch(compile(patch_source, "<patch>", "exec"), dropped)
+
+    assert added == []
+    assert {route.path for route in removed} >= {"/square", "/square/batch"}
+    assert client.post("/square?x=3").status_code == 404
+    assert "square" not in module._function_fingerprints
+    assert client.post("/double?x=3").json()["result"] == 6
+
+
+def test_failing_patch_leaves_the_app_unchanged(make_app):
+    module, client = make_app(SOURCE)
+    assert client.post("/double?x=3").json()["result"] == 6
+    double = module.double
+    cache = module._result_caches["double"]
+    fingerprints_before = dict(module._function_fingerprints)
+    routes = list(module.app.router.routes)
+
+    broken = SOURCE.replace("FACTOR = 2", "FACTOR = 2 // 0")
+    with pytest.raises(ZeroDivisionError):
+        patch(module, broken, ["_scale", "double", "shifted"])
+
+    assert module.double is double
+    assert module._result_caches["double"] is cache
+    assert module._function_fingerprints == fingerprints_before
+    assert module.app.router.routes == routes
+    assert module.router is not None and "_function_patch_init" not in vars(module)
+    assert client.post("/double?x=3").json()["result"] == 6
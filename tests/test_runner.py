@@ -0,0 +1,75 @@
+"""
+Blue/green restarts of both runner copies against real server processes.
+"""
+
+import textwrap
+
+import pytest
+import requests
+
+from utils import runner as app_runner
+from mcp_server.utils import runner as mcp_runner
+
+APP_SOURCE = textwrap.dedent("""
+    from fastapi import FastAPI
+
+    app = FastAPI()
+
+    @app.get("/who")
+    def who():
+        return {generation!r}
+""")
+
+RUNNERS = [
+    pytest.param(app_runner.APIServerRunner, id="utils"),
+    pytest.param(mcp_runner.APIServerRunner, id="mcp_server"),
+]
+
+
+def _who(port: int) -> str:
+    return requests.get(f"http://127.0.0.1:{port}/who", timeout=5).json()
+
+
+@pytest.fixture
+def app_file(tmp_path):
+    path = tmp_path / "bluegreen_app.py"
+    path.write_text(APP_SOURCE.format(generation="old"))
+    return path
+
+
+@pytest.mark.parametrize("runner_class", RUNNERS)
+def test_generation_failing_its_probe_never_serves_the_public_port(runner_class, app_file):
+    port = app_runner.find_available_port("127.0.0.1", 18300)
+    runner = runner_class(app_file, port=port, blue_green=True, drain_timeout=1)
+    runner.start()
+    try:
+        assert _who(port) == "old"
+        app_file.write_text(APP_SOURCE.format(generation="new"))
+        seen = []
+
+        def failing_probe(probe_port):
+            # The new generation is up on its private port; public traffic
+            # must still all go to the old one
+            assert _who(probe_port) == "new"
+            seen.extend(_who(port) for _ in range(40))
+            return False
+
+        runner._probe = failing_probe
+        runner.restart()
+
+        assert seen and set(seen) == {"old"}
+        assert _who(port) == "old"
+    finally:
+        runner.stop()
+
+
+def test_mcp_runner_start_raises_when_the_app_fails_to_start(app_file):
+    app_file.write_text("raise RuntimeError('broken app')\n")
+    port = app_runner.find_available_port("127.0.0.1", 18400)
+    runner = mcp_runner.APIServerRunner(app_file, port=port, blue_green=True)
+    try:
+        with pytest.raises(RuntimeError):
+            runner.start()
+        assert not runner.is_running()
+    finally:
+        runner.stop()
@@ -0,0 +1,47 @@
+"""
+Response encoding: JSON (orjson or stdlib) and msgpack result envelopes.
+"""
+
+import json
+
+import pytest
+
+SOURCE = '''
+from typing import List
+
+def factorial(n: int) -> int:
+    result = 1
+    for i in range(2, n + 1):
+        result *= i
+    return result
+
+def factorials(n: int) -> List[int]:
+    return [factorial(i) for i in range(n)]
+'''
+
+
+def test_big_int_result_as_json(make_app):
+    _, client = make_app(SOURCE)
+    response = client.post("/factorial?n=25")
+    assert response.status_code == 200
+    assert json.loads(response.content) == {"result": 15511210043330985984000000, "success": True}
+
+
+def test_big_int_result_falls_back_to_json_for_msgpack(make_app):
+    msgpack = pytest.importorskip("msgpack")
+    _, client = make_app(SOURCE)
+    small = client.post("/factorial?n=5", headers={"Accept": "application/msgpack"})
+    assert small.headers["content-type"] == "application/msgpack"
+    assert msgpack.unpackb(small.content) == {"result": 120, "success": True}
+
+    big = client.post("/factorial?n=25", headers={"Accept": "application/msgpack"})
+    assert big.status_code == 200
+    assert big.headers["content-type"] == "application/json"
+    assert big.json()["result"] == 15511210043330985984000000
+
+
+def test_big_int_items_stream(make_app):
+    _, client = make_app(SOURCE)
+    response = client.post("/factorials/stream?n=26")
+    assert response.status_code == 200
+    assert [json.loads(line) for line in response.text.split()][-1] == 15511210043330985984000000
@@ -0,0 +1,51 @@
+"""
+Streaming endpoints: accumulator variants and their fallbacks.
+"""
+
+import json
+
+from utils.parser import extract_functions_from_source
+
+SOURCE = '''
+from typing import List
+
+def evens(n: int) -> List[int]:
+    result = []
+    for i in range(n):
+        if i % 2 == 0:
+            result.append(i)
+    return result
+
+def evens_or_flag(n: int) -> List[int]:
+    if n < 0:
+        return [-1]
+    result = []
+    for i in range(n):
+        if i % 2 == 0:
+            result.append(i)
+    return result
+'''
+
+
+def _items(response):
+    assert response.status_code == 200
+    return [json.loads(line) for line in response.text.split()]
+
+
+def test_accumulator_detection():
+    accumulators = {f["name"]: f["accumulator"] for f in extract_functions_from_source(SOURCE)}
+    assert accumulators == {"evens": "result", "evens_or_flag": None}
+
+
+def test_accumulator_streams_appended_items(make_app):
+    module, client = make_app(SOURCE)
+    assert hasattr(module, "_evens_streaming")
+    assert _items(client.post("/evens/stream?n=7")) == [0, 2, 4, 6]
+
+
+def test_early_return_streams_the_returned_value(make_app):
+    module, client = make_app(SOURCE)
+    assert not hasattr(module, "_evens_or_flag_streaming")
+    assert client.post("/evens_or_flag?n=-3").json()["result"] == [-1]
+    assert _items(client.post("/evens_or_flag/stream?n=-3")) == [-1]
+    assert _items(client.post("/evens_or_flag/stream?n=5")) == [0, 2, 4]
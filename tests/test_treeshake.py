@@ -0,0 +1,132 @@
+"""
+Tree shaking of inlined user code (utils.treeshake) and its deferred
+initialization in generated apps.
+"""
+
+from utils.treeshake import INIT_FUNCTION, shake_module_source
+
+
+def run_shaken(source, exposed):
+    """Execute shaken source plus its deferred init; return (namespace, report)."""
+    shaken, report = shake_module_source(source, exposed)
+    namespace = {}
+    exec(compile(shaken, "<shaken>", "exec"), namespace)
+    if INIT_FUNCTION in namespace:
+        namespace[INIT_FUNCTION]()
+    return namespace, report
+
+
+def run_original(source):
+    namespace = {}
+    exec(compile(source, "<original>", "exec"), namespace)
+    return namespace
+
+
+def test_defers_computations_and_drops_unused_statements():
+    source = '''
+"""Module docstring."""
+import math
+TABLE = [i * i for i in range(10)]
+UNUSED = sorted([3, 1, 2])
+assert len(TABLE) == 10
+
+def lookup(n):
+    return TABLE[n] + math.floor(0.5)
+
+if __name__ == "__main__":
+    print(lookup(3))
+'''
+    shaken, report = shake_module_source(source, ["lookup"])
+    assert report["shaken"]
+    assert report["deferred"] == ["TABLE"]
+    assert report["removed"] == ["UNUSED"]
+    assert "__main__" not in shaken and "Module docstring" not in shaken
+    assert "import math" in shaken.split(f"def {INIT_FUNCTION}")[0]
+
+    namespace, _ = run_shaken(source, ["lookup"])
+    assert namespace["lookup"](3) == 9
+
+
+def test_keeps_values_needed_at_import_time_eager():
+    source = '''
+LIMIT = int("10")
+BASE = len("abc")
+
+def clamp(x, limit=LIMIT):
+    return min(x, limit)
+
+class Shape:
+    sides = BASE + 1
+    def count(self):
+        return self.sides
+'''
+    shaken, report = shake_module_source(source, ["clamp", "Shape"])
+    # Defaults and class bodies are evaluated while the module is imported
+    assert report["deferred_statements"] == 0
+    assert INIT_FUNCTION not in shaken
+
+    namespace, _ = run_shaken(source, ["clamp", "Shape"])
+    assert namespace["clamp"](50) == 10
+    assert namespace["Shape"]().count() == 4
+
+
+def test_later_rebinding_wins_over_deferred_computation():
+    source = '''
+VALUE = len("ab")
+
+def value():
+    return VALUE
+
+VALUE = 7
+'''
+    namespace, report = run_shaken(source, ["value"])
+    assert namespace["value"]() == run_original(source)["value"]() == 7
+    assert report["deferred_statements"] == 0
+
+
+def test_deferred_statement_reading_a_later_rebound_name_runs_eagerly():
+    source = '''
+import json
+COUNT = 1
+REPORT = json.dumps(COUNT)
+COUNT = 2
+
+def report():
+    return REPORT, COUNT
+'''
+    namespace, _ = run_shaken(source, ["report"])
+    assert namespace["report"]() == run_original(source)["report"]() == ("1", 2)
+
+
+def test_dynamic_modules_are_left_as_is():
+    source = "X = 1\n\ndef get(name):\n    return globals()[name]\n"
+    shaken, report = shake_module_source(source, ["get"])
+    assert shaken == source
+    assert not report["shaken"] and "globals" in report["reason"]
+
+
+TABLE_SOURCE = '''
+def build_table():
+    return [n * n for n in range(100)]
+
+TABLE = build_table()
+
+def lookup(n: int) -> int:
+    return TABLE[n]
+'''
+
+
+def test_deferred_init_runs_once_before_first_call(make_app):
+    module, client = make_app(TABLE_SOURCE + "\nCALLS = []\nCALLS.append(1)\n\ndef calls() -> int:\n    return len(CALLS)\n")
+    assert module.get_user_code_stats()["init_ms"] is None
+    assert client.post("/lookup?n=5").json()["result"] == 25
+    assert client.post("/calls").json()["result"] == 1
+    assert module.get_user_code_stats()["init_error"] is None
+
+
+def test_parallel_batch_as_first_request_sees_deferred_globals(make_app):
+    _, client = make_app(TABLE_SOURCE, execution_modes={"lookup": "process"}, memoize=False)
+    response = client.post("/lookup/batch?parallel=true", json=[{"n": 2}, {"n": 3}])
+    assert [item.get("result") for item in response.json()["results"]] == [4, 9]
+    # The forked pool keeps serving with the initialized globals
+    assert client.post("/lookup?n=5").json()["result"] == 25
@@ -5,16 +5,45 @@ SwaggerMCP Utils Package
 Utility modules for the SwaggerMCP project.
 """
 
-from .parser import extract_functions_from_source, validate_function, get_function_signature
-from .generator import generate_fastapi_app_source, generate_openapi_spec
+from .parser import extract_functions_from_source, validate_function, get_function_signature, classify_function_purity
+from .generator import generate_fastapi_app_source, generate_function_patch_source, generate_openapi_spec
+from .annotations import TypeSpec, resolve_annotation
 from .runner import APIServerRunner, create_server_runner
+from .hotload import HotRouterSwapper
+from .registry import APIRegistry
+from .cache import GenerationCache, generation_key
+from .artifacts import ArtifactStore
+from .logs import LogBuffer, LogBufferHandler
+from .workers import WorkerPool, WorkerPoolFullError
+from .uploads import UploadStore, UploadRejectedError
+from .archives import ArchiveError, read_archive_modules
+from .treeshake import ModuleShaker, shake_module_source
 
 __all__ = [
     'extract_functions_from_source',
     'validate_function', 
     'get_function_signature',
+    'classify_function_purity',
     'generate_fastapi_app_source',
+    'generate_function_patch_source',
     'generate_openapi_spec',
+    'TypeSpec',
+    'resolve_annotation',
     'APIServerRunner',
-    'create_server_runner'
+    'create_server_runner',
+    'HotRouterSwapper',
+    'APIRegistry',
+    'GenerationCache',
+    'generation_key',
+    'ArtifactStore',
+    'LogBuffer',
+    'LogBufferHandler',
+    'WorkerPool',
+    'WorkerPoolFullError',
+    'UploadStore',
+    'UploadRejectedError',
+    'ArchiveError',
+    'read_archive_modules',
+    'ModuleShaker',
+    'shake_module_source'
 ] 
\ No newline at end of file
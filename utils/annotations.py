@@ -0,0 +1,291 @@
+"""
+Type Annotation Resolver
+=======================
+
+Resolve annotation source (as recorded by the parser, e.g. ``Dict[str,
+List[float]]`` or ``int | None``) into a small type model.
+
+The model covers what generated endpoints can express: the JSON scalars,
+``List``/``Set``/``Tuple``/``Dict`` with their parameters, ``Optional`` and
+``Union``. Everything else (unknown classes, ``Any``, ``Callable``, ...)
+resolves to ``any``. The generator uses it to pick FastAPI parameter types
+and placement, converters for batch items, OpenAPI schemas and response
+serializers, so one parse decides all of them.
+"""
+
+import ast
+from typing import Any, Dict, Optional, Tuple
+
+# Kinds of resolved types
+SCALAR_KINDS = ("int", "float", "bool", "str")
+COLLECTION_KINDS = ("list", "set", "tuple", "dict")
+
+# Annotation names (last dotted component) and the kind they resolve to
+_NAME_KINDS = {
+    "int": "int", "float": "float", "bool": "bool", "str": "str",
+    "None": "none", "NoneType": "none",
+    "list": "list", "List": "list", "Sequence": "list", "MutableSequence": "list",
+    "Iterable": "list", "Collection": "list",
+    "set": "set", "Set": "set", "frozenset": "set", "FrozenSet": "set",
+    "AbstractSet": "set", "MutableSet": "set",
+    "tuple": "tuple", "Tuple": "tuple",
+    "dict": "dict", "Dict": "dict", "Mapping": "dict", "MutableMapping": "dict",
+    "OrderedDict": "dict"
+}
+
+_JSON_SCHEMA_TYPES = {"int": "integer", "float": "number", "bool": "boolean", "str": "string"}
+
+
+class TypeSpec:
+    """
+    A resolved annotation.
+
+    ``kind`` is one of ``SCALAR_KINDS``, ``COLLECTION_KINDS``, ``"union"``,
+    ``"none"`` or ``"any"``. ``args`` holds the parameter types: the item
+    type of a list or set, the key and value types of a dict, the members of
+    a union, or the element types of a tuple (a single element type when
+    ``variadic``, i.e. ``Tuple[int, ...]``).
+    """
+
+    __slots__ = ("kind", "args", "variadic")
+
+    def __init__(self, kind: str, args: Tuple["TypeSpec", ...] = (), variadic: bool = False):
+        self.kind = kind
+        self.args = tuple(args)
+        self.variadic = variadic
+
+    def __eq__(self, other: Any) -> bool:
+        return (isinstance(other, TypeSpec) and self.kind == other.kind
+                and self.args == other.args and self.variadic == other.variadic)
+
+    def __hash__(self) -> int:
+        return hash((self.kind, self.args, self.variadic))
+
+    def __repr__(self) -> str:
+        return f"TypeSpec({type_source(self)})"
+
+    @property
+    def optional(self) -> bool:
+        """Whether None is an accepted value."""
+        return self.kind == "none" or (self.kind == "union" and any(arg.kind == "none" for arg in self.args))
+
+    def without_none(self) -> "TypeSpec":
+        """The type with None removed from it (``Optional[X]`` -> ``X``)."""
+        if self.kind != "union":
+            return self
+        members = tuple(arg for arg in self.args if arg.kind != "none")
+        if len(members) == 1:
+            return members[0]
+        return TypeSpec("union", members) if members else TypeSpec("none")
+
+    @property
+    def is_scalar(self) -> bool:
+        """Whether every accepted value is a JSON scalar (or None)."""
+        spec = self.without_none()
+        if spec.kind == "union":
+            return all(arg.is_scalar for arg in spec.args)
+        return spec.kind in SCALAR_KINDS
+
+    @property
+    def is_collection(self) -> bool:
+        """Whether some accepted value is a list, set, tuple or dict."""
+        if self.kind == "union":
+            return any(arg.is_collection for arg in self.args)
+        return self.kind in COLLECTION_KINDS
+
+
+ANY = TypeSpec("any")
+
+
+def resolve_annotation(annotation: Optional[str]) -> TypeSpec:
+    """
+    Resolve annotation source into a TypeSpec.
+
+    Args:
+        annotation: Annotation source, e.g. ``Optional[List[int]]``; None or
+            an empty string for a missing annotation
+
+    Returns:
+        The resolved type (``any`` for missing or unsupported annotations)
+    """
+    if not annotation:
+        return ANY
+    try:
+        node = ast.parse(annotation.strip(), mode="eval").body
+    except SyntaxError:
+        return ANY
+    return _resolve(node)
+
+
+def _name(node: ast.AST) -> str:
+    if isinstance(node, ast.Attribute):
+        return node.attr
+    if isinstance(node, ast.Name):
+        return node.id
+    return ""
+
+
+def _resolve(node: ast.AST) -> TypeSpec:
+    if isinstance(node, ast.Constant):
+        if node.value is None:
+            return TypeSpec("none")
+        if isinstance(node.value, str):
+            # Forward reference: "List[int]"
+            return resolve_annotation(node.value)
+        return ANY
+
+    if isinstance(node, ast.BinOp) and isinstance(node.op, ast.BitOr):
+        return _union([_resolve(node.left), _resolve(node.right)])
+
+    if isinstance(node, ast.Subscript):
+        container = _name(node.value)
+        params = list(node.slice.elts) if isinstance(node.slice, ast.Tuple) else [node.slice]
+
+        if container == "Optional":
+            return _union([_resolve(params[0]), TypeSpec("none")])
+        if container == "Union":
+            return _union([_resolve(param) for param in params])
+        if container == "Annotated":
+            return _resolve(params[0])
+
+        kind = _NAME_KINDS.get(container)
+        if kind in ("list", "set"):
+            return TypeSpec(kind, (_resolve(params[0]),))
+        if kind == "dict":
+            if len(params) != 2:
+                return TypeSpec("dict", (TypeSpec("str"), ANY))
+            return TypeSpec("dict", (_resolve(params[0]), _resolve(params[1])))
+        if kind == "tuple":
+            if len(params) == 2 and isinstance(params[1], ast.Constant) and params[1].value is Ellipsis:
+                return TypeSpec("tuple", (_resolve(params[0]),), variadic=True)
+            if len(params) == 1 and isinstance(params[0], ast.Tuple) and not params[0].elts:
+                # Tuple[()]
+                return TypeSpec("tuple")
+            return TypeSpec("tuple", tuple(_resolve(param) for param in params))
+        return ANY
+
+    kind = _NAME_KINDS.get(_name(node))
+    if kind is None:
+        return ANY
+    # Bare containers take anything
+    if kind in ("list", "set"):
+        return TypeSpec(kind, (ANY,))
+    if kind == "tuple":
+        return TypeSpec("tuple", (ANY,), variadic=True)
+    if kind == "dict":
+        return TypeSpec("dict", (TypeSpec("str"), ANY))
+    return TypeSpec(kind)
+
+
+def _union(members) -> TypeSpec:
+    flat = []
+    for member in members:
+        for arg in (member.args if member.kind == "union" else (member,)):
+            if arg.kind == "any":
+                return ANY
+            if arg not in flat:
+                flat.append(arg)
+    if len(flat) == 1:
+        return flat[0]
+    return TypeSpec("union", tuple(flat))
+
+
+def type_source(spec: TypeSpec) -> str:
+    """
+    Render a TypeSpec as annotation source using ``typing`` names.
+
+    Args:
+        spec: Resolved type
+
+    Returns:
+        Source such as ``Dict[str, List[float]]``, valid wherever
+        ``Any``, ``Dict``, ``List``, ``Optional``, ``Set``, ``Tuple`` and
+        ``Union`` are imported from ``typing``
+    """
+    kind = spec.kind
+    if kind in SCALAR_KINDS:
+        return kind
+    if kind == "none":
+        return "None"
+    if kind == "list":
+        return f"List[{type_source(spec.args[0])}]"
+    if kind == "set":
+        return f"Set[{type_source(spec.args[0])}]"
+    if kind == "dict":
+        return f"Dict[{type_source(spec.args[0])}, {type_source(spec.args[1])}]"
+    if kind == "tuple":
+        if spec.variadic:
+            return f"Tuple[{type_source(spec.args[0])}, ...]"
+        if not spec.args:
+            return "Tuple[()]"
+        return f"Tuple[{', '.join(type_source(arg) for arg in spec.args)}]"
+    if kind == "union":
+        members = [arg for arg in spec.args if arg.kind != "none"]
+        if len(members) == 1 and spec.optional:
+            return f"Optional[{type_source(members[0])}]"
+        return f"Union[{', '.join(type_source(arg) for arg in spec.args)}]"
+    return "Any"
+
+
+def json_schema(spec: TypeSpec) -> Dict[str, Any]:
+    """
+    Build the OpenAPI 3.0 schema of a TypeSpec.
+
+    Args:
+        spec: Resolved type
+
+    Returns:
+        Schema dictionary (``{}`` for ``any``)
+    """
+    kind = spec.kind
+    if kind in SCALAR_KINDS:
+        return {"type": _JSON_SCHEMA_TYPES[kind]}
+    if kind == "list":
+        return {"type": "array", "items": json_schema(spec.args[0])}
+    if kind == "set":
+        return {"type": "array", "items": json_schema(spec.args[0]), "uniqueItems": True}
+    if kind == "tuple":
+        if spec.variadic:
+            return {"type": "array", "items": json_schema(spec.args[0])}
+        schema = {"type": "array", "minItems": len(spec.args), "maxItems": len(spec.args)}
+        if spec.args:
+            items = _distinct([json_schema(arg) for arg in spec.args])
+            schema["items"] = items[0] if len(items) == 1 else {"anyOf": items}
+        return schema
+    if kind == "dict":
+        return {"type": "object", "additionalProperties": json_schema(spec.args[1]) or True}
+    if kind == "union":
+        members = [json_schema(arg) for arg in spec.args if arg.kind != "none"]
+        schema = members[0] if len(members) == 1 else {"anyOf": members}
+        if spec.optional:
+            schema = dict(schema, nullable=True)
+        return schema
+    if kind == "none":
+        return {"nullable": True}
+    return {}
+
+
+def _distinct(schemas):
+    unique = []
+    for schema in schemas:
+        if schema not in unique:
+            unique.append(schema)
+    return unique
+
+
+def is_json_native(spec: TypeSpec) -> bool:
+    """Whether values of the type encode to JSON without conversion (no sets or unknown types)."""
+    if spec.kind in SCALAR_KINDS or spec.kind == "none":
+        return True
+    if spec.kind in ("list", "tuple", "dict", "union"):
+        return all(is_json_native(arg) for arg in spec.args)
+    return False
+
+
+def has_str_keys(spec: TypeSpec) -> bool:
+    """Whether every dict that values of the type can contain is keyed by strings."""
+    if spec.kind == "any":
+        return False
+    if spec.kind == "dict":
+        return spec.args[0].kind == "str" and has_str_keys(spec.args[1])
+    return all(has_str_keys(arg) for arg in spec.args)
@@ -0,0 +1,120 @@
+"""
+Source Archive Reader
+====================
+
+Read the Python modules of an uploaded zip or tar archive (optionally
+gzip/bz2/xz-compressed) into memory. Members are never extracted to disk,
+so archive paths cannot escape anywhere; links, non-``.py`` files and
+``__pycache__`` are skipped.
+"""
+
+import io
+import tarfile
+import zipfile
+import posixpath
+from typing import Callable, Dict, Iterator, Tuple
+
+# File names treated as archives rather than single modules
+ARCHIVE_SUFFIXES = (".zip", ".tar", ".tar.gz", ".tgz", ".tar.bz2", ".tbz2", ".tar.xz", ".txz")
+
+
+class ArchiveError(ValueError):
+    """Raised when an archive can't be read or exceeds its limits."""
+
+
+def is_archive_name(filename: str) -> bool:
+    """Whether a file name has an archive suffix."""
+    return filename.lower().endswith(ARCHIVE_SUFFIXES)
+
+
+def archive_suffix(filename: str) -> str:
+    """The archive suffix of a file name (``.tar.gz`` rather than ``.gz``)."""
+    lowered = filename.lower()
+    return next((suffix for suffix in ARCHIVE_SUFFIXES if lowered.endswith(suffix)), "")
+
+
+def module_name_for(path: str) -> str:
+    """
+    Dotted module name of an archive member.
+
+    ``pkg/sub/mod.py`` becomes ``pkg.sub.mod``; a package's ``__init__.py``
+    is named after the package.
+    """
+    parts = [part for part in posixpath.normpath(path.replace("\\", "/")).split("/")
+             if part not in ("", ".", "..")]
+    parts[-1] = parts[-1][:-len(".py")]
+    if parts[-1] == "__init__" and len(parts) > 1:
+        parts.pop()
+    return ".".join(parts)
+
+
+def read_archive_modules(data: bytes, max_modules: int = 500,
+                         max_total_bytes: int = 64 * 1024 * 1024) -> Dict[str, str]:
+    """
+    Read the Python modules of an archive.
+
+    Args:
+        data: Archive content (zip or tar, detected from the content)
+        max_modules: Most ``.py`` members accepted
+        max_total_bytes: Most uncompressed bytes read across all modules
+
+    Returns:
+        Module source keyed by dotted module name, in archive order
+
+    Raises:
+        ArchiveError: If the archive is unreadable, exceeds a limit, or a
+            module is not UTF-8
+    """
+    modules: Dict[str, str] = {}
+    total = 0
+    try:
+        for path, read in _python_members(data):
+            if len(modules) >= max_modules:
+                raise ArchiveError(f"Archive has more than {max_modules} Python modules")
+            content = read(max_total_bytes - total + 1)
+            total += len(content)
+            if total > max_total_bytes:
+                raise ArchiveError(f"Archive modules exceed {max_total_bytes} bytes uncompressed")
+            try:
+                modules[module_name_for(path)] = content.decode("utf-8")
+            except UnicodeDecodeError:
+                raise ArchiveError(f"{path} is not UTF-8 text") from None
+    except ArchiveError:
+        raise
+    except (tarfile.TarError, zipfile.BadZipFile, OSError, EOFError) as e:
+        raise ArchiveError(f"Unreadable archive: {e}") from None
+    return modules
+
+
+def _python_members(data: bytes) -> Iterator[Tuple[str, Callable[[int], bytes]]]:
+    """Yield (path, read(limit)) for each regular ``.py`` member of an archive."""
+    buffer = io.BytesIO(data)
+    if zipfile.is_zipfile(buffer):
+        with zipfile.ZipFile(buffer) as archive:
+            for info in archive.infolist():
+                if info.is_dir() or not _is_module_path(info.filename):
+                    continue
+                yield info.filename, lambda limit, info=info: _read_limited(archive.open(info), limit)
+        return
+
+    buffer.seek(0)
+    try:
+        archive = tarfile.open(fileobj=buffer, mode="r:*")
+    except tarfile.TarError:
+        raise ArchiveError("Not a zip or tar archive") from None
+    with archive:
+        for member in archive:
+            if not member.isfile() or not _is_module_path(member.name):
+                continue
+            yield member.name, lambda limit, member=member: _read_limited(archive.extractfile(member), limit)
+
+
+def _is_module_path(path: str) -> bool:
+    parts = path.replace("\\", "/").split("/")
+    return path.endswith(".py") and "__pycache__" not in parts and not parts[-1].startswith(".")
+
+
+def _read_limited(stream, limit: int) -> bytes:
+    # Reading at most `limit` bytes keeps compression bombs bounded
+    with stream:
+        return stream.read(limit)
@@ -0,0 +1,239 @@
+"""
+Generated App Artifact Store
+===========================
+
+On-disk, content-addressed store of generated apps. Each artifact keeps
+the generated source together with its marshalled code object and its
+precomputed OpenAPI schema, so loading a stored version (at server start
+or on rollback) only reads files: nothing is parsed, compiled or
+schema-built again.
+
+Layout::
+
+    <root>/<artifact_id>/app.py        generated source
+    <root>/<artifact_id>/app.bin       importlib magic number + marshalled code
+                                       (a tuple of code objects for sharded apps)
+    <root>/<artifact_id>/openapi.json  OpenAPI schema of the generated app
+    <root>/<artifact_id>/meta.json     endpoints, generation key, timestamps
+    <root>/CURRENT                     id of the deployed artifact
+"""
+
+import os
+import json
+import time
+import types
+import shutil
+import marshal
+import hashlib
+import logging
+import importlib.util
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+from .hotload import exec_generated_code, unload_module
+
+logger = logging.getLogger(__name__)
+
+_CURRENT_FILE = "CURRENT"
+
+
+def artifact_id_for(generated_source: str) -> str:
+    """
+    Compute the content address of a generated app.
+
+    Args:
+        generated_source: Generated FastAPI source code
+
+    Returns:
+        Hex SHA-256 digest of the source
+    """
+    return hashlib.sha256(generated_source.encode("utf-8")).hexdigest()
+
+
+class ArtifactStore:
+    """
+    Content-addressed store of generated apps with precompiled bytecode.
+    """
+
+    def __init__(self, root_dir: Path):
+        """
+        Initialize the artifact store.
+
+        Args:
+            root_dir: Directory holding the artifacts
+        """
+        self.root_dir = Path(root_dir)
+        self.root_dir.mkdir(parents=True, exist_ok=True)
+
+    def exists(self, artifact_id: str) -> bool:
+        """Check whether an artifact is stored."""
+        return _is_artifact_id(artifact_id) and (self.root_dir / artifact_id / "meta.json").exists()
+
+    def put(self, generated_source: str, endpoints: List[str], key: Optional[str] = None,
+            code: Optional[Union[types.CodeType, Sequence[types.CodeType]]] = None,
+            module: Optional[types.ModuleType] = None,
+            openapi: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Store a generated app, compiling it and building its schema once.
+
+        Args:
+            generated_source: Generated FastAPI source code
+            endpoints: Endpoint paths exposed by the app
+            key: Generation key the app was produced from
+            code: Already compiled code of the source (one code object per
+                shard, or a single one), to avoid recompiling
+            module: Already executed module of the source, to avoid re-executing
+                it just to build the OpenAPI schema
+            openapi: Already built OpenAPI schema of the source (takes
+                precedence over ``module``)
+
+        Returns:
+            Artifact id
+        """
+        artifact_id = artifact_id_for(generated_source)
+        if self.exists(artifact_id):
+            return artifact_id
+
+        if code is None:
+            code = compile(generated_source, "<generated>", "exec")
+        if openapi is None:
+            if module is None:
+                schema_module = exec_generated_code(code, filename="<generated>")
+                unload_module(schema_module)
+            else:
+                schema_module = module
+            openapi = schema_module.app.openapi() if hasattr(schema_module, "app") else {}
+
+        # Build the artifact aside and rename it into place so readers
+        # never observe a half-written directory
+        tmp_dir = self.root_dir / f".tmp-{artifact_id}-{os.getpid()}"
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        tmp_dir.mkdir()
+        (tmp_dir / "app.py").write_text(generated_source)
+        (tmp_dir / "app.bin").write_bytes(importlib.util.MAGIC_NUMBER + marshal.dumps(
+            code if isinstance(code, types.CodeType) else tuple(code)
+        ))
+        (tmp_dir / "openapi.json").write_text(json.dumps(openapi))
+        (tmp_dir / "meta.json").write_text(json.dumps({
+            "id": artifact_id,
+            "key": key,
+            "endpoints": endpoints,
+            "created": time.time()
+        }))
+
+        try:
+            os.rename(tmp_dir, self.root_dir / artifact_id)
+        except OSError:
+            # Stored concurrently by another writer
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+        logger.info(f"Stored artifact {artifact_id[:12]} ({len(endpoints)} endpoints)")
+        return artifact_id
+
+    def load(self, artifact_id: str, module_name: Optional[str] = None) -> types.ModuleType:
+        """
+        Load a stored app from its marshalled code and precomputed schema.
+
+        Args:
+            artifact_id: Artifact id
+            module_name: Name to register the module under (auto-assigned if None)
+
+        Returns:
+            Executed module whose ``app`` already carries its OpenAPI schema
+        """
+        artifact_dir = self._artifact_dir(artifact_id)
+        source_path = artifact_dir / "app.py"
+
+        code = self._read_code(artifact_dir)
+        if code is None:
+            # Written by a different Python version; recompile once and keep it
+            code = compile(source_path.read_text(), str(source_path), "exec")
+            (artifact_dir / "app.bin").write_bytes(importlib.util.MAGIC_NUMBER + marshal.dumps(code))
+
+        module = exec_generated_code(code, module_name, filename=str(source_path))
+
+        app = getattr(module, "app", None)
+        if app is not None:
+            app.openapi_schema = json.loads((artifact_dir / "openapi.json").read_text())
+
+        return module
+
+    def get_meta(self, artifact_id: str) -> Dict[str, Any]:
+        """
+        Get the metadata of a stored artifact.
+
+        Args:
+            artifact_id: Artifact id
+
+        Returns:
+            Metadata dictionary
+        """
+        return json.loads((self._artifact_dir(artifact_id) / "meta.json").read_text())
+
+    def get_source(self, artifact_id: str) -> str:
+        """Get the generated source of a stored artifact."""
+        return (self._artifact_dir(artifact_id) / "app.py").read_text()
+
+    def get_current(self) -> Optional[str]:
+        """
+        Get the id of the currently deployed artifact.
+
+        Returns:
+            Artifact id, or None if nothing was deployed yet
+        """
+        try:
+            artifact_id = (self.root_dir / _CURRENT_FILE).read_text().strip()
+        except OSError:
+            return None
+        return artifact_id if self.exists(artifact_id) else None
+
+    def set_current(self, artifact_id: str) -> None:
+        """
+        Record an artifact as the deployed one.
+
+        Args:
+            artifact_id: Artifact id
+        """
+        self._artifact_dir(artifact_id)
+        tmp_path = self.root_dir / f"{_CURRENT_FILE}.tmp"
+        tmp_path.write_text(artifact_id)
+        os.replace(tmp_path, self.root_dir / _CURRENT_FILE)
+
+    def history(self) -> List[Dict[str, Any]]:
+        """
+        List stored artifacts, newest first.
+
+        Returns:
+            List of artifact metadata dictionaries
+        """
+        artifacts = []
+        for entry in self.root_dir.iterdir():
+            if entry.is_dir() and self.exists(entry.name):
+                try:
+                    artifacts.append(self.get_meta(entry.name))
+                except (OSError, ValueError):
+                    continue
+        return sorted(artifacts, key=lambda meta: meta.get("created", 0), reverse=True)
+
+    def _artifact_dir(self, artifact_id: str) -> Path:
+        if not self.exists(artifact_id):
+            raise KeyError(f"Unknown artifact: {artifact_id}")
+        return self.root_dir / artifact_id
+
+    @staticmethod
+    def _read_code(artifact_dir: Path) -> Optional[Union[types.CodeType, Tuple[types.CodeType, ...]]]:
+        try:
+            data = (artifact_dir / "app.bin").read_bytes()
+        except OSError:
+            return None
+        magic = importlib.util.MAGIC_NUMBER
+        if not data.startswith(magic):
+            return None
+        try:
+            return marshal.loads(data[len(magic):])
+        except (EOFError, ValueError, TypeError):
+            return None
+
+
+def _is_artifact_id(artifact_id: str) -> bool:
+    return len(artifact_id) == 64 and all(c in "0123456789abcdef" for c in artifact_id)
@@ -0,0 +1,264 @@
+"""
+Generation Cache
+===============
+
+Content-addressed cache for the parse -> generate pipeline.
+Entries are keyed by a hash of the user source, the generator version and
+the generation options, so identical submissions skip parsing and code
+generation entirely.
+"""
+
+import json
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import Executor
+from typing import Any, Dict, Optional, Tuple
+
+from .parser import extract_functions_from_source
+from .generator import GENERATOR_VERSION, generate_fastapi_app_source
+
+
+class NoFunctionsError(ValueError):
+    """Raised when source code contains no top-level functions to expose."""
+
+
+def generation_key(source: str, **options: Any) -> str:
+    """
+    Compute the content address of a generation request.
+
+    Args:
+        source: Python source code
+        **options: Generation options that affect the output
+
+    Returns:
+        Hex SHA-256 digest
+    """
+    digest = hashlib.sha256()
+    digest.update(GENERATOR_VERSION.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(json.dumps(options, sort_keys=True, default=str).encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(source.encode("utf-8"))
+    return digest.hexdigest()
+
+
+def build_generation(source: str, app_title: str, app_description: str,
+                     options: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, float]]:
+    """
+    Parse and generate an API for source code, without caching.
+
+    A plain module-level function so it can run in a process pool.
+
+    Args:
+        source: Python source code
+        app_title: Title for the generated FastAPI app
+        app_description: Description for the generated FastAPI app
+        options: Further ``generate_fastapi_app_source`` options
+
+    Returns:
+        Tuple of (entry without its key, ``parse_ms``/``generate_ms`` timings)
+
+    Raises:
+        ValueError: If the source cannot be parsed
+        NoFunctionsError: If the source has no top-level functions
+    """
+    start_time = time.perf_counter()
+    functions = extract_functions_from_source(source)
+    if not functions:
+        raise NoFunctionsError("No top-level functions found")
+    parsed_at = time.perf_counter()
+
+    fingerprints: Dict[str, Any] = {}
+    generated_source, endpoints = generate_fastapi_app_source(
+        raw_source=source,
+        functions=functions,
+        app_title=app_title,
+        app_description=app_description,
+        fingerprints=fingerprints,
+        **options
+    )
+
+    entry = {
+        "functions": functions,
+        "source": generated_source,
+        "endpoints": endpoints,
+        "fingerprints": fingerprints
+    }
+    timings = {
+        "parse_ms": round((parsed_at - start_time) * 1000, 3),
+        "generate_ms": round((time.perf_counter() - parsed_at) * 1000, 3)
+    }
+    return entry, timings
+
+
+class GenerationCache:
+    """
+    Bounded LRU of generation results.
+
+    Each entry is a dictionary with ``key``, ``functions``, ``source``
+    (the generated app), ``endpoints`` and ``fingerprints`` (of the app and
+    each function, see ``iter_fastapi_app_source``). Entries are shared between
+    callers and must be treated as read-only.
+    """
+
+    def __init__(self, max_entries: int = 64):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of generation results to keep
+        """
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a generation result, counting the hit or miss.
+
+        Args:
+            key: Generation key
+
+        Returns:
+            Cached entry or None
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key: str, entry: Dict[str, Any]) -> None:
+        """
+        Store a generation result.
+
+        Args:
+            key: Generation key
+            entry: Generation result
+        """
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def generate(self, source: str, app_title: str = "Generated API",
+                 app_description: str = "Auto-generated API from Python functions",
+                 timings: Optional[Dict[str, float]] = None,
+                 **options: Any) -> Tuple[Dict[str, Any], bool]:
+        """
+        Parse and generate an API for source code, reusing cached results.
+
+        Args:
+            source: Python source code
+            app_title: Title for the generated FastAPI app
+            app_description: Description for the generated FastAPI app
+            timings: Optional dictionary that receives ``parse_ms`` and
+                ``generate_ms`` (both 0 on a cache hit)
+            **options: Further ``generate_fastapi_app_source`` options
+                (e.g. ``execution_modes``); they are part of the cache key
+
+        Returns:
+            Tuple of (generation entry, whether it was a cache hit)
+
+        Raises:
+            ValueError: If the source cannot be parsed
+            NoFunctionsError: If the source has no top-level functions
+        """
+        key = generation_key(source, app_title=app_title, app_description=app_description, **options)
+        if timings is not None:
+            timings.update(parse_ms=0.0, generate_ms=0.0)
+        entry = self.get(key)
+        if entry is not None:
+            return entry, True
+
+        entry, build_timings = build_generation(source, app_title, app_description, options)
+        if timings is not None:
+            timings.update(build_timings)
+
+        entry["key"] = key
+        self.put(key, entry)
+        return entry, False
+
+    def generate_many(self, sources: Dict[str, str], executor: Optional[Executor] = None,
+                      app_titles: Optional[Dict[str, str]] = None,
+                      app_description: str = "Auto-generated API from Python functions",
+                      **options: Any) -> Dict[str, Dict[str, Any]]:
+        """
+        Parse and generate APIs for several sources, in parallel on a miss.
+
+        Cached entries are served directly; the rest are built on
+        ``executor`` (e.g. a process pool) and cached when they come back.
+
+        Args:
+            sources: Source code keyed by name
+            executor: Where to build missing entries (in this thread if None)
+            app_titles: Title of each generated app (the name if missing)
+            app_description: Description for the generated FastAPI apps
+            **options: Further ``generate_fastapi_app_source`` options
+
+        Returns:
+            Per name, a dictionary with ``entry``, ``cache_hit`` and
+            ``timings``, or with ``error`` (the exception) if that source
+            failed; sources without functions fail with NoFunctionsError
+        """
+        app_titles = app_titles or {}
+        results: Dict[str, Dict[str, Any]] = {}
+        pending = {}
+        for name, source in sources.items():
+            app_title = app_titles.get(name, name)
+            key = generation_key(source, app_title=app_title, app_description=app_description, **options)
+            entry = self.get(key)
+            if entry is not None:
+                results[name] = {"entry": entry, "cache_hit": True, "timings": {"parse_ms": 0.0, "generate_ms": 0.0}}
+            elif executor is None:
+                pending[name] = (key, None)
+            else:
+                pending[name] = (key, executor.submit(build_generation, source, app_title, app_description, options))
+
+        for name, (key, future) in pending.items():
+            try:
+                if future is None:
+                    entry, timings = build_generation(sources[name], app_titles.get(name, name),
+                                                      app_description, options)
+                else:
+                    entry, timings = future.result()
+            except Exception as e:
+                results[name] = {"error": e}
+                continue
+            entry["key"] = key
+            self.put(key, entry)
+            results[name] = {"entry": entry, "cache_hit": False, "timings": timings}
+
+        return {name: results[name] for name in sources}
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics.
+
+        Returns:
+            Dictionary containing hit/miss counters and size
+        """
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 3) if total else None
+            }
+
+    def clear(self) -> None:
+        """Drop all entries and reset counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
@@ -6,8 +6,51 @@ Generate FastAPI applications from Python function definitions.
 Creates REST endpoints with automatic parameter handling and documentation.
 """
 
-from typing import Any, Dict, List, Tuple, Optional
+from typing import Any, Dict, Iterator, List, Tuple, Optional
+from concurrent.futures import Executor
+import ast
 import json
+import hashlib
+import types
+import marshal
+
+from .annotations import (
+    COLLECTION_KINDS, TypeSpec, resolve_annotation, type_source, json_schema, is_json_native, has_str_keys
+)
+from .treeshake import ModuleShaker
+
+
+# Bump whenever the generated output changes so cached generations are invalidated
+GENERATOR_VERSION = "1.16.5"
+
+# How a generated endpoint runs its user function:
+#   inline  - directly on the event loop (cheap functions only)
+#   thread  - in a thread pool, so blocking calls don't stall other requests
+#   process - in a process pool, for CPU-bound work that holds the GIL
+EXECUTION_MODES = ("inline", "thread", "process")
+DEFAULT_EXECUTION_MODE = "thread"
+
+# Scalar annotations that make a function eligible for a vectorized endpoint
+NUMERIC_SCALAR_TYPES = {"int", "float", "complex"}
+
+# Decorator that marks a function as elementwise regardless of its annotations
+ELEMENTWISE_DECORATOR = "elementwise"
+
+# Return annotations (outermost type) that make a function's result streamable
+ITERABLE_RETURN_TYPES = {
+    "list", "List", "set", "Set", "frozenset", "FrozenSet", "tuple", "Tuple",
+    "Iterable", "Iterator", "Generator", "Sequence"
+}
+
+# Name of the parameter through which streaming variants receive their sink
+STREAM_SINK_PARAM = "_stream_sink"
+
+# Converter (defined in FASTAPI_TEMPLATE) for each scalar kind; other types
+# are checked by a pydantic validator built once per parameter
+SCALAR_CONVERTERS = {"int": "_to_int", "float": "_to_float", "bool": "_to_bool", "str": "_to_str"}
+
+# Item kinds of numeric lists that can travel as binary arrays, and their dtype
+ARRAY_DTYPES = {"int": "<i8", "float": "<f8"}
 
 
 # Template for the generated FastAPI app
@@ -21,11 +64,60 @@ Do not edit manually - changes will be overwritten on regeneration.
 Generated from: {source_info}
 """
 
-from fastapi import FastAPI, HTTPException, Request
-from fastapi.responses import JSONResponse
-from typing import Any, Dict, List, Optional, Union
+from fastapi import APIRouter, Body, FastAPI, HTTPException, Query, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from typing import Annotated, Any, Dict, List, Optional, Set, Tuple, Union
+from pydantic import Field, TypeAdapter, ValidationError, create_model
+from starlette.routing import Match, Route
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from collections import OrderedDict
+from array import array as _typed_array
+import io
+import os
+import sys
 import json
+import math
+import time
+import types
+import atexit
+import asyncio
+import logging
+import threading
 import traceback
+import multiprocessing
+
+# NumPy is optional; vectorized endpoints answer 501 without it
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# orjson and msgpack are optional; responses fall back to stdlib JSON
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+# Path a route matches against, relative to any mount (Starlette >= 0.33)
+try:
+    from starlette.routing import get_route_path as _route_path
+except ImportError:
+    def _route_path(scope) -> str:
+        return scope["path"]
+
+# pyarrow is optional; only needed for Arrow IPC array bodies
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+logger = logging.getLogger(__name__)
 
 # Create FastAPI app
 app = FastAPI(
@@ -36,81 +128,1196 @@ app = FastAPI(
     redoc_url="/redoc"
 )
 
-# Parameter coercion function
-def _coerce_parameter(value: Any, expected_type: str = None) -> Any:
+# Generated endpoints are registered in shards, each on its own router
+_shard_routers = [APIRouter() for _ in range({shard_count})]
+
+# Worker pool sizes for thread/process execution modes
+THREAD_POOL_SIZE = int(os.getenv("SWAGGERMCP_THREAD_POOL_SIZE", min(32, (os.cpu_count() or 1) + 4)))
+PROCESS_POOL_SIZE = int(os.getenv("SWAGGERMCP_PROCESS_POOL_SIZE", os.cpu_count() or 1))
+
+_executors = {{}}
+_executors_lock = threading.Lock()
+
+def _get_executor(mode: str):
+    """Get (creating on first use) the worker pool for an execution mode."""
+    executor = _executors.get(mode)
+    if executor is None:
+        with _executors_lock:
+            executor = _executors.get(mode)
+            if executor is None:
+                if mode == "process":
+                    # Forked workers inherit this module, so user functions
+                    # resolve even when the app was loaded from memory
+                    methods = multiprocessing.get_all_start_methods()
+                    context = multiprocessing.get_context("fork") if "fork" in methods else None
+                    executor = ProcessPoolExecutor(max_workers=PROCESS_POOL_SIZE, mp_context=context)
+                else:
+                    executor = ThreadPoolExecutor(max_workers=THREAD_POOL_SIZE, thread_name_prefix="generated")
+                _executors[mode] = executor
+    return executor
+
+async def _run(mode: str, func, *args):
+    """Call a user function in its execution mode."""
+    loop = asyncio.get_running_loop()
+    if not _user_init_done:
+        # Before any process worker forks, so workers inherit the result
+        await loop.run_in_executor(_get_executor("thread"), _ensure_user_init)
+    if mode == "inline":
+        return func(*args)
+    return await loop.run_in_executor(_get_executor(mode), func, *args)
+
+def _shutdown_executors() -> None:
+    """Release the worker pools; already submitted calls still complete."""
+    # Unloaded modules must not stay referenced from the exit hooks
+    atexit.unregister(_shutdown_executors)
+    with _executors_lock:
+        executors = list(_executors.values())
+        _executors.clear()
+    for executor in executors:
+        executor.shutdown(wait=False)
+
+atexit.register(_shutdown_executors)
+
+# Result caches of pure functions
+RESULT_CACHE_SIZE = int(os.getenv("SWAGGERMCP_CACHE_SIZE", "1024"))
+RESULT_CACHE_TTL = float(os.getenv("SWAGGERMCP_CACHE_TTL", "300"))
+
+_MISSING = object()
+
+class _ResultCache:
+    """Bounded LRU of function results whose entries expire after a TTL."""
+    
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key: str) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+                self.expirations += 1
+            self.misses += 1
+            return _MISSING
+    
+    def put(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+    
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {{
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 3) if total else None,
+                "evictions": self.evictions,
+                "expirations": self.expirations
+            }}
+
+_result_caches: Dict[str, _ResultCache] = {{}}
+
+def _cache_key(*args) -> Optional[str]:
+    """Canonical cache key of coerced arguments, or None if they can't be keyed."""
+    try:
+        return json.dumps(args, sort_keys=True, separators=(",", ":"))
+    except (TypeError, ValueError):
+        return None
+
+def get_cache_stats() -> Dict[str, Dict[str, Any]]:
+    """Hit/miss/eviction statistics of every memoized endpoint."""
+    return {{name: cache.stats() for name, cache in _result_caches.items()}}
+
+@app.get("/_cache/stats", include_in_schema=False)
+async def cache_stats():
+    return get_cache_stats()
+
+# Response serialization: each endpoint gets a serializer built for its
+# return annotation that writes the response envelope straight to bytes
+MSGPACK_MEDIA_TYPES = ("application/msgpack", "application/x-msgpack")
+
+_RESPONSES = {{
+    200: {{
+        "description": "Result envelope; msgpack when requested via Accept",
+        "content": {{
+            "application/json": {{"schema": {{"type": "object"}}}},
+            "application/msgpack": {{"schema": {{"type": "string", "format": "binary"}}}}
+        }}
+    }}
+}}
+
+def _jsonable(value: Any) -> Any:
+    """Fallback for values the fast encoders don't handle natively."""
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    if isinstance(value, (memoryview, _typed_array)):
+        return value.tolist()
+    if np is not None and isinstance(value, np.generic):
+        return value.item()
+    return jsonable_encoder(value)
+
+def _orjson_dumps(value: Any, option: int) -> bytes:
+    try:
+        return orjson.dumps(value, default=_jsonable, option=option)
+    except orjson.JSONEncodeError:
+        # orjson refuses integers beyond 64 bits (without calling default=);
+        # the stdlib encoder handles them
+        return json.dumps(value, default=_jsonable, separators=(",", ":")).encode("utf-8")
+
+class _Serializer:
     """
-    Coerce a parameter value to the appropriate type.
+    Encodes ``{{"result": ..., "success": true}}`` for one endpoint.
     
-    Args:
-        value: The value to coerce
-        expected_type: Expected type hint (optional)
+    ``native`` means the return annotation only contains JSON types, so the
+    stdlib fallback can skip its circular-reference checks; ``str_keys``
+    means every dict in the result is keyed by strings, so orjson doesn't
+    need its slower non-string-key mode.
+    """
     
-    Returns:
-        Coerced value
+    def __init__(self, native: bool = False, str_keys: bool = False, array_dtype: Optional[str] = None):
+        # Little-endian dtype of numeric list results, which can also be
+        # returned as binary arrays
+        self.array_dtype = array_dtype
+        if orjson is not None:
+            option = orjson.OPT_SERIALIZE_NUMPY
+            if not str_keys:
+                option |= orjson.OPT_NON_STR_KEYS
+            self.dumps = lambda value: _orjson_dumps(value, option)
+        else:
+            encoder = json.JSONEncoder(
+                ensure_ascii=False,
+                allow_nan=False,
+                check_circular=not native,
+                separators=(",", ":"),
+                default=_jsonable
+            )
+            self.dumps = lambda value: encoder.encode(value).encode("utf-8")
+    
+    def json(self, result: Any) -> bytes:
+        return b'{{"result":' + self.dumps(result) + b',"success":true}}'
+    
+    def msgpack(self, result: Any) -> Optional[bytes]:
+        """The envelope as msgpack, or None if it holds integers beyond 64 bits, which msgpack can't encode."""
+        try:
+            return msgpack.packb({{"result": result, "success": True}}, default=_jsonable, use_bin_type=True)
+        except OverflowError:
+            return None
+    
+    def response(self, request: Request, result: Any) -> Response:
+        """Build the response in the format the client asked for."""
+        accept = request.headers.get("accept", "")
+        if self.array_dtype is not None:
+            media = _binary_accept(accept)
+            if media is not None:
+                return Response(content=_encode_array(result, media, self.array_dtype), media_type=media)
+        if msgpack is not None and any(media in accept for media in MSGPACK_MEDIA_TYPES):
+            content = self.msgpack(result)
+            if content is not None:
+                return Response(content=content, media_type="application/msgpack")
+        return Response(content=self.json(result), media_type="application/json")
+
+_serializers: Dict[str, _Serializer] = {{}}
+
+# Untyped encoder for items and values outside a result envelope
+_default_serializer = _Serializer()
+
+# Request bodies: collection parameters arrive as fields of a JSON object.
+# Bodies are read chunk by chunk and rejected as soon as they exceed the
+# limit (before reading anything when Content-Length already does), then
+# parsed and validated in one pass straight from bytes.
+MAX_BODY_BYTES = int(os.getenv("SWAGGERMCP_MAX_BODY_BYTES", str(64 * 1024 * 1024)))
+MAX_COLLECTION_ITEMS = int(os.getenv("SWAGGERMCP_MAX_COLLECTION_ITEMS", "1000000"))
+
+# Per function: pydantic model of its JSON body
+_body_models = {{}}
+
+_json_loads = orjson.loads if orjson is not None else json.loads
+
+async def _read_body(request: Request, limit: Optional[int] = None) -> bytes:
+    """Read a request body, failing with 413 as soon as it is too large."""
+    limit = limit or MAX_BODY_BYTES
+    length = request.headers.get("content-length", "")
+    if length.isdigit() and int(length) > limit:
+        raise HTTPException(status_code=413, detail=f"Request body exceeds {{limit}} bytes")
+    body = bytearray()
+    async for chunk in request.stream():
+        body += chunk
+        if len(body) > limit:
+            raise HTTPException(status_code=413, detail=f"Request body exceeds {{limit}} bytes")
+    return bytes(body)
+
+async def _read_body_arguments(request: Request, name: str):
     """
-    if value is None:
-        return None
+    Read the body parameters of a function's endpoint.
     
-    # If it's already the right type, return as is
-    if expected_type:
+    JSON bodies are validated against the function's body model. Functions
+    with a single numeric list parameter also take it as a binary array.
+    """
+    media, options = _media_type(request.headers.get("content-type", "application/json"))
+    binary = _binary_params.get(name)
+    if binary is not None and media in BINARY_MEDIA_TYPES:
+        arg, dtype, passing = binary
+        if (media != OCTET_STREAM_MEDIA_TYPE and np is None) or (media == ARROW_MEDIA_TYPE and pa is None):
+            raise HTTPException(status_code=501, detail=f"{{media}} bodies need {{'pyarrow' if np is not None else 'NumPy'}} installed on the server")
+        body = await _read_body(request)
         try:
-            if expected_type == "int" and isinstance(value, (int, str)):
-                return int(value)
-            elif expected_type == "float" and isinstance(value, (int, float, str)):
-                return float(value)
-            elif expected_type == "bool" and isinstance(value, (bool, str)):
-                if isinstance(value, str):
-                    return value.lower() in ("true", "1", "yes", "on")
-                return bool(value)
-            elif expected_type == "str":
-                return str(value)
-            elif expected_type == "list" and isinstance(value, str):
-                return json.loads(value)
-            elif expected_type == "dict" and isinstance(value, str):
-                return json.loads(value)
-        except (ValueError, TypeError, json.JSONDecodeError):
-            pass
+            values = _decode_array(body, media, options, dtype)
+        except (TypeError, ValueError) as e:
+            raise HTTPException(status_code=422, detail=f"Invalid {{media}} body: {{e}}") from None
+        if len(values) > MAX_COLLECTION_ITEMS:
+            raise HTTPException(status_code=422, detail=f"Array exceeds {{MAX_COLLECTION_ITEMS}} items")
+        return types.SimpleNamespace(**{{arg: _pass_array(values, passing)}})
     
-    # Fallback coercion
+    if "json" not in media:
+        raise HTTPException(status_code=415, detail="Request body must be JSON")
+    body = await _read_body(request)
     try:
-        # Try int
-        if isinstance(value, str) and value.replace("-", "").replace(".", "").isdigit():
-            if "." in value:
-                return float(value)
-            return int(value)
-    except (ValueError, TypeError):
-        pass
+        return _body_models[name].model_validate_json(body or b"{{}}")
+    except ValidationError as e:
+        # Leave out the offending input: it can be the whole (large) body
+        errors = [dict(error, loc=("body",) + tuple(error["loc"])) for error in e.errors(include_url=False, include_input=False)]
+        raise HTTPException(status_code=422, detail=jsonable_encoder(errors)) from None
+
+def _body_openapi(name: str) -> Dict[str, Any]:
+    """OpenAPI request body of a function's endpoint, from its body model."""
+    schema = _body_models[name].model_json_schema()
+    content = {{"application/json": {{"schema": schema}}}}
+    if name in _binary_params:
+        for media in BINARY_MEDIA_TYPES:
+            content[media] = {{"schema": {{"type": "string", "format": "binary"}}}}
+    return {{
+        "requestBody": {{
+            "required": bool(schema.get("required")),
+            "content": content
+        }}
+    }}
+
+# Binary arrays: a function's single numeric list parameter can be sent, and
+# numeric list results returned, as packed little-endian values
+# (application/octet-stream; the dtype comes from the annotation or a
+# "dtype" media type parameter), as .npy or as Arrow IPC (needs pyarrow).
+# Bodies are decoded into read-only views without building Python lists.
+OCTET_STREAM_MEDIA_TYPE = "application/octet-stream"
+NPY_MEDIA_TYPE = "application/x-npy"
+ARROW_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+BINARY_MEDIA_TYPES = (OCTET_STREAM_MEDIA_TYPE, NPY_MEDIA_TYPE, ARROW_MEDIA_TYPE)
+
+# Per function: (parameter name, default dtype, how the values are passed:
+# "view" for read-only use, "array" to cross process boundaries, "list" to mutate)
+_binary_params = {{}}
+
+# Little-endian dtypes and their struct/array type codes
+_ARRAY_CODES = {{
+    "<f8": "d", "<f4": "f", "<i8": "q", "<i4": "i", "<i2": "h", "<i1": "b",
+    "<u8": "Q", "<u4": "I", "<u2": "H", "<u1": "B"
+}}
+_DTYPE_NAMES = {{
+    "float64": "<f8", "float32": "<f4", "int64": "<i8", "int32": "<i4", "int16": "<i2", "int8": "<i1",
+    "uint64": "<u8", "uint32": "<u4", "uint16": "<u2", "uint8": "<u1"
+}}
+# Array kinds a parameter of each annotated dtype accepts
+_ARRAY_KINDS = {{"<i8": "iu", "<f8": "f"}}
+
+_ARRAY_RESPONSES = {{
+    200: {{
+        "description": "Result envelope, or the result as a binary array when requested via Accept",
+        "content": dict(
+            _RESPONSES[200]["content"],
+            **{{media: {{"schema": {{"type": "string", "format": "binary"}}}} for media in BINARY_MEDIA_TYPES}}
+        )
+    }}
+}}
+
+def _media_type(header: str) -> Tuple[str, Dict[str, str]]:
+    """Split a Content-Type header into the media type and its parameters."""
+    media, _, rest = header.partition(";")
+    options = {{}}
+    for part in rest.split(";"):
+        key, _, value = part.partition("=")
+        if key.strip():
+            options[key.strip().lower()] = value.strip().strip('"')
+    return media.strip().lower(), options
+
+def _binary_accept(accept: str) -> Optional[str]:
+    """The binary array format named in an Accept header, if it can be produced."""
+    for media in BINARY_MEDIA_TYPES:
+        if media in accept:
+            if media == ARROW_MEDIA_TYPE and pa is None:
+                continue
+            if media == NPY_MEDIA_TYPE and np is None:
+                continue
+            return media
+    return None
+
+def _decode_array(body: bytes, media: str, options: Dict[str, str], dtype: str):
+    """
+    Decode a binary array body into a read-only view of Python numbers.
+    
+    ``dtype`` is the parameter's; arrays of another size of the same kind
+    (e.g. int32 for a List[int]) are accepted, other kinds are not.
+    """
+    kinds = _ARRAY_KINDS[dtype]
+    if media == OCTET_STREAM_MEDIA_TYPE:
+        requested = options.get("dtype")
+        actual = _DTYPE_NAMES.get(requested, requested) if requested else dtype
+        code = _ARRAY_CODES.get(actual)
+        if code is None:
+            raise ValueError(f"unsupported dtype {{requested!r}}")
+        if actual[1] not in kinds:
+            raise ValueError(f"dtype {{requested}} doesn't match the parameter's {{dtype}} items")
+        if len(body) % _typed_array(code).itemsize:
+            raise ValueError(f"body length is not a multiple of the {{actual}} item size")
+        if sys.byteorder == "little":
+            return memoryview(body).cast(code)
+        values = _typed_array(code, body)
+        values.byteswap()
+        return memoryview(values).toreadonly()
+    
+    if media == NPY_MEDIA_TYPE:
+        stream = io.BytesIO(body)
+        version = np.lib.format.read_magic(stream)
+        if version == (1, 0):
+            shape, fortran_order, array_dtype = np.lib.format.read_array_header_1_0(stream)
+        else:
+            shape, fortran_order, array_dtype = np.lib.format.read_array_header_2_0(stream)
+        if len(shape) != 1:
+            raise ValueError(f"expected a 1-d array, got shape {{shape}}")
+        values = np.frombuffer(body, dtype=array_dtype, count=shape[0], offset=stream.tell())
+    else:
+        table = pa.ipc.open_stream(pa.py_buffer(body)).read_all()
+        values = table.column(0).combine_chunks().to_numpy(zero_copy_only=True)
+    
+    # Only dtypes with a memoryview/array type code can be passed on (not float16, say)
+    if (values.dtype.kind not in kinds
+            or f"<{{values.dtype.kind}}{{values.dtype.itemsize}}" not in _ARRAY_CODES):
+        raise ValueError(f"unsupported dtype {{values.dtype}} for the parameter's {{dtype}} items")
+    if not values.dtype.isnative:
+        values = values.astype(values.dtype.newbyteorder("="))
+    return memoryview(values).toreadonly()
+
+def _pass_array(values: memoryview, passing: str):
+    """Hand decoded values to a function in the form it can use."""
+    if passing == "view":
+        return values
+    if passing == "array":
+        # Pickles as one bytes blob for the process pool
+        typed = _typed_array(values.format[-1])
+        typed.frombytes(values.cast("B"))
+        return typed
+    return values.tolist()
+
+def _encode_array(result: Any, media: str, dtype: str) -> bytes:
+    """Encode a numeric sequence as a binary array."""
+    if media == OCTET_STREAM_MEDIA_TYPE and np is None:
+        values = _typed_array(_ARRAY_CODES[dtype], result)
+        if sys.byteorder != "little":
+            values.byteswap()
+        return values.tobytes()
+    values = np.asarray(result, dtype=dtype)
+    if media == OCTET_STREAM_MEDIA_TYPE:
+        return values.tobytes()
+    if media == NPY_MEDIA_TYPE:
+        buffer = io.BytesIO()
+        np.lib.format.write_array(buffer, values, allow_pickle=False)
+        return buffer.getvalue()
+    batch = pa.record_batch([pa.array(values)], names=["result"])
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, batch.schema) as writer:
+        writer.write_batch(batch)
+    return sink.getvalue().to_pybytes()
+
+# Batch invocation: POST /{{name}}/batch with a JSON array of argument sets
+MAX_BATCH_SIZE = int(os.getenv("SWAGGERMCP_MAX_BATCH_SIZE", "10000"))
+
+_BATCH_OPENAPI = {{
+    "requestBody": {{
+        "required": True,
+        "content": {{
+            "application/json": {{
+                "schema": {{
+                    "type": "array",
+                    "description": "Argument sets: objects keyed by parameter name, or positional arrays",
+                    "items": {{"oneOf": [{{"type": "object"}}, {{"type": "array"}}]}}
+                }}
+            }}
+        }}
+    }}
+}}
+
+# Per function: (argument names, converter per argument, default values)
+_batch_signatures = {{}}
+
+def _bind_arguments(item: Any, arg_names, converters, defaults) -> tuple:
+    """Turn one batch item into positional call arguments."""
+    if isinstance(item, list):
+        if len(item) > len(arg_names):
+            raise TypeError(f"expected at most {{len(arg_names)}} arguments, got {{len(item)}}")
+        item = dict(zip(arg_names, item))
+    if not isinstance(item, dict):
+        raise TypeError("each item must be an object or an array of arguments")
+    
+    unknown = set(item) - set(arg_names)
+    if unknown:
+        raise TypeError(f"unexpected argument(s): {{', '.join(sorted(unknown))}}")
+    
+    values = []
+    for arg in arg_names:
+        if item.get(arg) is not None:
+            values.append(converters[arg](item[arg]))
+        elif arg in defaults:
+            values.append(defaults[arg])
+        else:
+            raise TypeError(f"missing argument: {{arg}}")
+    return tuple(values)
+
+def _call_many(func, arg_sets) -> list:
+    """Call a function once per argument tuple, capturing per-call errors."""
+    outcomes = []
+    for args in arg_sets:
+        try:
+            outcomes.append((True, func(*args)))
+        except Exception as e:
+            outcomes.append((False, str(e)))
+    return outcomes
+
+async def _run_batch(name: str, mode: str, func, items: list, parallel: bool = False,
+                     chunk_size: Optional[int] = None) -> Dict[str, Any]:
+    """Run a batch in input order; cached results and bad items skip the call."""
+    results: List[Any] = [None] * len(items)
+    cache = _result_caches.get(name)
+    pending = []
+    
+    for index, item in enumerate(items):
+        try:
+            args = _bind_arguments(item, *_batch_signatures[name])
+        except (TypeError, ValueError) as e:
+            results[index] = {{"error": str(e), "success": False}}
+            continue
+        key = _cache_key(*args) if cache is not None else None
+        if key is not None:
+            value = cache.get(key)
+            if value is not _MISSING:
+                results[index] = {{"result": value, "success": True}}
+                continue
+        pending.append((index, args, key))
     
+    if pending:
+        arg_sets = [args for _, args, _ in pending]
+        if parallel:
+            # One task per chunk amortizes pickling and IPC over many calls
+            size = chunk_size if chunk_size is not None else max(1, -(-len(arg_sets) // PROCESS_POOL_SIZE))
+            loop = asyncio.get_running_loop()
+            if not _user_init_done:
+                # As in _run: before the pool forks, so workers inherit the result
+                await loop.run_in_executor(_get_executor("thread"), _ensure_user_init)
+            executor = _get_executor("process")
+            chunks = await asyncio.gather(*(
+                loop.run_in_executor(executor, _call_many, func, arg_sets[start:start + size])
+                for start in range(0, len(arg_sets), size)
+            ))
+            outcomes = [outcome for chunk in chunks for outcome in chunk]
+        else:
+            outcomes = await _run(mode, _call_many, func, arg_sets)
+        
+        for (index, _, key), (ok, value) in zip(pending, outcomes):
+            if ok:
+                results[index] = {{"result": value, "success": True}}
+                if key is not None:
+                    cache.put(key, value)
+            else:
+                results[index] = {{"error": value, "success": False}}
+    
+    errors = sum(1 for result in results if not result["success"])
+    return {{"results": results, "count": len(results), "errors": errors, "success": True}}
+
+def _collect(func, *args) -> list:
+    """Call a generator function and gather everything it yields."""
+    return list(func(*args))
+
+# Streaming invocation: POST /{{name}}/stream, items are sent as they are produced
+STREAM_BUFFER_ITEMS = int(os.getenv("SWAGGERMCP_STREAM_BUFFER", "1024"))
+
+_STREAM_END = object()
+
+class _StreamCancelled(Exception):
+    """Raised inside a producer once its client has gone away."""
+
+class _StreamSink:
+    """
+    List stand-in handed to streaming variants: every append is encoded and
+    queued for the client right away. At most STREAM_BUFFER_ITEMS items are
+    in flight, so a slow client pauses the producer instead of growing memory.
+    """
+    
+    def __init__(self, loop, queue: "asyncio.Queue", encode):
+        self._loop = loop
+        self._queue = queue
+        self._encode = encode
+        self._slots = threading.BoundedSemaphore(STREAM_BUFFER_ITEMS)
+        self.cancelled = threading.Event()
+    
+    def append(self, item: Any) -> None:
+        data = self._encode(item)
+        while not self._slots.acquire(timeout=0.5):
+            if self.cancelled.is_set():
+                raise _StreamCancelled()
+        if self.cancelled.is_set():
+            raise _StreamCancelled()
+        self._loop.call_soon_threadsafe(self._queue.put_nowait, data)
+    
+    def close(self, error: Optional[str] = None) -> None:
+        self._loop.call_soon_threadsafe(self._queue.put_nowait, (_STREAM_END, error))
+    
+    def release(self, count: int) -> None:
+        for _ in range(count):
+            self._slots.release()
+
+def _produce(sink: _StreamSink, kind: str, func, args: tuple) -> None:
+    """Run a user function in a worker thread, feeding its items to the sink."""
+    error = None
+    _ensure_user_init()
     try:
-        # Try bool
-        if isinstance(value, str):
-            if value.lower() in ("true", "false", "1", "0", "yes", "no"):
-                return value.lower() in ("true", "1", "yes")
-    except (ValueError, TypeError):
+        if kind == "accumulator":
+            func(sink, *args)
+        else:
+            for item in func(*args):
+                sink.append(item)
+    except _StreamCancelled:
         pass
+    except Exception as e:
+        error = str(e)
+    finally:
+        sink.close(error)
+
+def _stream_response(kind: str, func, args: tuple, media: str) -> StreamingResponse:
+    """Stream a function's items as NDJSON lines or as one chunked JSON document."""
+    loop = asyncio.get_running_loop()
+    queue = asyncio.Queue()
+    ndjson = media == "ndjson"
+    separator = b"\\n" if ndjson else b","
+    sink = _StreamSink(loop, queue, _default_serializer.dumps)
+    
+    async def body():
+        producer = loop.run_in_executor(_get_executor("thread"), _produce, sink, kind, func, args)
+        first = True
+        if not ndjson:
+            yield b'{{"result":['
+        try:
+            while True:
+                # Send everything produced so far as one chunk
+                items = [await queue.get()]
+                while not queue.empty():
+                    items.append(queue.get_nowait())
+                end = items[-1] if isinstance(items[-1], tuple) else None
+                data = [item for item in items if not isinstance(item, tuple)]
+                if data:
+                    sink.release(len(data))
+                    if ndjson:
+                        yield separator.join(data) + separator
+                    else:
+                        yield (b"" if first else separator) + separator.join(data)
+                    first = False
+                if end is not None:
+                    error = end[1]
+                    if ndjson:
+                        if error is not None:
+                            yield json.dumps({{"error": error, "success": False}}).encode("utf-8") + b"\\n"
+                    elif error is not None:
+                        yield b'],"error":' + json.dumps(error).encode("utf-8") + b',"success":false}}'
+                    else:
+                        yield b'],"success":true}}'
+                    break
+        finally:
+            # Client disconnects close this generator; the producer stops at
+            # its next append instead of computing results nobody reads
+            sink.cancelled.set()
     
+    media_type = "application/x-ndjson" if ndjson else "application/json"
+    return StreamingResponse(body(), media_type=media_type)
+
+def _stream_media(request: Request, format: Optional[str]) -> str:
+    """Pick the stream format from ?format= or the Accept header (NDJSON by default)."""
+    if format in ("ndjson", "json"):
+        return format
+    accept = request.headers.get("accept", "")
+    if "application/json" in accept and "ndjson" not in accept:
+        return "json"
+    return "ndjson"
+
+# Vectorized invocation: POST /{{name}}/vectorized with one array per parameter
+def elementwise(func):
+    """Mark a function as elementwise so it also gets a vectorized endpoint."""
+    return func
+
+_VECTORIZED_OPENAPI = {{
+    "requestBody": {{
+        "required": True,
+        "content": {{
+            "application/json": {{
+                "schema": {{
+                    "type": "object",
+                    "description": "One array (column) per parameter; scalars are broadcast",
+                    "additionalProperties": True
+                }}
+            }}
+        }}
+    }}
+}}
+
+# math functions and their elementwise NumPy equivalents
+_NUMPY_MATH = {{
+    "sqrt": "sqrt", "exp": "exp", "expm1": "expm1", "log": "log", "log2": "log2",
+    "log10": "log10", "log1p": "log1p", "sin": "sin", "cos": "cos", "tan": "tan",
+    "asin": "arcsin", "acos": "arccos", "atan": "arctan", "atan2": "arctan2",
+    "sinh": "sinh", "cosh": "cosh", "tanh": "tanh", "hypot": "hypot", "fabs": "fabs",
+    "floor": "floor", "ceil": "ceil", "trunc": "trunc", "pow": "power",
+    "degrees": "degrees", "radians": "radians", "copysign": "copysign", "fmod": "fmod",
+    "isnan": "isnan", "isinf": "isinf", "isfinite": "isfinite"
+}}
+
+# Per function: (argument names, names of numeric array parameters)
+_vector_signatures = {{}}
+_vectorized_variants = {{}}
+
+def _numpy_math_namespace():
+    """A stand-in for the math module whose functions work on arrays."""
+    namespace = {{name: getattr(math, name) for name in dir(math) if not name.startswith("_")}}
+    for name, numpy_name in _NUMPY_MATH.items():
+        namespace[name] = getattr(np, numpy_name)
+    return types.SimpleNamespace(**namespace)
+
+def _vectorized_variant(func):
+    """Copy of a function whose math module and math functions are NumPy's."""
+    if isinstance(func, _LazyFunction):
+        func = func.load()
+    variant = _vectorized_variants.get(func)
+    if variant is None:
+        numpy_math = _numpy_math_namespace()
+        env = dict(func.__globals__)
+        for key, value in func.__globals__.items():
+            if value is math:
+                env[key] = numpy_math
+            elif getattr(value, "__module__", None) == "math" and getattr(value, "__name__", "") in _NUMPY_MATH:
+                env[key] = getattr(np, _NUMPY_MATH[value.__name__])
+        variant = types.FunctionType(func.__code__, env, func.__name__, func.__defaults__, func.__closure__)
+        _vectorized_variants[func] = variant
+    return variant
+
+def _call_vectorized(func, args) -> tuple:
+    """
+    Evaluate a function over array arguments in one call.
+    
+    Returns (result list, strategy). Bodies that branch on values, raise
+    floating point errors or overflow int64 fall back to evaluating the
+    original function element by element, which keeps scalar semantics.
+    """
     try:
-        # Try JSON
-        if isinstance(value, str) and (value.startswith("[") or value.startswith("{")):
-            return json.loads(value)
-    except (ValueError, TypeError, json.JSONDecodeError):
+        with np.errstate(divide="raise", invalid="raise", over="raise"):
+            result = np.asarray(_vectorized_variant(func)(*args))
+            if result.dtype.kind in "iu":
+                # Integer NumPy arithmetic wraps silently; recheck in float
+                as_float = _vectorized_variant(func)(*(
+                    arg.astype(np.float64) if isinstance(arg, np.ndarray) else arg for arg in args
+                ))
+                if np.any(np.abs(as_float) >= 2.0 ** 62):
+                    raise OverflowError("int64 overflow")
+        return result.tolist(), "vectorized"
+    except (TypeError, ValueError, ArithmeticError):
+        elementwise_func = np.frompyfunc(func, len(args), 1)
+        return np.asarray(elementwise_func(*args)).tolist(), "elementwise"
+
+def _bind_columns(name: str, columns: Dict[str, Any]) -> tuple:
+    """Turn a JSON object of columns into call arguments (arrays or scalars)."""
+    arg_names, numeric = _vector_signatures[name]
+    _, converters, defaults = _batch_signatures[name]
+    unknown = set(columns) - set(arg_names)
+    if unknown:
+        raise TypeError(f"unexpected argument(s): {{', '.join(sorted(unknown))}}")
+    
+    args = []
+    for arg in arg_names:
+        if columns.get(arg) is not None:
+            value = columns[arg]
+        elif arg in defaults:
+            value = defaults[arg]
+        else:
+            raise TypeError(f"missing argument: {{arg}}")
+        if arg in numeric or isinstance(value, list):
+            dtype = np.int64 if converters[arg] is _to_int else np.float64
+            value = np.asarray(value, dtype=dtype)
+        else:
+            value = converters[arg](value)
+        args.append(value)
+    
+    # Fail early on columns that don't broadcast together
+    np.broadcast_shapes(*(np.shape(arg) for arg in args if isinstance(arg, np.ndarray)))
+    return tuple(args)
+
+# Parameter converters: the generator picks one per parameter from its
+# annotation, so each request makes a single direct call per argument
+_TRUE_STRINGS = frozenset(("true", "1", "yes", "on"))
+_FALSE_STRINGS = frozenset(("false", "0", "no", "off"))
+
+def _to_int(value: Any) -> int:
+    return value if type(value) is int else int(value)
+
+def _to_float(value: Any) -> float:
+    return value if type(value) is float else float(value)
+
+def _to_bool(value: Any) -> bool:
+    if type(value) is bool:
+        return value
+    if isinstance(value, str):
+        return value.lower() in _TRUE_STRINGS
+    return bool(value)
+
+def _to_str(value: Any) -> str:
+    return value if type(value) is str else str(value)
+
+def _validator(annotation: Any, json_text: bool = False):
+    """
+    Build a converter that validates (and coerces) values of an annotation.
+    
+    With json_text, strings are parsed as JSON documents of the type, which is
+    how structured values are written in query strings and batch items.
+    """
+    adapter = TypeAdapter(annotation)
+    
+    def validate(value: Any) -> Any:
+        try:
+            if json_text and isinstance(value, str):
+                return adapter.validate_json(value)
+            return adapter.validate_python(value)
+        except ValidationError as e:
+            # Report the first problem in one line instead of pydantic's report
+            error = e.errors()[0]
+            location = ".".join(str(part) for part in error["loc"])
+            raise ValueError(f"{{error['msg']}} at {{location}}" if location else error["msg"]) from None
+    return validate
+
+def _infer(value: Any) -> Any:
+    """Best-effort conversion of a string for parameters without a usable annotation."""
+    if not isinstance(value, str):
+        return value
+    try:
+        return int(value)
+    except ValueError:
+        pass
+    try:
+        number = float(value)
+        # Keep "nan"/"inf" as text
+        if math.isfinite(number):
+            return number
+    except ValueError:
         pass
+    lowered = value.lower()
+    if lowered in _TRUE_STRINGS:
+        return True
+    if lowered in _FALSE_STRINGS:
+        return False
+    if value[:1] in ("[", "{{"):
+        try:
+            return json.loads(value)
+        except ValueError:
+            pass
+    return value
+
+# Route dispatch: Starlette tries every route in order, so with thousands of
+# generated endpoints each request pays for thousands of regex matches
+ROUTE_DISPATCH = os.getenv("SWAGGERMCP_ROUTE_DISPATCH", "true").lower() == "true"
+
+class _RouteDispatcher:
+    """
+    Router front that resolves parameterless paths with one dict lookup.
+    
+    Anything else (path parameters, mounts, unknown paths, methods that
+    answer 405, slash redirects) falls through to the router's own scan.
+    A static route is only indexed if no route before it could match its
+    path, so the first-match order of the route list is kept.
+    """
+    
+    def __init__(self, router, fallback):
+        self.router = router
+        self.fallback = fallback
+        self._routes = None
+        self._size = -1
+        self._table = {{}}
+    
+    def _index(self, routes) -> None:
+        table = {{}}
+        dynamic = []
+        for route in routes:
+            if isinstance(route, Route) and not route.param_convertors and route.methods:
+                # Routes without a path pattern (hosts) may match anything
+                if not any(pattern is None or pattern.match(route.path)
+                           for pattern in (getattr(other, "path_regex", None) for other in dynamic)):
+                    for method in route.methods:
+                        table.setdefault((route.path, method), route)
+            else:
+                dynamic.append(route)
+        self._table = table
+        self._routes = routes
+        self._size = len(routes)
+    
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] == "http":
+            routes = self.router.routes
+            # Hot swaps replace the list; additions grow it
+            if routes is not self._routes or len(routes) != self._size:
+                self._index(routes)
+            route = self._table.get((_route_path(scope), scope["method"]))
+            if route is not None:
+                match, child_scope = route.matches(scope)
+                if match is Match.FULL:
+                    scope.setdefault("router", self.router)
+                    scope["route"] = route
+                    scope.update(child_scope)
+                    await route.handle(scope, receive, send)
+                    return
+        await self.fallback(scope, receive, send)
+
+def install_route_dispatch(target: FastAPI) -> None:
+    """Put a dict-lookup dispatcher in front of an app's router (once)."""
+    stack = target.router.middleware_stack
+    if not isinstance(stack, _RouteDispatcher):
+        target.router.middleware_stack = _RouteDispatcher(target.router, stack)
+
+# Top-level computations of the user module deferred by tree shaking run
+# in _user_module_init, once, before the first call
+_user_module_init = None
+_user_init_done = False
+_user_init_lock = threading.Lock()
+_user_code_stats = {{"import_ms": None, "init_ms": None, "init_error": None, "treeshake": {treeshake_report}}}
+
+def _ensure_user_init() -> None:
+    """Run the user module's deferred top-level statements once."""
+    global _user_init_done
+    with _user_init_lock:
+        if _user_init_done:
+            return
+        started = time.perf_counter()
+        try:
+            if _user_module_init is not None:
+                _user_module_init()
+        except Exception as e:
+            # Recorded rather than raised so functions not relying on the
+            # failed statement keep working
+            _user_code_stats["init_error"] = f"{{type(e).__name__}}: {{e}}"
+            logger.warning(f"Deferred user module statements failed: {{e}}")
+        _user_code_stats["init_ms"] = round((time.perf_counter() - started) * 1000, 3)
+        _user_init_done = True
+
+# Lazily loaded user functions: each exposed function's source, with the
+# helpers, imports and constants it needs, becomes its own module on first call
+_lazy_sources: Dict[str, str] = {{}}
+_lazy_modules: Dict[str, types.ModuleType] = {{}}
+_lazy_locks: Dict[str, threading.Lock] = {{}}
+_lazy_load_ms: Dict[str, float] = {{}}
+
+def _register_lazy(name: str, source: str) -> None:
+    _lazy_sources[name] = source
+    _lazy_locks[name] = threading.Lock()
+    # Re-registered by a patch: the next call loads the new source
+    _lazy_modules.pop(name, None)
+    _lazy_load_ms.pop(name, None)
+
+def _load_user_module(name: str) -> types.ModuleType:
+    """Get (compiling and running on first use) the module of one user function."""
+    module = _lazy_modules.get(name)
+    if module is None:
+        # Concurrent first calls wait for one import instead of repeating it
+        with _lazy_locks[name]:
+            module = _lazy_modules.get(name)
+            if module is None:
+                started = time.perf_counter()
+                module = types.ModuleType(f"{{__name__}}.{{name}}")
+                module.elementwise = elementwise
+                exec(compile(_lazy_sources[name], module.__name__, "exec"), module.__dict__)
+                init = module.__dict__.get("_user_module_init")
+                if init is not None:
+                    init()
+                _lazy_load_ms[name] = round((time.perf_counter() - started) * 1000, 3)
+                _lazy_modules[name] = module
+    return module
+
+class _LazyFunction:
+    """Stand-in for a user function whose module is loaded on first call."""
+    
+    def __init__(self, module: str, attr: str):
+        self.module = module
+        self.attr = attr
+        self.__name__ = attr
+        self._func = None
+    
+    def load(self):
+        if self._func is None:
+            self._func = getattr(_load_user_module(self.module), self.attr)
+        return self._func
+    
+    def __call__(self, *args):
+        return self.load()(*args)
     
-    # Return as string
-    return str(value)
+    def __reduce__(self):
+        # Process workers get a fresh stand-in and load the module themselves
+        return (_LazyFunction, (self.module, self.attr))
+
+def get_user_code_stats() -> Dict[str, Any]:
+    """Import and deferred-init timings of the user code, and what tree shaking did."""
+    stats = dict(_user_code_stats)
+    if _lazy_sources:
+        stats["lazy"] = {{"functions": len(_lazy_sources), "loaded": dict(_lazy_load_ms)}}
+    return stats
+
+@app.get("/_user_code/stats", include_in_schema=False)
+async def user_code_stats():
+    return get_user_code_stats()
+
+# Per-function state an endpoint's code (re)registers
+_FUNCTION_REGISTRIES = (_result_caches, _serializers, _body_models, _binary_params,
+                        _batch_signatures, _vector_signatures)
+
+def apply_function_patch(code, names: List[str]) -> Tuple[List[Any], List[Any]]:
+    """
+    Redefine some functions of this live app, replacing only their routes.
+    
+    ``code`` is compiled from ``generate_function_patch_source``; ``names``
+    are the functions it redefines plus the ones dropped. Endpoints of the
+    other functions keep their routes, result caches and thread pools. If
+    the patch raises, the app is left as it was.
+    
+    Returns:
+        Tuple of (routes removed, routes added), for mounting elsewhere
+    """
+    global router
+    # Old deferred statements must not run after, and overwrite, new ones
+    _ensure_user_init()
+    namespace = globals()
+    saved_globals = dict(namespace)
+    registries = _FUNCTION_REGISTRIES + (_function_fingerprints, _lazy_sources, _lazy_locks,
+                                         _lazy_modules, _lazy_load_ms)
+    saved = [(registry, dict(registry)) for registry in registries]
+    app_router = router
+    try:
+        for name in names:
+            for registry in _FUNCTION_REGISTRIES + (_function_fingerprints,):
+                registry.pop(name, None)
+        router = APIRouter()
+        exec(code, namespace)
+        added = router.routes
+        init = namespace.pop("_function_patch_init", None)
+    except BaseException:
+        # Restored key by key: concurrent requests must never see a name missing
+        for mapping, contents in [(namespace, saved_globals)] + saved:
+            for key in [key for key in mapping if key not in contents]:
+                del mapping[key]
+            mapping.update(contents)
+        raise
+    finally:
+        router = app_router
+    
+    if init is not None:
+        try:
+            init()
+        except Exception as e:
+            # As for _user_module_init: recorded, other functions keep working
+            _user_code_stats["init_error"] = f"{{type(e).__name__}}: {{e}}"
+            logger.warning(f"Deferred statements of patched functions failed: {{e}}")
+    for func in [func for func in _vectorized_variants if getattr(func, "__name__", None) in names]:
+        del _vectorized_variants[func]
+    
+    paths = {{f"/{{name}}" for name in names}}
+    prefixes = tuple(f"/{{name}}/" for name in names)
+    removed = [route for route in router.routes
+               if getattr(route, "path", None) in paths or getattr(route, "path", "").startswith(prefixes)]
+    dropped = {{id(route) for route in removed}}
+    # New lists rather than in-place edits, so requests iterating the old ones finish undisturbed
+    router.routes = [route for route in router.routes if id(route) not in dropped] + added
+    app.router.routes = [route for route in app.router.routes if id(route) not in dropped] + added
+    app.openapi_schema = None
+    
+    # Forked workers hold the old definitions; new calls go to a fresh pool
+    with _executors_lock:
+        executor = _executors.pop("process", None)
+    if executor is not None:
+        executor.shutdown(wait=False)
+    return removed, added
 
 # User functions
-{user_functions}
+_user_code_started = time.perf_counter()
+'''
 
-# Generated endpoints
-{endpoints}
+# Emitted after the user functions, closing the timing FASTAPI_TEMPLATE starts
+USER_CODE_FOOTER = '''
+_user_code_stats["import_ms"] = round((time.perf_counter() - _user_code_started) * 1000, 3)
 '''
 
+# First line of each router shard; generated sources are split there to be
+# compiled in parallel (see ``compile_generated_source``)
+SHARD_MARKER = "# === Router shard"
+
+SHARD_TEMPLATE = '''
+{marker} {number}/{count} ===
+router = _shard_routers[{index}]
+'''
+
+FASTAPI_FOOTER = '''
+# Router holding the generated endpoints (hot-mountable into other apps);
+# shard routes are moved into it, not rebuilt
+router = APIRouter()
+for _shard_router in _shard_routers:
+    router.routes.extend(_shard_router.routes)
+
+# The app serves the same route objects, so they sit flat in its route list
+app.router.routes.extend(router.routes)
+if ROUTE_DISPATCH:
+    install_route_dispatch(app)
+'''
+
+# What the app was generated from; a deploy whose app fingerprint matches
+# only redefines the functions whose fingerprints changed (see
+# ``generate_function_patch_source``)
+FINGERPRINT_TEMPLATE = '''
+_app_fingerprint = "{app_fingerprint}"
+_function_fingerprints = {function_fingerprints}
+'''
+
+
+def _converter_code(spec: TypeSpec) -> str:
+    """
+    Code of the converter the generated app applies to a JSON or text value.
+    
+    Args:
+        spec: Resolved parameter type
+        
+    Returns:
+        A scalar converter name, ``_infer`` for untyped parameters, or a
+        ``_validator(...)`` call that builds a pydantic validator once
+    """
+    if spec.kind == "any":
+        return "_infer"
+    # None means "not given" and is handled by the caller
+    spec = spec.without_none()
+    if spec.kind in SCALAR_CONVERTERS:
+        return SCALAR_CONVERTERS[spec.kind]
+    if spec.is_collection:
+        return f"_validator({type_source(spec)}, json_text=True)"
+    return f"_validator({type_source(spec)})"
+
+
+def _body_parameters(func_def: Dict[str, Any]) -> List[str]:
+    """Names of the parameters a function's endpoints read from the JSON body (its collections)."""
+    type_hints = func_def.get("type_hints", {})
+    return [arg for arg in func_def.get("args", []) if resolve_annotation(type_hints.get(arg)).is_collection]
+
+
+def _generate_body_model_code(func_def: Dict[str, Any]) -> str:
+    """
+    Generate the pydantic model of a function's JSON body.
+    
+    Top-level lists, sets, tuples and dicts are capped at
+    ``MAX_COLLECTION_ITEMS``, so oversized payloads fail while being parsed.
+    
+    Args:
+        func_def: Function definition dictionary
+        
+    Returns:
+        Code registering the model in ``_body_models``, or an empty string
+        if the function has no collection parameters
+    """
+    name = func_def["name"]
+    type_hints = func_def.get("type_hints", {})
+    defaults = func_def.get("defaults", {})
+    
+    fields = []
+    for arg in _body_parameters(func_def):
+        spec = resolve_annotation(type_hints.get(arg))
+        field_type = type_source(spec)
+        if spec.without_none().kind in COLLECTION_KINDS:
+            field_type = f"Annotated[{type_source(spec.without_none())}, Field(max_length=MAX_COLLECTION_ITEMS)]"
+            if spec.optional:
+                field_type = f"Optional[{field_type}]"
+        # Omitted optional fields are None and replaced by the function's default
+        fields.append(f"{arg}=({field_type}, {'None' if arg in defaults else '...'})")
+    
+    if not fields:
+        return ""
+    return f'_body_models["{name}"] = create_model("{name}_body", {", ".join(fields)})\n'
+
+
+def _array_dtype(spec: TypeSpec) -> Optional[str]:
+    """Little-endian dtype of a list or ``Tuple[X, ...]`` of ints or floats, if it is one."""
+    spec = spec.without_none()
+    if spec.kind == "list" or (spec.kind == "tuple" and spec.variadic):
+        return ARRAY_DTYPES.get(spec.args[0].kind)
+    return None
+
+
+def _generate_binary_code(func_def: Dict[str, Any], execution_mode: str = DEFAULT_EXECUTION_MODE) -> str:
+    """
+    Generate the registration that lets a function take a binary array body.
+    
+    Only functions whose sole body parameter is a numeric list qualify. The
+    decoded values are passed as a zero-copy ``memoryview`` when the parser
+    found the parameter is only read (``readonly_args``) and the function
+    runs in this process, as an ``array.array`` to cross into the process
+    pool, and as a list otherwise.
+    
+    Args:
+        func_def: Function definition dictionary
+        execution_mode: Where the endpoint runs the function
+        
+    Returns:
+        Code registering the parameter in ``_binary_params``, or an empty
+        string if the function doesn't qualify
+    """
+    body_args = _body_parameters(func_def)
+    if len(body_args) != 1:
+        return ""
+    arg = body_args[0]
+    dtype = _array_dtype(resolve_annotation(func_def.get("type_hints", {}).get(arg)))
+    if dtype is None:
+        return ""
+    
+    if arg not in func_def.get("readonly_args", []):
+        passing = "list"
+    elif execution_mode == "process":
+        passing = "array"
+    else:
+        passing = "view"
+    return f'_binary_params["{func_def["name"]}"] = ("{arg}", "{dtype}", "{passing}")\n'
+
 
 def _generate_parameter_handling(func_def: Dict[str, Any]) -> Tuple[str, str]:
     """
     Generate parameter handling code for a function.
     
+    Each parameter's annotation is resolved into a type once, here. Scalar
+    parameters become typed query parameters that FastAPI validates.
+    Collections are fields of a JSON body that the endpoint reads with
+    ``_read_body_arguments`` (size-limited, validated in one pass against
+    the model from ``_generate_body_model_code``, or decoded from a binary
+    array, see ``_generate_binary_code``), which requires an
+    ``http_request`` parameter. Only unannotated parameters are converted
+    by the endpoint.
+    
     Args:
         func_def: Function definition dictionary
         
@@ -121,44 +1328,40 @@ def _generate_parameter_handling(func_def: Dict[str, Any]) -> Tuple[str, str]:
     args = func_def.get("args", [])
     type_hints = func_def.get("type_hints", {})
     defaults = func_def.get("defaults", {})
+    body_args = _body_parameters(func_def)
     
     # Build FastAPI parameter signature
     param_signature_parts = []
     param_processing_parts = []
+    if body_args:
+        param_processing_parts.append(f'        _body = await _read_body_arguments(http_request, "{name}")')
     
     for arg in args:
-        # Determine parameter type for FastAPI
-        param_type = "Any"
-        if arg in type_hints:
-            type_hint = type_hints[arg]
-            if "int" in type_hint.lower():
-                param_type = "int"
-            elif "float" in type_hint.lower():
-                param_type = "float"
-            elif "bool" in type_hint.lower():
-                param_type = "bool"
-            elif "list" in type_hint.lower():
-                param_type = "List"
-            elif "dict" in type_hint.lower():
-                param_type = "Dict"
-            else:
-                param_type = "str"
+        spec = resolve_annotation(type_hints.get(arg))
+        
+        # Body fields are not FastAPI parameters
+        if arg in body_args:
+            value = f"_body.{arg}"
+            if arg in defaults:
+                value = f"{value} if {value} is not None else {defaults[arg]}"
+            param_processing_parts.append(f"        {arg} = {value}")
+            continue
         
         # Add to signature
-        if arg in defaults:
-            param_signature_parts.append(f"{arg}: {param_type} = None")
+        if spec.kind == "any":
+            declaration = "Any = None" if arg in defaults else "Any"
         else:
-            param_signature_parts.append(f"{arg}: {param_type}")
+            declaration = type_source(spec.without_none())
+            if arg in defaults:
+                declaration += " = None"
+        param_signature_parts.append(f"{arg}: {declaration}")
         
         # Add to processing
+        value = f"_infer({arg})" if spec.kind == "any" else arg
         if arg in defaults:
-            param_processing_parts.append(
-                f"    {arg} = _coerce_parameter({arg}, '{type_hints.get(arg, '')}') if {arg} is not None else {defaults[arg]}"
-            )
-        else:
-            param_processing_parts.append(
-                f"    {arg} = _coerce_parameter({arg}, '{type_hints.get(arg, '')}')"
-            )
+            param_processing_parts.append(f"        {arg} = {value} if {arg} is not None else {defaults[arg]}")
+        elif spec.kind == "any":
+            param_processing_parts.append(f"        {arg} = {value}")
     
     param_signature = ", ".join(param_signature_parts)
     param_processing = "\n".join(param_processing_parts)
@@ -166,12 +1369,41 @@ def _generate_parameter_handling(func_def: Dict[str, Any]) -> Tuple[str, str]:
     return param_signature, param_processing
 
 
-def _generate_endpoint_code(func_def: Dict[str, Any]) -> str:
+def _body_openapi_code(func_def: Dict[str, Any]) -> str:
+    """Decorator argument documenting a function's JSON body, if it has one."""
+    if not _body_parameters(func_def):
+        return ""
+    return f',\n    openapi_extra=_body_openapi("{func_def["name"]}")'
+
+
+def _serializer_options(return_type: Optional[str]) -> Tuple[bool, bool, Optional[str]]:
+    """
+    Work out what a return annotation guarantees about the encoded result.
+    
+    Args:
+        return_type: Return annotation source, e.g. ``Dict[str, int]``
+        
+    Returns:
+        Tuple of (native, str_keys, array_dtype): whether the result only
+        contains JSON types, whether every dict in it has string keys, and
+        the dtype it can be returned as a binary array with (None unless it
+        is a numeric list). Unannotated or unrecognized annotations
+        guarantee none of them.
+    """
+    spec = resolve_annotation(return_type)
+    return is_json_native(spec), has_str_keys(spec), _array_dtype(spec)
+
+
+def _generate_endpoint_code(func_def: Dict[str, Any], execution_mode: str = DEFAULT_EXECUTION_MODE,
+                            memoize: bool = False) -> str:
     """
     Generate FastAPI endpoint code for a function.
     
     Args:
         func_def: Function definition dictionary
+        execution_mode: Where the endpoint runs the function (see ``EXECUTION_MODES``)
+        memoize: Serve repeated arguments from an LRU/TTL result cache
+            (only correct for pure functions)
         
     Returns:
         Generated endpoint code
@@ -182,14 +1414,39 @@ def _generate_endpoint_code(func_def: Dict[str, Any]) -> str:
     
     # Generate parameter handling
     param_signature, param_processing = _generate_parameter_handling(func_def)
+    signature = ", ".join(filter(None, ["http_request: Request", param_signature]))
+    native, str_keys, array_dtype = _serializer_options(func_def.get("return_type"))
+    
+    # Build function call: the function followed by its arguments
+    arg_list = ", ".join(args)
+    call_args = ", ".join([name] + args)
+    call_code = f'result = await _run("{execution_mode}", {call_args})'
+    if func_def.get("is_generator"):
+        # Generators can't cross process boundaries or be JSON-encoded; collect them
+        call_code = f'result = await _run("{execution_mode}", _collect, {call_args})'
     
-    # Build function call
-    arg_list = ", ".join(args) if args else ""
+    array_option = f', array_dtype="{array_dtype}"' if array_dtype else ""
+    setup = f'_serializers["{name}"] = _Serializer(native={native}, str_keys={str_keys}{array_option})\n'
+    if memoize:
+        setup += f'_result_caches["{name}"] = _ResultCache(RESULT_CACHE_SIZE, RESULT_CACHE_TTL)\n'
+        call_code = f'''# Pure function: repeated arguments are served from the result cache
+        cache_key = _cache_key({arg_list})
+        result = _result_caches["{name}"].get(cache_key) if cache_key is not None else _MISSING
+        if result is _MISSING:
+            {call_code}
+            if cache_key is not None:
+                _result_caches["{name}"].put(cache_key, result)'''
     
     # Generate endpoint code
     endpoint_code = f'''
-@app.post("/{name}", summary="{name}", description="{docstring}")
-async def {name}_endpoint({param_signature}):
+{setup}@router.post(
+    "/{name}",
+    summary="{name}",
+    description="{docstring}",
+    response_class=Response,
+    responses={"_ARRAY_RESPONSES" if array_dtype else "_RESPONSES"}{_body_openapi_code(func_def)}
+)
+async def {name}_endpoint({signature}):
     """
     Endpoint for {name} function.
     
@@ -198,11 +1455,13 @@ async def {name}_endpoint({param_signature}):
     try:
 {param_processing}
         
-        # Call the function
-        result = {name}({arg_list})
+        # Call the function in its execution mode
+        {call_code}
         
-        return {{"result": result, "success": True}}
+        return _serializers["{name}"].response(http_request, result)
         
+    except HTTPException:
+        raise
     except Exception as e:
         return JSONResponse(
             status_code=500,
@@ -217,11 +1476,321 @@ async def {name}_endpoint({param_signature}):
     return endpoint_code
 
 
+def _generate_batch_endpoint_code(func_def: Dict[str, Any],
+                                  execution_mode: str = DEFAULT_EXECUTION_MODE) -> str:
+    """
+    Generate the ``/{name}/batch`` endpoint for a function.
+    
+    Args:
+        func_def: Function definition dictionary
+        execution_mode: Where non-parallel batches run (see ``EXECUTION_MODES``)
+        
+    Returns:
+        Generated endpoint code
+    """
+    name = func_def["name"]
+    args = func_def.get("args", [])
+    type_hints = func_def.get("type_hints", {})
+    defaults = func_def.get("defaults", {})
+    
+    # Defaults are source expressions and converters are template functions:
+    # both are emitted as code, not strings
+    defaults_code = "{" + ", ".join(f"{arg!r}: {defaults[arg]}" for arg in args if arg in defaults) + "}"
+    converters_code = "{" + ", ".join(
+        f"{arg!r}: {_converter_code(resolve_annotation(type_hints.get(arg)))}" for arg in args
+    ) + "}"
+    
+    return f'''
+_batch_signatures["{name}"] = ({tuple(args)!r}, {converters_code}, {defaults_code})
+
+@router.post(
+    "/{name}/batch",
+    summary="{name} (batch)",
+    description="Call {name} once per argument set; results keep the input order and failed items carry their own error.",
+    openapi_extra=_BATCH_OPENAPI
+)
+async def {name}_batch_endpoint(request: Request, parallel: bool = False,
+                                chunk_size: Optional[int] = Query(None, ge=1)):
+    """
+    Batch endpoint for {name} function.
+    
+    Set parallel=true to spread the batch over the process pool in chunks
+    of chunk_size items (by default, one chunk per worker).
+    """
+    try:
+        items = _json_loads(await _read_body(request))
+    except ValueError:
+        return JSONResponse(status_code=400, content={{"error": "Body must be a JSON array", "success": False}})
+    if not isinstance(items, list):
+        return JSONResponse(status_code=400, content={{"error": "Body must be a JSON array", "success": False}})
+    if len(items) > MAX_BATCH_SIZE:
+        return JSONResponse(
+            status_code=413,
+            content={{"error": f"Batch exceeds {{MAX_BATCH_SIZE}} items", "success": False}}
+        )
+    
+    try:
+        return await _run_batch("{name}", "{execution_mode}", {name}, items, parallel, chunk_size)
+    except Exception as e:
+        return JSONResponse(
+            status_code=500,
+            content={{
+                "error": str(e),
+                "success": False,
+                "function": "{name}"
+            }}
+        )
+'''
+
+
+def _stream_kind(func_def: Dict[str, Any]) -> Optional[str]:
+    """
+    Decide how a function's results can be streamed.
+    
+    Returns:
+        ``"generator"`` for functions that yield, ``"accumulator"`` for
+        functions that append to a list and return it (a variant writing
+        into a stream sink is emitted), ``"iterable"`` for other functions
+        annotated to return a collection, or None if it isn't streamable
+    """
+    if func_def.get("is_generator"):
+        return "generator"
+    if func_def.get("accumulator"):
+        return "accumulator"
+    return_type = func_def.get("return_type") or ""
+    if return_type.split("[", 1)[0].split(".")[-1] in ITERABLE_RETURN_TYPES:
+        return "iterable"
+    return None
+
+
+def _generate_streaming_variant(func_def: Dict[str, Any]) -> str:
+    """
+    Rewrite an accumulator function so its list is a sink passed in by the caller.
+    
+    ``result = []`` becomes ``result = _stream_sink``, so each
+    ``result.append(item)`` hands the item to the client immediately.
+    
+    Args:
+        func_def: Function definition dictionary with an ``accumulator``
+        
+    Returns:
+        Source of ``_{name}_streaming(_stream_sink, *args)``
+    """
+    node = ast.parse(func_def["source"]).body[0]
+    accumulator = func_def["accumulator"]
+    
+    node.name = f"_{func_def['name']}_streaming"
+    node.decorator_list = []
+    node.returns = None
+    node.args.args.insert(0, ast.arg(arg=STREAM_SINK_PARAM))
+    for stmt in node.body:
+        if (isinstance(stmt, ast.Assign) and isinstance(stmt.targets[0], ast.Name)
+                and stmt.targets[0].id == accumulator):
+            stmt.value = ast.Name(id=STREAM_SINK_PARAM, ctx=ast.Load())
+    # Items were already sent as they were appended
+    node.body[-1] = ast.Return(value=None)
+    
+    return ast.unparse(ast.fix_missing_locations(node))
+
+
+def _generate_stream_endpoint_code(func_def: Dict[str, Any], kind: str, lazy: bool = False) -> str:
+    """
+    Generate the ``/{name}/stream`` endpoint for a function.
+    
+    Args:
+        func_def: Function definition dictionary
+        kind: Stream kind (see ``_stream_kind``)
+        lazy: The function is loaded lazily, and so is its streaming
+            variant (emitted by ``_generate_lazy_code`` instead)
+        
+    Returns:
+        Generated endpoint code
+    """
+    name = func_def["name"]
+    args = func_def.get("args", [])
+    
+    param_signature, param_processing = _generate_parameter_handling(func_def)
+    signature = ", ".join(filter(None, [
+        "http_request: Request",
+        param_signature,
+        'stream_format: Optional[str] = Query(None, alias="format")'
+    ]))
+    arg_tuple = f"({', '.join(args)},)" if args else "()"
+    
+    variant = ""
+    target = name
+    if kind == "accumulator":
+        if not lazy:
+            variant = _generate_streaming_variant(func_def) + "\n\n"
+        target = f"_{name}_streaming"
+    
+    return f'''
+{variant}@router.post(
+    "/{name}/stream",
+    summary="{name} (stream)",
+    description="Stream the items of {name} as they are produced: NDJSON by default, or a chunked JSON document with format=json or Accept: application/json."{_body_openapi_code(func_def)}
+)
+async def {name}_stream_endpoint({signature}):
+    """
+    Streaming endpoint for {name} function.
+    """
+    try:
+{param_processing}
+        
+        return _stream_response("{kind}", {target}, {arg_tuple}, _stream_media(http_request, stream_format))
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        return JSONResponse(
+            status_code=500,
+            content={{
+                "error": str(e),
+                "success": False,
+                "function": "{name}"
+            }}
+        )
+'''
+
+
+def _generate_lazy_code(shaker: ModuleShaker, functions: List[Dict[str, Any]],
+                        stream_kinds: Dict[str, Optional[str]],
+                        include_effects: bool = True) -> Optional[Tuple[str, Dict[str, Any], str]]:
+    """
+    Split user code into one lazily loaded module per function.
+    
+    Each function's module holds the function and the helpers, imports and
+    constants it references (plus its streaming variant, if any), and is
+    compiled on the function's first call, so startup and memory scale with
+    the functions actually used. Module-level state is therefore not shared
+    between functions. Statements run for their effects stay in the app as
+    deferred initialization, run once.
+    
+    Args:
+        shaker: Analysis of the original Python source code
+        functions: List of function definition dictionaries
+        stream_kinds: Stream kind per function name (see ``_stream_kind``)
+        include_effects: Inline the effect statements (a patch leaves them out)
+        
+    Returns:
+        Tuple of (inlined source for the effect statements, tree-shaking
+        report, code registering the modules and their stand-ins), or None
+        if the source can't be tree-shaken
+    """
+    if not shaker.shakeable:
+        return None
+    init_source, report = shaker.shake([]) if include_effects else ("", {"removed": []})
+    
+    parts = []
+    loaded_names = set()
+    for func_def in functions:
+        name = func_def["name"]
+        source, module_report = shaker.shake([name], include_effects=False)
+        loaded_names.update(module_report["kept"], module_report["deferred"])
+        if stream_kinds.get(name) == "accumulator":
+            source += "\n" + _generate_streaming_variant(func_def) + "\n"
+        parts.append(f"_register_lazy({name!r}, {source!r})")
+        parts.append(f'{name} = _LazyFunction("{name}", "{name}")')
+        if stream_kinds.get(name) == "accumulator":
+            parts.append(f'_{name}_streaming = _LazyFunction("{name}", "_{name}_streaming")')
+    
+    # Statement counts only describe the inlined part; names report the whole module
+    report = dict(report, removed=[name for name in report["removed"] if name not in loaded_names],
+                  lazy_functions=sorted(func_def["name"] for func_def in functions))
+    return init_source, report, "\n".join(parts)
+
+
+def is_elementwise_function(func_def: Dict[str, Any]) -> bool:
+    """
+    Check whether a function can be evaluated over whole arrays at once.
+    
+    A function qualifies when it is decorated with ``@elementwise``, or when
+    it is pure and every parameter and its return value are annotated as
+    numeric scalars (``int``, ``float``, ``complex``; ``bool`` returns too).
+    
+    Args:
+        func_def: Function definition dictionary
+        
+    Returns:
+        True if the function gets a vectorized endpoint
+    """
+    decorators = [d.split(".")[-1] for d in func_def.get("decorators", [])]
+    if ELEMENTWISE_DECORATOR in decorators:
+        return True
+    
+    args = func_def.get("args", [])
+    type_hints = func_def.get("type_hints", {})
+    return (
+        bool(args)
+        and func_def.get("pure", False)
+        and all(type_hints.get(arg) in NUMERIC_SCALAR_TYPES for arg in args)
+        and func_def.get("return_type") in NUMERIC_SCALAR_TYPES | {"bool"}
+    )
+
+
+def _generate_vectorized_endpoint_code(func_def: Dict[str, Any],
+                                       execution_mode: str = DEFAULT_EXECUTION_MODE) -> str:
+    """
+    Generate the ``/{name}/vectorized`` endpoint for an elementwise function.
+    
+    Args:
+        func_def: Function definition dictionary
+        execution_mode: Where the vectorized call runs (see ``EXECUTION_MODES``)
+        
+    Returns:
+        Generated endpoint code
+    """
+    name = func_def["name"]
+    args = func_def.get("args", [])
+    type_hints = func_def.get("type_hints", {})
+    
+    # Unannotated parameters of decorated functions are treated as numeric
+    numeric = tuple(arg for arg in args if type_hints.get(arg, "float") in NUMERIC_SCALAR_TYPES)
+    
+    return f'''
+_vector_signatures["{name}"] = ({tuple(args)!r}, {numeric!r})
+
+@router.post(
+    "/{name}/vectorized",
+    summary="{name} (vectorized)",
+    description="Evaluate {name} over whole arrays: pass one array per parameter (scalars broadcast) and get an array back.",
+    openapi_extra=_VECTORIZED_OPENAPI
+)
+async def {name}_vectorized_endpoint(request: Request):
+    """
+    Vectorized endpoint for {name} function.
+    """
+    if np is None:
+        return JSONResponse(status_code=501, content={{"error": "NumPy is not installed", "success": False}})
+    try:
+        columns = _json_loads(await _read_body(request))
+        if not isinstance(columns, dict):
+            raise TypeError("Body must be a JSON object of parameter arrays")
+        args = _bind_columns("{name}", columns)
+    except (TypeError, ValueError) as e:
+        return JSONResponse(status_code=400, content={{"error": str(e), "success": False}})
+    
+    try:
+        result, strategy = await _run("{execution_mode}", _call_vectorized, {name}, args)
+        return {{"result": result, "strategy": strategy, "success": True}}
+    except Exception as e:
+        return JSONResponse(
+            status_code=500,
+            content={{
+                "error": str(e),
+                "success": False,
+                "function": "{name}"
+            }}
+        )
+'''
+
+
 def generate_fastapi_app_source(
     raw_source: str,
     functions: List[Dict[str, Any]],
     app_title: str = "Generated API",
-    app_description: str = "Auto-generated API from Python functions"
+    app_description: str = "Auto-generated API from Python functions",
+    **options: Any
 ) -> Tuple[str, List[str]]:
     """
     Generate FastAPI application source code from function definitions.
@@ -231,38 +1800,242 @@ def generate_fastapi_app_source(
         functions: List of function definition dictionaries
         app_title: Title for the FastAPI app
         app_description: Description for the FastAPI app
+        **options: Further options of ``iter_fastapi_app_source``
         
     Returns:
         Tuple of (generated source code, list of endpoint paths)
     """
+    sections = iter_fastapi_app_source(raw_source, functions, app_title, app_description, **options)
+    return "".join(sections), [f"/{func_def['name']}" for func_def in functions]
+
+
+def iter_fastapi_app_source(
+    raw_source: str,
+    functions: List[Dict[str, Any]],
+    app_title: str = "Generated API",
+    app_description: str = "Auto-generated API from Python functions",
+    execution_modes: Optional[Dict[str, str]] = None,
+    default_execution_mode: str = DEFAULT_EXECUTION_MODE,
+    memoize: bool = True,
+    vectorize: bool = True,
+    stream: bool = True,
+    treeshake: bool = True,
+    lazy_functions: bool = False,
+    shards: int = 1,
+    fingerprints: Optional[Dict[str, Any]] = None
+) -> Iterator[str]:
+    """
+    Generate FastAPI application source code piece by piece.
+    
+    The pieces can be written out as they are produced, so a module with
+    thousands of functions never exists as one string.
+    
+    Args:
+        raw_source: Original Python source code
+        functions: List of function definition dictionaries
+        app_title: Title for the FastAPI app
+        app_description: Description for the FastAPI app
+        execution_modes: Execution mode per function name, overriding the default
+        default_execution_mode: Execution mode of functions not listed in
+            ``execution_modes``
+        memoize: Cache results of functions the parser classified as pure
+        vectorize: Add ``/{name}/vectorized`` endpoints for elementwise
+            numeric functions (see ``is_elementwise_function``)
+        stream: Add ``/{name}/stream`` endpoints for functions that yield or
+            return collections
+        treeshake: Inline only what the functions need and defer top-level
+            computations until the first call (see ``utils.treeshake``)
+        lazy_functions: Give each function its own module, compiled on its
+            first request (see ``_generate_lazy_code``); falls back to
+            inlining when the module can't be tree-shaken
+        shards: Split the endpoints into this many router shards (at most
+            one per function), which ``compile_generated_source`` compiles
+            in parallel
+        fingerprints: Filled, once the source is complete, with the ``app``
+            fingerprint and one per function (``functions``), as embedded
+            in the generated app
+        
+    Returns:
+        Iterator over consecutive pieces of the generated source
+        
+    Raises:
+        ValueError: If there are no functions or an execution mode is unknown
+    """
     if not functions:
         raise ValueError("No functions provided for API generation")
     
-    # Generate user functions section
-    user_functions = f"# User-provided functions\n{raw_source}\n"
+    execution_modes = execution_modes or {}
+    for mode in list(execution_modes.values()) + [default_execution_mode]:
+        if mode not in EXECUTION_MODES:
+            raise ValueError(f"Unknown execution mode: {mode!r} (expected one of {', '.join(EXECUTION_MODES)})")
     
-    # Generate endpoints
-    endpoints = []
-    endpoint_code_parts = []
-    
-    for func_def in functions:
-        name = func_def["name"]
-        endpoint_path = f"/{name}"
-        endpoints.append(endpoint_path)
-        
-        endpoint_code = _generate_endpoint_code(func_def)
-        endpoint_code_parts.append(endpoint_code)
+    return _iter_sections(raw_source, functions, app_title, app_description, execution_modes,
+                          default_execution_mode, memoize, vectorize, stream, treeshake,
+                          lazy_functions, max(1, min(shards, len(functions))),
+                          fingerprints if fingerprints is not None else {})
+
+
+def _iter_sections(raw_source: str, functions: List[Dict[str, Any]], app_title: str,
+                   app_description: str, execution_modes: Dict[str, str], default_execution_mode: str,
+                   memoize: bool, vectorize: bool, stream: bool, treeshake: bool,
+                   lazy_functions: bool, shards: int, fingerprints: Dict[str, Any]) -> Iterator[str]:
+    """Yield the template, the user code, each shard's endpoints and the footer."""
+    # Generate user functions section
+    shaker = ModuleShaker(raw_source)
+    stream_kinds = {f["name"]: _stream_kind(f) if stream else None for f in functions}
+    lazy = _generate_lazy_code(shaker, functions, stream_kinds) if lazy_functions else None
+    if lazy:
+        user_source, treeshake_report, lazy_code = lazy
+    else:
+        lazy_code = ""
+        if treeshake:
+            user_source, treeshake_report = shaker.shake([f["name"] for f in functions])
+        else:
+            user_source, treeshake_report = raw_source, {"shaken": False, "reason": "disabled"}
+    app_fingerprint = _fingerprint_app(shaker, app_title, app_description,
+                                       patchable=treeshake or bool(lazy), lazy=bool(lazy))
     
-    # Combine all parts
-    generated_source = FASTAPI_TEMPLATE.format(
+    yield FASTAPI_TEMPLATE.format(
         source_info="Python functions",
         app_title=app_title,
         app_description=app_description,
-        user_functions=user_functions,
-        endpoints="\n".join(endpoint_code_parts)
+        treeshake_report=repr(treeshake_report),
+        shard_count=shards
     )
+    yield "# User-provided functions\n"
+    yield user_source
+    if lazy_code:
+        yield f"\n{lazy_code}\n"
+    yield USER_CODE_FOOTER
     
-    return generated_source, endpoints
+    # Generate endpoints, in contiguous shards of functions
+    function_fingerprints = {}
+    shard_size = -(-len(functions) // shards)
+    for index in range(shards):
+        yield SHARD_TEMPLATE.format(marker=SHARD_MARKER, number=index + 1, count=shards, index=index)
+        for func_def in functions[index * shard_size:(index + 1) * shard_size]:
+            sections = list(_endpoint_sections(func_def, execution_modes, default_execution_mode,
+                                               memoize, vectorize, stream_kinds[func_def["name"]], bool(lazy)))
+            function_fingerprints[func_def["name"]] = _fingerprint_function(shaker, func_def["name"], sections)
+            yield from sections
+    
+    yield FASTAPI_FOOTER
+    yield FINGERPRINT_TEMPLATE.format(app_fingerprint=app_fingerprint,
+                                      function_fingerprints=repr(function_fingerprints))
+    fingerprints.update(app=app_fingerprint, functions=function_fingerprints)
+
+
+def _fingerprint_app(shaker: ModuleShaker, app_title: str, app_description: str,
+                     patchable: bool, lazy: bool) -> str:
+    """
+    Hash what every endpoint of a generated app shares.
+    
+    That is the generator, app metadata and the user module's effect
+    statements (with what they need). Apps whose user code isn't tree-shaken
+    hash their whole source, so any change redeploys them whole.
+    """
+    digest = hashlib.sha256()
+    for part in (GENERATOR_VERSION, app_title, app_description, str(lazy)):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    if patchable and shaker.shakeable:
+        digest.update(shaker.fingerprint([], include_effects=True).encode("ascii"))
+    else:
+        digest.update(shaker.source.encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _fingerprint_function(shaker: ModuleShaker, name: str, sections: List[str]) -> str:
+    """Hash a function with the user code it depends on and its generated endpoints."""
+    digest = hashlib.sha256(shaker.fingerprint([name]).encode("ascii"))
+    for section in sections:
+        digest.update(section.encode("utf-8"))
+    return digest.hexdigest()
+
+
+def generate_function_patch_source(
+    raw_source: str,
+    functions: List[Dict[str, Any]],
+    names: List[str],
+    execution_modes: Optional[Dict[str, str]] = None,
+    default_execution_mode: str = DEFAULT_EXECUTION_MODE,
+    memoize: bool = True,
+    vectorize: bool = True,
+    stream: bool = True,
+    treeshake: bool = True,
+    lazy_functions: bool = False,
+    **options: Any
+) -> Tuple[str, Dict[str, str]]:
+    """
+    Generate code that redefines some functions of a live generated app.
+    
+    The patch holds only those functions, the user code they depend on and
+    their endpoints; the app's ``apply_function_patch`` executes it in place
+    and swaps their routes. It is only valid for an app generated with the
+    same options whose ``_app_fingerprint`` equals the new source's, since
+    everything outside ``names`` is assumed unchanged.
+    
+    Args:
+        raw_source: New Python source code
+        functions: Its function definition dictionaries
+        names: Functions to (re)define; must be among ``functions``
+        execution_modes, default_execution_mode, memoize, vectorize, stream,
+        treeshake, lazy_functions: As for ``iter_fastapi_app_source``
+        **options: Other ``iter_fastapi_app_source`` options, which don't
+            affect a patch
+        
+    Returns:
+        Tuple of (patch source, fingerprint per patched function)
+        
+    Raises:
+        ValueError: If a name isn't a function of the source, or the source
+            can't be tree-shaken (its apps are always redeployed whole)
+    """
+    shaker = ModuleShaker(raw_source)
+    if not (treeshake or lazy_functions) or not shaker.shakeable:
+        raise ValueError(f"Functions can't be patched individually: {shaker.reason or 'tree shaking is disabled'}")
+    by_name = {func_def["name"]: func_def for func_def in functions}
+    missing = [name for name in names if name not in by_name]
+    if missing:
+        raise ValueError(f"Unknown functions: {', '.join(missing)}")
+    
+    patched = [by_name[name] for name in names]
+    execution_modes = execution_modes or {}
+    stream_kinds = {f["name"]: _stream_kind(f) if stream else None for f in patched}
+    parts = [f"# Patch of {', '.join(names)}\n"]
+    if lazy_functions:
+        parts.append(_generate_lazy_code(shaker, patched, stream_kinds, include_effects=False)[2] + "\n")
+    else:
+        # Deferred statements run once, when the patch is applied
+        parts.append(shaker.shake(names, include_effects=False, init_function="_function_patch_init")[0])
+    
+    fingerprints = {}
+    for func_def in patched:
+        sections = list(_endpoint_sections(func_def, execution_modes, default_execution_mode,
+                                           memoize, vectorize, stream_kinds[func_def["name"]], lazy_functions))
+        fingerprints[func_def["name"]] = _fingerprint_function(shaker, func_def["name"], sections)
+        parts.extend(sections)
+    parts.append(f"_function_fingerprints.update({fingerprints!r})\n")
+    return "".join(parts), fingerprints
+
+
+def _endpoint_sections(func_def: Dict[str, Any], execution_modes: Dict[str, str],
+                       default_execution_mode: str, memoize: bool, vectorize: bool,
+                       stream_kind: Optional[str], lazy: bool) -> Iterator[str]:
+    """Yield the code of every endpoint of one function."""
+    execution_mode = execution_modes.get(func_def["name"], default_execution_mode)
+    parts = [
+        _generate_body_model_code(func_def),
+        _generate_binary_code(func_def, execution_mode),
+        _generate_endpoint_code(func_def, execution_mode, memoize=memoize and func_def.get("pure", False)),
+        _generate_batch_endpoint_code(func_def, execution_mode)
+    ]
+    if stream_kind:
+        parts.append(_generate_stream_endpoint_code(func_def, stream_kind, lazy=lazy))
+    if vectorize and is_elementwise_function(func_def):
+        parts.append(_generate_vectorized_endpoint_code(func_def, execution_mode))
+    for part in parts:
+        yield part + "\n"
 
 
 def generate_openapi_spec(functions: List[Dict[str, Any]], 
@@ -311,70 +2084,167 @@ def generate_openapi_spec(functions: List[Dict[str, Any]],
         args = func_def.get("args", [])
         docstring = func_def.get("docstring", "")
         type_hints = func_def.get("type_hints", {})
+        defaults = func_def.get("defaults", {})
         
-        # Generate parameter schema
+        # Scalar parameters go in the query string, collections in a JSON body
         parameters = []
+        body_properties = {}
+        body_required = []
         for arg in args:
-            param_schema = {
+            arg_type = resolve_annotation(type_hints.get(arg))
+            schema = json_schema(arg_type)
+            if arg in type_hints:
+                schema["description"] = f"Type: {type_hints[arg]}"
+            
+            if arg_type.is_collection:
+                body_properties[arg] = schema
+                if arg not in defaults:
+                    body_required.append(arg)
+                continue
+            
+            parameters.append({
                 "name": arg,
                 "in": "query",
-                "required": arg not in func_def.get("defaults", {}),
-                "schema": {"type": "string"}
+                "required": arg not in defaults,
+                "schema": schema
+            })
+        
+        operation = {
+            "summary": name,
+            "description": docstring or f"Endpoint for {name} function",
+            "parameters": parameters
+        }
+        if body_properties:
+            body_schema = {"type": "object", "properties": body_properties}
+            if body_required:
+                body_schema["required"] = body_required
+            operation["requestBody"] = {
+                "required": bool(body_required),
+                "content": {"application/json": {"schema": body_schema}}
             }
-            
-            # Add type hint if available
-            if arg in type_hints:
-                param_schema["description"] = f"Type: {type_hints[arg]}"
-            
-            parameters.append(param_schema)
         
-        # Add endpoint to paths
-        spec["paths"][f"/{name}"] = {
-            "post": {
-                "summary": name,
-                "description": docstring or f"Endpoint for {name} function",
-                "parameters": parameters,
-                "responses": {
-                    "200": {
-                        "description": "Successful response",
-                        "content": {
-                            "application/json": {
-                                "schema": {"$ref": "#/components/schemas/Success"}
-                            }
-                        }
-                    },
-                    "500": {
-                        "description": "Error response",
-                        "content": {
-                            "application/json": {
-                                "schema": {"$ref": "#/components/schemas/Error"}
-                            }
-                        }
+        success_schema = {"$ref": "#/components/schemas/Success"}
+        if func_def.get("return_type"):
+            success_schema = {
+                "type": "object",
+                "properties": {
+                    "result": json_schema(resolve_annotation(func_def["return_type"])),
+                    "success": {"type": "boolean"}
+                }
+            }
+        
+        operation["responses"] = {
+            "200": {
+                "description": "Successful response",
+                "content": {
+                    "application/json": {
+                        "schema": success_schema
+                    }
+                }
+            },
+            "500": {
+                "description": "Error response",
+                "content": {
+                    "application/json": {
+                        "schema": {"$ref": "#/components/schemas/Error"}
                     }
                 }
             }
         }
+        
+        # Add endpoint to paths
+        spec["paths"][f"/{name}"] = {"post": operation}
     
     return spec
 
 
-def validate_generated_code(source_code: str) -> List[str]:
+def split_generated_source(source_code: str) -> List[Tuple[int, str]]:
+    """
+    Split generated source at its router shards.
+    
+    Every piece is a run of complete top-level statements, so executing the
+    pieces in order into one namespace is the same as executing the source.
+    
+    Args:
+        source_code: Generated source code
+        
+    Returns:
+        List of (first line number, source) pieces: everything before the
+        first shard, then one per shard (the last one with the footer)
+    """
+    pieces = []
+    start, line = 0, 1
+    marker = "\n" + SHARD_MARKER
+    while True:
+        found = source_code.find(marker, start)
+        end = len(source_code) if found == -1 else found + 1
+        pieces.append((line, source_code[start:end]))
+        if found == -1:
+            return pieces
+        line += source_code.count("\n", start, end)
+        start = end
+
+
+def _compile_piece(piece: str, filename: str, first_line: int) -> bytes:
+    # Leading newlines keep line numbers in tracebacks right; code objects
+    # travel back from process workers marshalled
+    return marshal.dumps(compile("\n" * (first_line - 1) + piece, filename, "exec"))
+
+
+def compile_generated_source(source_code: str, filename: str = "<generated>",
+                             executor: Optional[Executor] = None) -> Tuple[types.CodeType, ...]:
+    """
+    Compile generated source, one code object per shard.
+    
+    Args:
+        source_code: Generated source code
+        filename: File name reported in tracebacks
+        executor: Process pool to compile the shards on in parallel; they are
+            compiled in turn without one (threads don't help: compiling holds
+            the GIL)
+        
+    Returns:
+        Code objects to execute in order into one module namespace
+        
+    Raises:
+        SyntaxError: If a shard doesn't compile
+    """
+    pieces = split_generated_source(source_code)
+    if executor is None or len(pieces) == 1:
+        return tuple(compile("\n" * (line - 1) + piece, filename, "exec") for line, piece in pieces)
+    compiled = executor.map(_compile_piece, [piece for _, piece in pieces],
+                            [filename] * len(pieces), [line for line, _ in pieces])
+    return tuple(marshal.loads(data) for data in compiled)
+
+
+def _check_piece_syntax(piece: str, first_line: int) -> Optional[str]:
+    try:
+        compile("\n" * (first_line - 1) + piece, "<generated>", "exec")
+    except SyntaxError as e:
+        return f"Syntax error in generated code: {e}"
+    return None
+
+
+def validate_generated_code(source_code: str, executor: Optional[Executor] = None) -> List[str]:
     """
     Validate generated FastAPI code for common issues.
     
     Args:
         source_code: Generated source code
+        executor: Process pool to check the shards' syntax on in parallel
         
     Returns:
         List of validation warnings/errors
     """
     issues = []
     
-    # Check for basic syntax
-    try:
-        compile(source_code, "<generated>", "exec")
-    except SyntaxError as e:
-        issues.append(f"Syntax error in generated code: {e}")
+    # Check for basic syntax, shard by shard
+    pieces = split_generated_source(source_code)
+    if executor is None or len(pieces) == 1:
+        errors = [_check_piece_syntax(piece, line) for line, piece in pieces]
+    else:
+        errors = executor.map(_check_piece_syntax, [piece for _, piece in pieces], [line for line, _ in pieces])
+    issues.extend(error for error in errors if error)
     
     # Check for common issues
     if "from fastapi import" not in source_code:
@@ -383,7 +2253,7 @@ def validate_generated_code(source_code: str) -> List[str]:
     if "app = FastAPI(" not in source_code:
         issues.append("Missing FastAPI app creation")
     
-    if "@app.post(" not in source_code:
+    if "@router.post(" not in source_code:
         issues.append("No POST endpoints generated")
     
-    return issues 
\ No newline at end of file
+    return issues
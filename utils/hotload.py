@@ -0,0 +1,279 @@
+"""
+Hot Router Loader
+================
+
+Compile generated FastAPI sources in memory and swap their routes into a
+running application without restarting the server process.
+"""
+
+import sys
+import time
+import types
+import itertools
+import threading
+import logging
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+from fastapi import APIRouter, FastAPI
+from fastapi.routing import APIRoute
+from starlette.routing import BaseRoute
+
+logger = logging.getLogger(__name__)
+
+# Prefix for the synthetic module names of in-memory generated apps
+GENERATED_MODULE_PREFIX = "swaggermcp_generated"
+
+_module_counter = itertools.count(1)
+
+
+def exec_generated_code(code: Union[types.CodeType, Sequence[types.CodeType]],
+                        module_name: Optional[str] = None,
+                        filename: str = "<generated>") -> types.ModuleType:
+    """
+    Execute a compiled generated app into a fresh module object.
+
+    Args:
+        code: Code object compiled from generated source, or one per shard
+            (see ``compile_generated_source``), executed in order
+        module_name: Name to register the module under (auto-assigned if None)
+        filename: File name reported in tracebacks
+
+    Returns:
+        The executed module, registered in ``sys.modules``
+    """
+    if module_name is None:
+        module_name = f"{GENERATED_MODULE_PREFIX}_{next(_module_counter)}"
+
+    module = types.ModuleType(module_name)
+    module.__file__ = filename
+
+    # Register before executing so pickling and relative lookups work
+    sys.modules[module_name] = module
+    try:
+        for piece in ([code] if isinstance(code, types.CodeType) else code):
+            exec(piece, module.__dict__)
+    except BaseException:
+        sys.modules.pop(module_name, None)
+        raise
+
+    return module
+
+
+def compile_generated_module(source: str, module_name: Optional[str] = None,
+                             filename: str = "<generated>") -> types.ModuleType:
+    """
+    Compile generated FastAPI source into an in-memory module.
+
+    Args:
+        source: Generated Python source code
+        module_name: Name to register the module under (auto-assigned if None)
+        filename: File name reported in tracebacks
+
+    Returns:
+        The executed module
+    """
+    code = compile(source, filename, "exec")
+    return exec_generated_code(code, module_name, filename)
+
+
+def unload_module(module: types.ModuleType) -> None:
+    """
+    Drop a generated module from ``sys.modules``.
+
+    The module namespace is left intact so that requests still running
+    against the old functions can finish; it is garbage collected once
+    the last reference goes away. Worker pools the module created are shut
+    down without waiting, which lets already submitted calls complete.
+    """
+    if sys.modules.get(module.__name__) is module:
+        del sys.modules[module.__name__]
+
+    shutdown = getattr(module, "_shutdown_executors", None)
+    if callable(shutdown):
+        try:
+            shutdown()
+        except Exception as e:
+            logger.warning(f"Failed to shut down worker pools of {module.__name__}: {e}")
+
+
+def get_module_router(module: types.ModuleType) -> APIRouter:
+    """
+    Get the router holding the generated endpoints of a module.
+
+    Args:
+        module: Executed generated module
+
+    Returns:
+        The module's ``router``, or a router built from the API routes of its ``app``
+    """
+    router = getattr(module, "router", None)
+    if isinstance(router, APIRouter):
+        return router
+
+    app = getattr(module, "app", None)
+    if isinstance(app, FastAPI):
+        # Apps generated before routers were emitted only define `app`;
+        # take its API routes and leave docs/openapi routes behind
+        router = APIRouter()
+        router.routes.extend(r for r in app.router.routes if isinstance(r, APIRoute))
+        return router
+
+    raise ValueError(f"Generated module {module.__name__} defines neither `router` nor `app`")
+
+
+class HotRouterSwapper:
+    """
+    Swaps generated routers in and out of a running FastAPI app.
+
+    The new route list is built aside and installed with a single
+    reference assignment, so in-flight requests keep the routes they
+    matched and new requests see either the old or the new generation,
+    never a mix or an empty table.
+    """
+
+    def __init__(self, app: FastAPI):
+        """
+        Initialize the swapper.
+
+        Args:
+            app: Running FastAPI app to mount generated routes into
+        """
+        self.app = app
+        self.generation = 0
+        self.last_reload_ms: Optional[float] = None
+        self._module: Optional[types.ModuleType] = None
+        self._routes: List[BaseRoute] = []
+        self._lock = threading.Lock()
+
+    @property
+    def module(self) -> Optional[types.ModuleType]:
+        """The currently mounted generated module."""
+        return self._module
+
+    @property
+    def routes(self) -> List[BaseRoute]:
+        """The currently mounted generated routes."""
+        return list(self._routes)
+
+    def load_source(self, source: str, filename: str = "<generated>") -> Dict[str, Any]:
+        """
+        Compile generated source and swap it into the app.
+
+        Args:
+            source: Generated FastAPI source code
+            filename: File name reported in tracebacks
+
+        Returns:
+            Swap summary (see ``swap_module``)
+        """
+        start_time = time.perf_counter()
+        module = compile_generated_module(source, filename=filename)
+        try:
+            return self.swap_module(module, started_at=start_time)
+        except Exception:
+            unload_module(module)
+            raise
+
+    def swap_module(self, module: types.ModuleType, started_at: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Atomically replace the mounted generated routes with those of a module.
+
+        Args:
+            module: Executed generated module
+            started_at: ``time.perf_counter()`` value when loading of the
+                module began; used to report the total reload time
+
+        Returns:
+            Dictionary with the new generation number, mounted paths and,
+            if ``started_at`` was given, the reload time in milliseconds
+        """
+        new_routes = list(get_module_router(module).routes)
+
+        with self._lock:
+            old_route_ids = {id(route) for route in self._routes}
+            routes = [r for r in self.app.router.routes if id(r) not in old_route_ids]
+            routes.extend(new_routes)
+
+            # Single reference swap; the router reads this list per request
+            self.app.router.routes = routes
+            self.app.openapi_schema = None
+
+            old_module, self._module = self._module, module
+            self._routes = new_routes
+            self.generation += 1
+            generation = self.generation
+
+        if old_module is not None:
+            unload_module(old_module)
+
+        logger.info(f"Mounted generated API generation {generation} ({len(new_routes)} routes)")
+
+        info = {
+            "generation": generation,
+            "paths": [getattr(route, "path", "") for route in new_routes]
+        }
+        if started_at is not None:
+            self.last_reload_ms = (time.perf_counter() - started_at) * 1000
+            info["reload_ms"] = round(self.last_reload_ms, 3)
+        return info
+
+    def patch_module(self, code: types.CodeType, names: List[str],
+                     started_at: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Redefine some functions of the mounted module and swap only their routes.
+
+        The module keeps serving every other endpoint, with its caches and
+        worker pools, throughout.
+
+        Args:
+            code: Compiled output of ``generate_function_patch_source``
+            names: Functions the patch redefines or drops
+            started_at: ``time.perf_counter()`` value when the patch began;
+                used to report the total reload time
+
+        Returns:
+            Dictionary with the new generation number, the paths removed and
+            added and, if ``started_at`` was given, the reload time in milliseconds
+
+        Raises:
+            ValueError: If the mounted module (if any) can't be patched
+        """
+        with self._lock:
+            apply = getattr(self._module, "apply_function_patch", None)
+            if apply is None:
+                raise ValueError("The mounted generated module can't be patched")
+            removed, added = apply(code, names)
+
+            dropped = {id(route) for route in removed}
+            self.app.router.routes = [r for r in self.app.router.routes if id(r) not in dropped] + list(added)
+            self.app.openapi_schema = None
+            self._routes = [r for r in self._routes if id(r) not in dropped] + list(added)
+            self.generation += 1
+            generation = self.generation
+
+        logger.info(f"Patched generated API generation {generation} ({', '.join(names)}: "
+                    f"{len(removed)} routes out, {len(added)} in)")
+
+        info = {
+            "generation": generation,
+            "removed": [getattr(route, "path", "") for route in removed],
+            "added": [getattr(route, "path", "") for route in added]
+        }
+        if started_at is not None:
+            self.last_reload_ms = (time.perf_counter() - started_at) * 1000
+            info["reload_ms"] = round(self.last_reload_ms, 3)
+        return info
+
+    def get_status(self) -> Dict[str, Any]:
+        """
+        Get information about the currently mounted generation.
+
+        Returns:
+            Dictionary containing status information
+        """
+        return {
+            "generation": self.generation,
+            "module": self._module.__name__ if self._module else None,
+            "routes": len(self._routes),
+            "last_reload_ms": round(self.last_reload_ms, 3) if self.last_reload_ms is not None else None
+        }
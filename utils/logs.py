@@ -0,0 +1,253 @@
+"""
+Log Buffer
+=========
+
+Bounded in-memory log storage for server processes.
+
+A ``LogBuffer`` keeps the most recent lines in a ring buffer, each tagged
+with a monotonically increasing sequence number so callers can tail the
+buffer or follow it from where they left off. Optionally every line is
+also appended to a size-rotated file on disk.
+
+Producers never block: appending to the ring is O(1) and drops the oldest
+line when full, and disk writes happen on a separate writer thread fed by
+a bounded queue that drops lines (and counts them) rather than applying
+back-pressure. This is what lets ``drain_stream`` read a child process's
+stdout continuously, so the child never stalls on a full pipe.
+"""
+
+import os
+import time
+import queue
+import threading
+import logging
+from collections import deque
+from pathlib import Path
+from typing import Any, Deque, Dict, IO, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Lines waiting to be written to disk before new ones are dropped
+DISK_QUEUE_SIZE = 10000
+
+# Longest line drain_stream reads at once; longer lines are split
+MAX_LINE_BYTES = 64 * 1024
+
+
+class LogBuffer:
+    """
+    Thread-safe ring buffer of log lines with tail/follow access.
+    """
+
+    def __init__(self, max_lines: int = 2000, log_file: Optional[Path] = None,
+                 max_bytes: int = 10 * 1024 * 1024, backup_count: int = 3):
+        """
+        Initialize the log buffer.
+
+        Args:
+            max_lines: Number of recent lines kept in memory
+            log_file: Optional file to also append every line to
+            max_bytes: Size at which the log file is rotated
+            backup_count: Number of rotated files to keep (``file.1`` ...)
+        """
+        self.max_lines = max_lines
+        self.log_file = Path(log_file) if log_file else None
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+
+        self._lines: Deque[Tuple[int, float, str, str]] = deque(maxlen=max_lines)
+        self._next_seq = 0
+        self._cond = threading.Condition()
+        self.dropped_to_disk = 0
+
+        self._disk_queue: Optional["queue.Queue[str]"] = None
+        if self.log_file is not None:
+            self.log_file.parent.mkdir(parents=True, exist_ok=True)
+            self._disk_queue = queue.Queue(maxsize=DISK_QUEUE_SIZE)
+            threading.Thread(target=self._write_to_disk, name="log-writer", daemon=True).start()
+
+    def append(self, line: str, source: str = "") -> int:
+        """
+        Add a line to the buffer.
+
+        Args:
+            line: Log line (a trailing newline is stripped)
+            source: Label of the producer, e.g. ``gen-3``
+
+        Returns:
+            Sequence number of the line
+        """
+        line = line.rstrip("\r\n")
+        with self._cond:
+            seq = self._next_seq
+            self._next_seq += 1
+            self._lines.append((seq, time.time(), source, line))
+            self._cond.notify_all()
+
+        if self._disk_queue is not None:
+            try:
+                self._disk_queue.put_nowait(f"[{source}] {line}\n" if source else line + "\n")
+            except queue.Full:
+                self.dropped_to_disk += 1
+
+        return seq
+
+    def tail(self, lines: int = 50) -> List[Dict[str, Any]]:
+        """
+        Get the most recent lines.
+
+        Args:
+            lines: Maximum number of lines to return
+
+        Returns:
+            List of entries with ``seq``, ``time``, ``source`` and ``line``
+        """
+        with self._cond:
+            entries = list(self._lines)[-lines:] if lines > 0 else []
+        return [_entry(item) for item in entries]
+
+    def follow(self, since: int, timeout: float = 0.0, limit: int = 1000) -> Dict[str, Any]:
+        """
+        Get lines newer than a sequence number, waiting for some if needed.
+
+        Args:
+            since: Return lines with a sequence number >= this value
+                (use the ``next`` value of the previous call)
+            timeout: Seconds to wait for new lines if there are none yet
+            limit: Maximum number of lines to return
+
+        Returns:
+            Dictionary with ``lines``, the ``next`` sequence number to
+            follow from, and ``skipped`` (lines that fell out of the ring
+            before they could be read)
+        """
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while self._next_seq <= since:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+
+            first_seq = self._lines[0][0] if self._lines else self._next_seq
+            start = max(since, first_seq)
+            offset = start - first_seq
+            entries = [self._lines[i] for i in range(offset, min(len(self._lines), offset + limit))]
+            next_seq = entries[-1][0] + 1 if entries else min(start, self._next_seq)
+
+        return {
+            "lines": [_entry(item) for item in entries],
+            "next": next_seq,
+            "skipped": max(0, first_seq - since)
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get buffer statistics.
+
+        Returns:
+            Dictionary with line counts and disk state
+        """
+        with self._cond:
+            buffered = len(self._lines)
+            total = self._next_seq
+        return {
+            "buffered_lines": buffered,
+            "max_lines": self.max_lines,
+            "total_lines": total,
+            "log_file": str(self.log_file) if self.log_file else None,
+            "dropped_to_disk": self.dropped_to_disk
+        }
+
+    def _write_to_disk(self) -> None:
+        handle = self.log_file.open("a", encoding="utf-8")
+        try:
+            while True:
+                chunk = [self._disk_queue.get()]
+                # Batch whatever else is queued into one write
+                while len(chunk) < 512:
+                    try:
+                        chunk.append(self._disk_queue.get_nowait())
+                    except queue.Empty:
+                        break
+                handle.write("".join(chunk))
+                handle.flush()
+                if self.max_bytes and handle.tell() >= self.max_bytes:
+                    handle.close()
+                    self._rotate()
+                    handle = self.log_file.open("a", encoding="utf-8")
+        except Exception as e:
+            logger.error(f"Log writer for {self.log_file} stopped: {e}")
+        finally:
+            handle.close()
+
+    def _rotate(self) -> None:
+        if self.backup_count <= 0:
+            self.log_file.unlink(missing_ok=True)
+            return
+        for index in range(self.backup_count - 1, 0, -1):
+            older = self.log_file.with_name(f"{self.log_file.name}.{index}")
+            if older.exists():
+                os.replace(older, self.log_file.with_name(f"{self.log_file.name}.{index + 1}"))
+        os.replace(self.log_file, self.log_file.with_name(f"{self.log_file.name}.1"))
+
+
+class LogBufferHandler(logging.Handler):
+    """``logging`` handler that appends formatted records to a LogBuffer."""
+
+    def __init__(self, buffer: LogBuffer, source: str = ""):
+        super().__init__()
+        self.buffer = buffer
+        self.source = source
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            self.buffer.append(self.format(record), self.source)
+        except Exception:
+            self.handleError(record)
+
+
+def drain_stream(stream: IO, buffer: LogBuffer, source: str = "") -> threading.Thread:
+    """
+    Read a stream line by line into a buffer on a daemon thread.
+
+    Lines are read as bytes (from the underlying binary stream of a text
+    stream) and decoded leniently, so invalid UTF-8 in a child's output
+    can't stop the drain; lines longer than ``MAX_LINE_BYTES`` are split.
+
+    Args:
+        stream: Text or binary stream, typically a child's stdout pipe
+        buffer: Buffer to append lines to
+        source: Label attached to every line
+
+    Returns:
+        The started drainer thread; it ends when the stream reaches EOF
+    """
+    raw = getattr(stream, "buffer", stream)
+
+    def _drain() -> None:
+        try:
+            while True:
+                line = raw.readline(MAX_LINE_BYTES)
+                if not line:
+                    break
+                if isinstance(line, bytes):
+                    line = line.decode("utf-8", errors="replace")
+                buffer.append(line, source)
+        except (OSError, ValueError):
+            # Stream closed underneath us
+            pass
+        finally:
+            try:
+                stream.close()
+            except OSError:
+                pass
+
+    thread = threading.Thread(target=_drain, name=f"log-drain-{source or 'stream'}", daemon=True)
+    thread.start()
+    return thread
+
+
+def _entry(item: Tuple[int, float, str, str]) -> Dict[str, Any]:
+    seq, timestamp, source, line = item
+    return {"seq": seq, "time": timestamp, "source": source, "line": line}
@@ -4,10 +4,49 @@ Python Function Parser
 
 Extract top-level function definitions from Python source code using AST.
 Provides detailed metadata about function signatures, type hints, and documentation.
+
+Functions are also classified as pure or impure. A function is pure when
+its result depends only on its arguments: it does not use ``global`` or
+``nonlocal``, read mutable module-level state, call I/O, randomness or
+clock APIs, or depend on another function that does. Anything the
+analysis cannot resolve counts as impure, so "pure" is safe to memoize.
 """
 
 import ast
-from typing import Any, Dict, List, Optional, Union
+import builtins
+from typing import Any, Dict, List, Optional, Set, Tuple, Union
+
+
+# Modules whose functions are deterministic and side-effect free
+PURE_MODULES = {
+    "math", "cmath", "re", "string", "heapq", "bisect", "collections", "itertools",
+    "functools", "operator", "statistics", "decimal", "fractions", "numbers", "typing",
+    "json", "hashlib", "copy", "textwrap", "unicodedata", "dataclasses", "enum", "array",
+    "numpy"
+}
+
+# Attributes that read clocks, randomness or the environment even on otherwise pure modules
+IMPURE_ATTRIBUTES = {
+    "random", "now", "today", "utcnow", "time", "perf_counter", "monotonic",
+    "urandom", "getenv", "environ", "seed"
+}
+
+# Builtins with side effects or results that depend on interpreter state
+IMPURE_BUILTINS = {
+    "print", "open", "input", "exec", "eval", "compile", "globals", "locals", "vars",
+    "id", "__import__", "breakpoint", "setattr", "delattr", "help", "exit", "quit"
+}
+
+_PURE_BUILTINS = {name for name in dir(builtins) if not name.startswith("_")} - IMPURE_BUILTINS
+
+# Callables that only iterate, measure or index a sequence argument
+READONLY_SEQUENCE_CALLS = {
+    "len", "sum", "sorted", "min", "max", "list", "tuple", "set", "frozenset", "iter",
+    "enumerate", "zip", "map", "filter", "reversed", "any", "all", "Counter"
+}
+
+# Modules whose functions only read sequence arguments
+READONLY_SEQUENCE_MODULES = {"math", "statistics"}
 
 
 def _extract_literal_value(node: ast.AST) -> str:
@@ -38,6 +77,86 @@ def _extract_type_hint(node: ast.arg) -> Optional[str]:
         return None
 
 
+def _extract_return_type(node: ast.FunctionDef) -> Optional[str]:
+    """Extract the return annotation of a function."""
+    if node.returns is None:
+        return None
+    
+    try:
+        return ast.unparse(node.returns)
+    except Exception:
+        return None
+
+
+def _extract_decorators(node: ast.FunctionDef) -> List[str]:
+    """Extract decorator expressions of a function, e.g. ``['elementwise']``."""
+    decorators = []
+    for decorator in node.decorator_list:
+        try:
+            decorators.append(ast.unparse(decorator))
+        except Exception:
+            continue
+    return decorators
+
+
+def _own_nodes(node: ast.FunctionDef):
+    """Walk a function body without descending into nested functions or lambdas."""
+    stack = list(node.body)
+    while stack:
+        child = stack.pop()
+        yield child
+        if not isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef, ast.Lambda, ast.ClassDef)):
+            stack.extend(ast.iter_child_nodes(child))
+
+
+def _is_generator(node: ast.FunctionDef) -> bool:
+    """Check whether a function yields (nested functions don't count)."""
+    return any(isinstance(child, (ast.Yield, ast.YieldFrom)) for child in _own_nodes(node))
+
+
+def _find_accumulator(node: ast.FunctionDef) -> Optional[str]:
+    """
+    Find the list a function builds up and returns, if that's all it does with it.
+    
+    Matches ``name = []`` as a top-level statement, ``return name`` as the
+    last statement and the only ``return``, and no other use of ``name``
+    than ``name.append(...)`` (nested functions included). Such a function
+    can hand each appended item out as soon as it is produced.
+    
+    Returns:
+        The accumulator variable name, or None
+    """
+    body = node.body
+    if not body or not isinstance(body[-1], ast.Return) or not isinstance(body[-1].value, ast.Name):
+        return None
+    name = body[-1].value.id
+    # An earlier return would end the stream without sending what it returns
+    if any(isinstance(child, ast.Return) and child is not body[-1] for child in _own_nodes(node)):
+        return None
+    
+    inits = [
+        stmt for stmt in body
+        if isinstance(stmt, ast.Assign) and len(stmt.targets) == 1
+        and isinstance(stmt.targets[0], ast.Name) and stmt.targets[0].id == name
+        and isinstance(stmt.value, ast.List) and not stmt.value.elts
+    ]
+    if len(inits) != 1:
+        return None
+    
+    allowed = {id(inits[0].targets[0]), id(body[-1].value)}
+    for child in ast.walk(node):
+        if (isinstance(child, ast.Call) and isinstance(child.func, ast.Attribute)
+                and child.func.attr == "append" and isinstance(child.func.value, ast.Name)
+                and child.func.value.id == name and len(child.args) == 1 and not child.keywords):
+            allowed.add(id(child.func.value))
+    for child in ast.walk(node):
+        if isinstance(child, ast.Name) and child.id == name and id(child) not in allowed:
+            return None
+        if isinstance(child, (ast.Global, ast.Nonlocal)) and name in child.names:
+            return None
+    return name
+
+
 def _extract_docstring(node: ast.FunctionDef) -> Optional[str]:
     """Extract docstring from function definition."""
     try:
@@ -46,6 +165,239 @@ def _extract_docstring(node: ast.FunctionDef) -> Optional[str]:
         return None
 
 
+def _module_bindings(tree: ast.Module) -> Tuple[Dict[str, str], Set[str], Set[str], Set[str]]:
+    """
+    Collect what the top-level names of a module are bound to.
+
+    Returns:
+        Tuple of (imported name -> root module, top-level function names,
+        immutable constant names, other module-level names)
+    """
+    imports: Dict[str, str] = {}
+    functions: Set[str] = set()
+    assignments: Dict[str, List[ast.AST]] = {}
+    others: Set[str] = set()
+
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                imports[alias.asname or alias.name.split(".")[0]] = alias.name.split(".")[0]
+        elif isinstance(node, ast.ImportFrom):
+            for alias in node.names:
+                imports[alias.asname or alias.name] = (node.module or "").split(".")[0]
+        elif isinstance(node, ast.FunctionDef):
+            functions.add(node.name)
+        elif isinstance(node, (ast.AsyncFunctionDef, ast.ClassDef)):
+            others.add(node.name)
+        elif isinstance(node, (ast.Assign, ast.AnnAssign)) and node.value is not None:
+            targets = node.targets if isinstance(node, ast.Assign) else [node.target]
+            for target in targets:
+                if isinstance(target, ast.Name):
+                    assignments.setdefault(target.id, []).append(node.value)
+                else:
+                    others.update(n.id for n in ast.walk(target) if isinstance(n, ast.Name))
+        else:
+            # Loops, with blocks, augmented assignments... bind mutable state
+            for child in ast.walk(node):
+                if isinstance(child, ast.Name) and isinstance(child.ctx, ast.Store):
+                    others.add(child.id)
+
+    constants = set()
+    for name, values in assignments.items():
+        if len(values) == 1 and name not in others and _is_immutable_literal(values[0]):
+            constants.add(name)
+        else:
+            others.add(name)
+
+    return imports, functions, constants, others
+
+
+def _is_immutable_literal(node: ast.AST) -> bool:
+    """Check whether an expression is a literal of an immutable type."""
+    try:
+        value = ast.literal_eval(node)
+    except (ValueError, TypeError, SyntaxError, MemoryError, RecursionError):
+        return False
+    immutable = (int, float, complex, str, bytes, bool, type(None), frozenset)
+    if isinstance(value, tuple):
+        return all(isinstance(item, immutable) for item in value)
+    return isinstance(value, immutable)
+
+
+def _function_locals(node: ast.FunctionDef) -> Set[str]:
+    """Names bound inside a function, including nested scopes and parameters."""
+    names: Set[str] = set()
+    for child in ast.walk(node):
+        if isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef, ast.Lambda)):
+            arguments = child.args
+            for arg in arguments.posonlyargs + arguments.args + arguments.kwonlyargs:
+                names.add(arg.arg)
+            for arg in (arguments.vararg, arguments.kwarg):
+                if arg is not None:
+                    names.add(arg.arg)
+            if child is not node and not isinstance(child, ast.Lambda):
+                names.add(child.name)
+        elif isinstance(child, ast.Name) and isinstance(child.ctx, (ast.Store, ast.Del)):
+            names.add(child.id)
+        elif isinstance(child, ast.ExceptHandler) and child.name:
+            names.add(child.name)
+        elif isinstance(child, (ast.Import, ast.ImportFrom)):
+            for alias in child.names:
+                names.add(alias.asname or alias.name.split(".")[0])
+    return names
+
+
+def _impurity_reasons(node: ast.FunctionDef, imports: Dict[str, str], functions: Set[str],
+                      constants: Set[str], others: Set[str]) -> Tuple[List[str], Set[str]]:
+    """
+    Find what makes a single function impure, ignoring the functions it calls.
+
+    Returns:
+        Tuple of (reasons, names of top-level functions it references)
+    """
+    reasons: List[str] = []
+    called: Set[str] = set()
+    local_names = _function_locals(node)
+
+    for child in ast.walk(node):
+        if isinstance(child, (ast.Global, ast.Nonlocal)):
+            kind = "global" if isinstance(child, ast.Global) else "nonlocal"
+            reasons.append(f"uses {kind} {', '.join(child.names)}")
+        elif isinstance(child, (ast.Yield, ast.YieldFrom, ast.Await)):
+            reasons.append("is a generator or coroutine")
+        elif isinstance(child, ast.Import):
+            for alias in child.names:
+                if alias.name.split(".")[0] not in PURE_MODULES:
+                    reasons.append(f"imports {alias.name}")
+        elif isinstance(child, ast.ImportFrom):
+            if (child.module or "").split(".")[0] not in PURE_MODULES:
+                reasons.append(f"imports from {child.module}")
+        elif isinstance(child, ast.Attribute) and child.attr in IMPURE_ATTRIBUTES:
+            reasons.append(f"uses .{child.attr}")
+        elif isinstance(child, ast.Name) and isinstance(child.ctx, ast.Load):
+            name = child.id
+            if name in local_names or name in constants:
+                continue
+            if name in functions:
+                called.add(name)
+            elif name in imports:
+                if imports[name] not in PURE_MODULES:
+                    reasons.append(f"uses module {imports[name]}")
+            elif name in others:
+                reasons.append(f"reads module-level {name}")
+            elif name in IMPURE_BUILTINS:
+                reasons.append(f"calls {name}()")
+            elif name not in _PURE_BUILTINS:
+                reasons.append(f"uses unresolved name {name}")
+
+    # Keep each reason once, in order of appearance
+    return list(dict.fromkeys(reasons)), called
+
+
+def classify_function_purity(tree: ast.Module) -> Dict[str, Tuple[bool, List[str]]]:
+    """
+    Classify the top-level functions of a module as pure or impure.
+
+    Args:
+        tree: Parsed module
+
+    Returns:
+        Mapping of function name to (is pure, reasons it is impure)
+    """
+    imports, functions, constants, others = _module_bindings(tree)
+
+    reasons: Dict[str, List[str]] = {}
+    references: Dict[str, Set[str]] = {}
+    for node in tree.body:
+        if isinstance(node, ast.FunctionDef):
+            reasons[node.name], references[node.name] = _impurity_reasons(
+                node, imports, functions, constants, others
+            )
+
+    # A function calling an impure function is impure; propagate to a fixed point
+    changed = True
+    while changed:
+        changed = False
+        for name, called in references.items():
+            if reasons[name]:
+                continue
+            impure_callees = sorted(callee for callee in called if reasons.get(callee))
+            if impure_callees:
+                reasons[name] = [f"calls impure {', '.join(impure_callees)}"]
+                changed = True
+
+    return {name: (not why, why) for name, why in reasons.items()}
+
+
+def _parent_map(node: ast.AST) -> Dict[int, ast.AST]:
+    return {id(child): parent for parent in ast.walk(node) for child in ast.iter_child_nodes(parent)}
+
+
+def _is_read_only_use(node: ast.AST, parents: Dict[int, ast.AST],
+                      functions: Dict[str, ast.FunctionDef], readonly: Dict[str, Set[str]]) -> bool:
+    """Check that one use of a sequence only reads it (see ``classify_readonly_arguments``)."""
+    parent = parents.get(id(node))
+    if isinstance(parent, ast.Subscript) and parent.value is node:
+        if not isinstance(parent.ctx, ast.Load):
+            return False
+        # A slice is another view of the same sequence
+        return not isinstance(parent.slice, ast.Slice) or _is_read_only_use(parent, parents, functions, readonly)
+    if isinstance(parent, ast.UnaryOp) and isinstance(parent.op, ast.Not):
+        return True
+    if isinstance(parent, (ast.If, ast.While, ast.IfExp, ast.Assert)) and parent.test is node:
+        return True
+    if isinstance(parent, (ast.For, ast.comprehension)) and parent.iter is node:
+        return True
+    if isinstance(parent, ast.Compare) and node in parent.comparators:
+        op = parent.ops[parent.comparators.index(node)]
+        return isinstance(op, (ast.In, ast.NotIn))
+    if isinstance(parent, ast.Call) and node in parent.args:
+        func = parent.func
+        if isinstance(func, ast.Name) and func.id in functions:
+            params = [arg.arg for arg in functions[func.id].args.args]
+            position = parent.args.index(node)
+            return position < len(params) and params[position] in readonly[func.id]
+        if isinstance(func, ast.Name):
+            return func.id in READONLY_SEQUENCE_CALLS
+        if isinstance(func, ast.Attribute) and isinstance(func.value, ast.Name):
+            return func.value.id in READONLY_SEQUENCE_MODULES
+    return False
+
+
+def classify_readonly_arguments(tree: ast.Module) -> Dict[str, Set[str]]:
+    """
+    Find the parameters each top-level function only reads as a sequence.
+    
+    Such a parameter is only measured, iterated, indexed, sliced,
+    truth-tested, tested with ``in`` or passed where the same holds (read-only
+    builtins, ``math``/``statistics`` functions, or a read-only parameter of
+    another top-level function). It can be given any read-only sequence,
+    such as a memoryview over a binary request body, instead of a list.
+    
+    Args:
+        tree: Parsed module
+        
+    Returns:
+        Mapping of function name to its read-only parameter names
+    """
+    functions = {node.name: node for node in tree.body if isinstance(node, ast.FunctionDef)}
+    parents = {name: _parent_map(node) for name, node in functions.items()}
+    
+    # Start from "everything is read-only" and remove parameters until stable,
+    # so recursive functions can keep theirs
+    readonly = {name: {arg.arg for arg in node.args.args} for name, node in functions.items()}
+    changed = True
+    while changed:
+        changed = False
+        for name, node in functions.items():
+            for arg in sorted(readonly[name]):
+                uses = [child for child in ast.walk(node) if isinstance(child, ast.Name) and child.id == arg]
+                if not all(_is_read_only_use(use, parents[name], functions, readonly) for use in uses):
+                    readonly[name].discard(arg)
+                    changed = True
+    return readonly
+
+
 def extract_functions_from_source(source: str) -> List[Dict[str, Any]]:
     """
     Extract all top-level function definitions from Python source code.
@@ -59,8 +411,15 @@ def extract_functions_from_source(source: str) -> List[Dict[str, Any]]:
         - args: List of argument names
         - defaults: Dict of default values
         - type_hints: Dict of type hints
+        - return_type: Return annotation (None if missing)
+        - decorators: Decorator expressions
+        - is_generator: Whether the function yields its results
+        - accumulator: Name of the list the function only appends to and
+          returns (None if it doesn't follow that pattern)
         - docstring: Function docstring
         - source: Original function source code
+        - pure: Whether the function only depends on its arguments
+        - impure_reasons: Why the function is not pure (empty if pure)
     """
     try:
         tree = ast.parse(source)
@@ -68,6 +427,8 @@ def extract_functions_from_source(source: str) -> List[Dict[str, Any]]:
         raise ValueError(f"Invalid Python syntax: {e}")
     
     functions = []
+    purity = classify_function_purity(tree)
+    readonly = classify_readonly_arguments(tree)
     
     for node in tree.body:
         if isinstance(node, ast.FunctionDef):
@@ -109,8 +470,15 @@ def extract_functions_from_source(source: str) -> List[Dict[str, Any]]:
                 "args": args_list,
                 "defaults": defaults,
                 "type_hints": type_hints,
+                "return_type": _extract_return_type(node),
+                "decorators": _extract_decorators(node),
+                "is_generator": _is_generator(node),
+                "accumulator": _find_accumulator(node),
+                "readonly_args": sorted(readonly[name]),
                 "docstring": docstring,
                 "source": function_source,
+                "pure": purity[name][0],
+                "impure_reasons": purity[name][1],
                 "line_number": node.lineno if hasattr(node, 'lineno') else None
             })
     
@@ -188,8 +556,8 @@ def get_function_signature(function_def: Dict[str, Any]) -> str:
     signature = f"def {name}({', '.join(arg_parts)})"
     
     # Add return type hint if available
-    # Note: This would require parsing the function body for return annotations
-    # For now, we'll skip this as it's more complex
+    if function_def.get("return_type"):
+        signature += f" -> {function_def['return_type']}"
     
     return signature
 
@@ -0,0 +1,386 @@
+"""
+Versioned API Registry
+=====================
+
+Hosts many generated APIs side by side under ``/apis/{name}/v{n}``.
+Generated sources are persisted on disk; their compiled modules are kept
+in memory under an LRU bounded by a memory budget and are recompiled
+lazily from disk the first time an evicted version is requested.
+"""
+
+import os
+import re
+import json
+import time
+import threading
+import logging
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import anyio
+from fastapi import FastAPI
+
+from .hotload import compile_generated_module, unload_module
+from .artifacts import ArtifactStore
+
+logger = logging.getLogger(__name__)
+
+# Rough in-memory cost of a compiled generated app, used for the memory budget:
+# code objects and function/route objects scale with the source size, and every
+# route carries FastAPI dependant/model objects on top of that
+SOURCE_MEMORY_FACTOR = 12
+ROUTE_MEMORY_OVERHEAD = 24 * 1024
+BASE_MEMORY_OVERHEAD = 256 * 1024
+
+_NAME_PATTERN = re.compile(r"^[A-Za-z0-9_-]+$")
+_VERSION_FILE_PATTERN = re.compile(r"^v(\d+)\.py$")
+
+
+def sanitize_api_name(name: str) -> str:
+    """
+    Turn an arbitrary label (file name, group) into a registry API name.
+
+    Args:
+        name: Raw name
+
+    Returns:
+        Name containing only letters, digits, ``_`` and ``-``
+    """
+    cleaned = re.sub(r"[^A-Za-z0-9_-]", "_", name.strip())
+    return cleaned or "default"
+
+
+class _LoadedVersion:
+    """A compiled API version held in the LRU."""
+
+    __slots__ = ("module", "app", "size")
+
+    def __init__(self, module, app: FastAPI, size: int):
+        self.module = module
+        self.app = app
+        self.size = size
+
+
+class APIRegistry:
+    """
+    Registry of generated APIs, addressable by name and version.
+
+    The registry is also an ASGI app: mount it (e.g. at ``/apis``) and it
+    dispatches ``/{name}/v{n}/...`` to the generated app of that version.
+    """
+
+    def __init__(self, root_dir: Path, memory_budget: int = 256 * 1024 * 1024,
+                 max_loaded: Optional[int] = None,
+                 artifact_store: Optional[ArtifactStore] = None):
+        """
+        Initialize the registry.
+
+        Args:
+            root_dir: Directory holding ``{name}/v{n}.py`` sources
+            memory_budget: Approximate bytes of compiled apps to keep loaded
+            max_loaded: Optional cap on the number of loaded versions
+            artifact_store: Store to load precompiled versions from instead
+                of recompiling their sources
+        """
+        self.root_dir = Path(root_dir)
+        self.root_dir.mkdir(parents=True, exist_ok=True)
+        self.memory_budget = memory_budget
+        self.max_loaded = max_loaded
+        self.artifact_store = artifact_store
+
+        self._loaded: "OrderedDict[Tuple[str, int], _LoadedVersion]" = OrderedDict()
+        self._loaded_bytes = 0
+        self._latest: Dict[str, int] = self._scan_versions()
+        self._latest_keys: Dict[str, Optional[str]] = {
+            name: self._read_meta(name, version).get("key")
+            for name, version in self._latest.items()
+        }
+        self._lock = threading.RLock()
+        self._load_locks: Dict[Tuple[str, int], threading.Lock] = {}
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    # ------------------------------------------------------------------
+    # Publishing and lookup
+    # ------------------------------------------------------------------
+
+    def publish(self, name: str, generated_source: str, endpoints: List[str],
+                key: Optional[str] = None, artifact_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Store generated source as the next version of an API and load it.
+
+        Args:
+            name: API name
+            generated_source: Generated FastAPI source code
+            endpoints: Endpoint paths exposed by the generated app
+            key: Content key of the generation; republishing the key of the
+                latest version returns that version instead of a new one
+            artifact_id: Id of the generation in the artifact store, used to
+                load this version without compiling
+
+        Returns:
+            Dictionary with the API name, version, base path and whether a
+            new version was created
+        """
+        if not _NAME_PATTERN.match(name):
+            raise ValueError(f"Invalid API name: {name!r}")
+
+        with self._lock:
+            if key is not None and self._latest_keys.get(name) == key:
+                version = self._latest[name]
+                return {
+                    "name": name,
+                    "version": version,
+                    "base_path": f"/{name}/v{version}",
+                    "created": False
+                }
+
+        # Load first so a broken generation never gets a version number
+        module = self._load_module(generated_source, f"<registry:{name}>", artifact_id)
+
+        with self._lock:
+            version = self._latest.get(name, 0) + 1
+            api_dir = self.root_dir / name
+            api_dir.mkdir(exist_ok=True)
+
+            _atomic_write(api_dir / f"v{version}.py", generated_source)
+            _atomic_write(api_dir / f"v{version}.json", json.dumps({
+                "endpoints": endpoints,
+                "key": key,
+                "artifact": artifact_id,
+                "created": time.time()
+            }))
+            self._latest[name] = version
+            self._latest_keys[name] = key
+
+            self._insert((name, version), module, len(generated_source))
+
+        logger.info(f"Published API {name} v{version} ({len(endpoints)} endpoints)")
+
+        return {
+            "name": name,
+            "version": version,
+            "base_path": f"/{name}/v{version}",
+            "created": True
+        }
+
+    def get_app(self, name: str, version: int) -> Optional[FastAPI]:
+        """
+        Get the generated app of an API version, loading it from disk if evicted.
+
+        Args:
+            name: API name
+            version: Version number
+
+        Returns:
+            The generated FastAPI app, or None if the version does not exist
+        """
+        key = (name, version)
+        app = self._lookup(key)
+        if app is not None:
+            return app
+        return self._load(key)
+
+    def list_apis(self) -> Dict[str, Any]:
+        """
+        List registered APIs with their versions.
+
+        Returns:
+            Mapping of API name to latest version and loaded versions
+        """
+        with self._lock:
+            loaded: Dict[str, List[int]] = {}
+            for name, version in self._loaded:
+                loaded.setdefault(name, []).append(version)
+
+            return {
+                name: {
+                    "latest": latest,
+                    "loaded_versions": sorted(loaded.get(name, []))
+                }
+                for name, latest in sorted(self._latest.items())
+            }
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics for the compiled-module LRU.
+
+        Returns:
+            Dictionary containing cache statistics
+        """
+        with self._lock:
+            return {
+                "apis": len(self._latest),
+                "loaded_versions": len(self._loaded),
+                "loaded_bytes": self._loaded_bytes,
+                "memory_budget": self.memory_budget,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions
+            }
+
+    # ------------------------------------------------------------------
+    # ASGI dispatch
+    # ------------------------------------------------------------------
+
+    async def __call__(self, scope, receive, send) -> None:
+        """Dispatch ``/{name}/v{n}/...`` to the matching generated app."""
+        if scope["type"] not in ("http", "websocket"):
+            return
+
+        path = scope["path"]
+        root_path = scope.get("root_path", "")
+        full_path = bool(root_path) and path.startswith(root_path)
+        route_path = path[len(root_path):] if full_path else path
+
+        parts = route_path.split("/", 3)
+        target = _parse_target(parts)
+        if target is None:
+            await _not_found(scope, receive, send)
+            return
+
+        name, version = target
+        app = self._lookup((name, version))
+        if app is None:
+            # Cold version: compile off the event loop
+            app = await anyio.to_thread.run_sync(self._load, (name, version))
+        if app is None:
+            await _not_found(scope, receive, send)
+            return
+
+        prefix = f"/{name}/v{version}"
+        child_scope = dict(scope)
+        child_scope["root_path"] = root_path + prefix
+        if not full_path:
+            # Older Starlette strips mount prefixes from the path itself
+            child_scope["path"] = route_path[len(prefix):] or "/"
+
+        await app(child_scope, receive, send)
+
+    # ------------------------------------------------------------------
+    # LRU internals
+    # ------------------------------------------------------------------
+
+    def _load(self, key: Tuple[str, int]) -> Optional[FastAPI]:
+        """Compile an API version from disk into the LRU."""
+        name, version = key
+        source_path = self.root_dir / name / f"v{version}.py"
+        if not _NAME_PATTERN.match(name) or not source_path.exists():
+            return None
+
+        # One loader per version; concurrent first hits wait for it
+        with self._lock:
+            load_lock = self._load_locks.setdefault(key, threading.Lock())
+
+        with load_lock:
+            app = self._lookup(key, count=False)
+            if app is not None:
+                return app
+
+            source = source_path.read_text()
+            artifact_id = self._read_meta(name, version).get("artifact")
+            module = self._load_module(source, str(source_path), artifact_id)
+            with self._lock:
+                entry = self._insert(key, module, len(source))
+                self._load_locks.pop(key, None)
+            logger.info(f"Loaded API {name} v{version} from disk")
+            return entry.app
+
+    def _lookup(self, key: Tuple[str, int], count: bool = True) -> Optional[FastAPI]:
+        with self._lock:
+            entry = self._loaded.get(key)
+            if entry is None:
+                if count:
+                    self.misses += 1
+                return None
+            self._loaded.move_to_end(key)
+            if count:
+                self.hits += 1
+            return entry.app
+
+    def _insert(self, key: Tuple[str, int], module, source_size: int) -> _LoadedVersion:
+        app = getattr(module, "app", None)
+        if not isinstance(app, FastAPI):
+            unload_module(module)
+            raise ValueError("Generated source does not define a FastAPI `app`")
+
+        size = (BASE_MEMORY_OVERHEAD + source_size * SOURCE_MEMORY_FACTOR
+                + len(app.router.routes) * ROUTE_MEMORY_OVERHEAD)
+        entry = _LoadedVersion(module, app, size)
+
+        previous = self._loaded.pop(key, None)
+        if previous is not None:
+            self._loaded_bytes -= previous.size
+            unload_module(previous.module)
+
+        self._loaded[key] = entry
+        self._loaded_bytes += size
+        self._evict(keep=key)
+        return entry
+
+    def _evict(self, keep: Tuple[str, int]) -> None:
+        while len(self._loaded) > 1 and (
+            self._loaded_bytes > self.memory_budget
+            or (self.max_loaded is not None and len(self._loaded) > self.max_loaded)
+        ):
+            key, entry = next(iter(self._loaded.items()))
+            if key == keep:
+                break
+            del self._loaded[key]
+            self._loaded_bytes -= entry.size
+            unload_module(entry.module)
+            self.evictions += 1
+            logger.info(f"Evicted API {key[0]} v{key[1]} from memory")
+
+    def _load_module(self, source: str, filename: str, artifact_id: Optional[str]):
+        if artifact_id and self.artifact_store is not None and self.artifact_store.exists(artifact_id):
+            return self.artifact_store.load(artifact_id)
+        return compile_generated_module(source, filename=filename)
+
+    def _read_meta(self, name: str, version: int) -> Dict[str, Any]:
+        try:
+            return json.loads((self.root_dir / name / f"v{version}.json").read_text())
+        except (OSError, ValueError):
+            return {}
+
+    def _scan_versions(self) -> Dict[str, int]:
+        latest = {}
+        for api_dir in self.root_dir.iterdir():
+            if not api_dir.is_dir() or not _NAME_PATTERN.match(api_dir.name):
+                continue
+            versions = [
+                int(match.group(1))
+                for match in map(_VERSION_FILE_PATTERN.match, os.listdir(api_dir))
+                if match
+            ]
+            if versions:
+                latest[api_dir.name] = max(versions)
+        return latest
+
+
+def _parse_target(parts: List[str]) -> Optional[Tuple[str, int]]:
+    """Parse ``['', name, 'v{n}', ...]`` into ``(name, n)``."""
+    if len(parts) < 3 or parts[0] != "":
+        return None
+    name, version = parts[1], parts[2]
+    if not _NAME_PATTERN.match(name) or not version.startswith("v") or not version[1:].isdigit():
+        return None
+    return name, int(version[1:])
+
+
+async def _not_found(scope, receive, send) -> None:
+    if scope["type"] != "http":
+        return
+    from starlette.responses import JSONResponse
+    response = JSONResponse({"detail": "API version not found"}, status_code=404)
+    await response(scope, receive, send)
+
+
+def _atomic_write(path: Path, content: str) -> None:
+    """Write a file so readers never observe a partial write."""
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    tmp_path.write_text(content)
+    os.replace(tmp_path, path)
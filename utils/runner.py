@@ -4,21 +4,50 @@ API Server Runner
 
 Manages the lifecycle of the generated FastAPI server.
 Handles starting, stopping, and restarting the API server process.
+
+In blue/green mode the runner owns the public listening socket and hands
+it to every server generation, so restarts never close the port: a new
+generation first serves only a private probe port, is health-checked
+there, and only then is told (over a go pipe) to start accepting on the
+shared socket. Once it reports that it does, the previous generation is
+drained and stopped. A generation failing its check never sees public
+traffic.
+
+Readiness is pushed rather than polled: every server process inherits the
+write end of a pipe and the bootstrap writes to it once the app's lifespan
+startup has completed (the routes are loaded and the sockets are being
+served). ``start()`` returns as soon as that message arrives, and a child
+that dies during startup is noticed immediately through EOF on the pipe.
+Only the ``reload=True`` mode, which runs the uvicorn CLI with its file
+watcher, still falls back to polling the port.
+
+Server output is drained continuously by background threads into a
+bounded ``LogBuffer`` (optionally rotated to disk), so a chatty app never
+blocks on a full stdout pipe; ``get_logs`` and ``follow_logs`` read it.
 """
 
 import os
 import sys
 import time
+import select
 import signal
+import socket
+import threading
 import subprocess
 from pathlib import Path
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Tuple
 import logging
 
+from .logs import LogBuffer, drain_stream
+from .serve import GO_MESSAGE
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Child entry point that serves an app on inherited sockets
+SERVE_SCRIPT = Path(__file__).with_name("serve.py")
+
 
 class APIServerRunner:
     """
@@ -28,7 +57,9 @@ class APIServerRunner:
     process management and error handling.
     """
     
-    def __init__(self, app_module_path: Path, port: int = 8001, host: str = "0.0.0.0"):
+    def __init__(self, app_module_path: Path, port: int = 8001, host: str = "0.0.0.0",
+                 blue_green: bool = False, drain_timeout: int = 30, reload: bool = False,
+                 log_lines: int = 2000, log_file: Optional[Path] = None):
         """
         Initialize the API server runner.
         
@@ -36,12 +67,32 @@ class APIServerRunner:
             app_module_path: Path to the generated FastAPI app file
             port: Port to run the server on
             host: Host to bind the server to
+            blue_green: Restart by starting a new generation next to the old
+                one instead of stopping first (requires inheritable sockets,
+                so it is unavailable on Windows)
+            drain_timeout: Seconds an old generation may spend finishing
+                in-flight requests before it is killed
+            reload: Run the uvicorn CLI with ``--reload`` so the server restarts
+                itself when the app file changes (readiness is then polled)
+            log_lines: Number of recent output lines kept in memory
+            log_file: Optional file to also write server output to (rotated)
         """
         self.app_module_path = Path(app_module_path)
         self.port = port
         self.host = host
+        self.drain_timeout = drain_timeout
+        # Inherited sockets and pipes need fork/exec semantics
+        self.reload = reload or os.name == "nt"
+        self.blue_green = blue_green and not self.reload
+        self.generation = 0
+        self.ready_ms: Optional[float] = None
+        self.logs = LogBuffer(max_lines=log_lines, log_file=log_file)
         self._process: Optional[subprocess.Popen] = None
         self._start_time: Optional[float] = None
+        self._listen_sock: Optional[socket.socket] = None
+        
+        if blue_green and not self.blue_green:
+            logger.warning("Blue/green restarts are not available with reload or on this platform; using stop/start")
         
         # Validate app path
         if not self.app_module_path.exists():
@@ -73,6 +124,11 @@ class APIServerRunner:
             "host": self.host,
             "app_path": str(self.app_module_path),
             "app_exists": self.app_module_path.exists(),
+            "mode": "blue_green" if self.blue_green else "restart",
+            "readiness": "poll" if self.reload else "signal",
+            "generation": self.generation,
+            "ready_ms": round(self.ready_ms, 3) if self.ready_ms is not None else None,
+            "logs": self.logs.get_stats(),
             "uptime": None,
             "pid": None
         }
@@ -103,40 +159,45 @@ class APIServerRunner:
             return False
         
         try:
-            # Build command
-            cmd = [
-                sys.executable,
-                "-m", "uvicorn",
-                f"{self.app_module_path.stem}:app",
-                "--host", self.host,
-                "--port", str(self.port),
-                "--reload"
-            ]
-            
-            # Set environment
-            env = os.environ.copy()
-            env["PYTHONPATH"] = str(self.app_module_path.parent) + os.pathsep + env.get("PYTHONPATH", "")
-            
-            # Start process
             logger.info(f"Starting API server on {self.host}:{self.port}")
-            self._process = subprocess.Popen(
-                cmd,
-                cwd=str(self.app_module_path.parent),
-                env=env,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.STDOUT,
-                text=True,
-                bufsize=1
-            )
             
-            self._start_time = time.time()
+            if not self.reload:
+                self._process, _, ready_fd, _ = self._spawn_generation(probe=False)
+                self._start_time = time.time()
+                self.generation += 1
+                ready = self._wait_for_ready(self._process, ready_fd, timeout)
+            else:
+                # Build command
+                cmd = [
+                    sys.executable,
+                    "-m", "uvicorn",
+                    f"{self.app_module_path.stem}:app",
+                    "--host", self.host,
+                    "--port", str(self.port),
+                    "--reload"
+                ]
+                
+                # Start process
+                self._process = subprocess.Popen(
+                    cmd,
+                    cwd=str(self.app_module_path.parent),
+                    env=self._child_env(),
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.STDOUT
+                )
+                drain_stream(self._process.stdout, self.logs, source=f"gen-{self.generation + 1}")
+                self._start_time = time.time()
+                self.generation += 1
+                started_at = time.perf_counter()
+                ready = self._wait_for_server(timeout)
+                if ready:
+                    self.ready_ms = (time.perf_counter() - started_at) * 1000
             
-            # Wait for server to start
-            if self._wait_for_server(timeout):
+            if ready:
                 logger.info(f"API server started successfully (PID: {self._process.pid})")
                 return True
             else:
-                logger.error("Server failed to start within timeout")
+                logger.error("Server failed to become ready")
                 self.stop()
                 return False
                 
@@ -156,26 +217,44 @@ class APIServerRunner:
         """
         if not self.is_running():
             logger.info("Server is not running")
+            self._close_listen_socket()
             return True
         
         try:
             logger.info(f"Stopping API server (PID: {self._process.pid})")
+            return self._terminate_process(self._process, timeout)
+        finally:
+            self._process = None
+            self._start_time = None
+            self._close_listen_socket()
+    
+    def _terminate_process(self, process: subprocess.Popen, timeout: int) -> bool:
+        """
+        Terminate a server process, killing it if it does not exit in time.
+        
+        Args:
+            process: Server process
+            timeout: Maximum time to wait for graceful shutdown (seconds)
             
+        Returns:
+            True if the process exited, False otherwise
+        """
+        try:
             # Try graceful shutdown first
-            self._process.terminate()
+            process.terminate()
             
             # Wait for graceful shutdown
             try:
-                self._process.wait(timeout=timeout)
-                logger.info("Server stopped gracefully")
+                process.wait(timeout=timeout)
+                logger.info(f"Server stopped gracefully (PID: {process.pid})")
                 return True
             except subprocess.TimeoutExpired:
                 logger.warning("Graceful shutdown timeout, forcing kill")
                 
                 # Force kill
-                self._process.kill()
+                process.kill()
                 try:
-                    self._process.wait(timeout=2)
+                    process.wait(timeout=2)
                     logger.info("Server force-killed")
                     return True
                 except subprocess.TimeoutExpired:
@@ -185,9 +264,6 @@ class APIServerRunner:
         except Exception as e:
             logger.error(f"Error stopping server: {e}")
             return False
-        finally:
-            self._process = None
-            self._start_time = None
     
     def restart(self, timeout: int = 10) -> bool:
         """
@@ -201,19 +277,229 @@ class APIServerRunner:
         """
         logger.info("Restarting API server")
         
+        if self.blue_green and self.is_running():
+            return self._blue_green_restart(timeout)
+        
         # Stop current server
         if not self.stop():
             logger.warning("Failed to stop existing server, attempting restart anyway")
         
-        # Small delay to ensure port is released
-        time.sleep(0.5)
+        if self.reload:
+            # Small delay to ensure port is released
+            time.sleep(0.5)
         
         # Start new server
         return self.start(timeout)
     
+    def _blue_green_restart(self, timeout: int) -> bool:
+        """
+        Replace the running generation without closing the public port.
+        
+        The new generation starts serving only its private probe port. Once
+        it has signalled readiness and answered one request there, it is
+        told to accept on the shared listening socket; when it confirms, the
+        old generation is drained and stopped in the background.
+        If the new generation fails, it is stopped and the old one keeps serving.
+        
+        Args:
+            timeout: Maximum time to wait for the new generation (seconds)
+            
+        Returns:
+            True if traffic moved to the new generation, False otherwise
+        """
+        old_process = self._process
+        
+        try:
+            new_process, probe_port, ready_fd, go_fd = self._spawn_generation(probe=True)
+        except Exception as e:
+            logger.error(f"Failed to launch new server generation: {e}")
+            return False
+        
+        try:
+            healthy = (self._wait_for_ready(new_process, ready_fd, timeout, close=False)
+                       and self._probe(probe_port)
+                       and self._go_live(new_process, ready_fd, go_fd, timeout))
+        finally:
+            # EOF on the go pipe tells a rejected generation to stay off the shared socket
+            for fd in (go_fd, ready_fd):
+                try:
+                    os.close(fd)
+                except OSError:
+                    pass
+        
+        if not healthy:
+            logger.error("New server generation failed its health check, keeping the current one")
+            self._terminate_process(new_process, timeout=2)
+            return False
+        
+        # Flip: the new generation is serving, retire the old one
+        self._process = new_process
+        self._start_time = time.time()
+        self.generation += 1
+        logger.info(f"Generation {self.generation} live (PID: {new_process.pid}), draining PID {old_process.pid}")
+        
+        threading.Thread(
+            target=self._terminate_process,
+            args=(old_process, self.drain_timeout + 1),
+            daemon=True
+        ).start()
+        
+        return True
+    
+    def _go_live(self, process: subprocess.Popen, ready_fd: int, go_fd: int, timeout: float) -> bool:
+        """
+        Tell a health-checked generation to accept on the shared socket.
+        
+        Returns:
+            True once it reports serving the shared socket
+        """
+        try:
+            os.write(go_fd, GO_MESSAGE)
+        except OSError:
+            return False
+        return self._wait_for_message(process, ready_fd, timeout) is not None
+    
+    def _spawn_generation(self, probe: bool = True) -> Tuple[subprocess.Popen, Optional[int], int, Optional[int]]:
+        """
+        Launch a server generation on the shared listening socket.
+        
+        Args:
+            probe: Give the generation a private probe socket and keep it
+                off the shared socket until told to go (see ``_go_live``)
+            
+        Returns:
+            Tuple of (server process, private probe port or None, read end
+            of the readiness pipe, write end of the go pipe or None)
+        """
+        if self._listen_sock is None:
+            self._listen_sock = _bind_listen_socket(self.host, self.port)
+        
+        probe_sock = _bind_listen_socket("127.0.0.1", 0) if probe else None
+        ready_read, ready_write = os.pipe()
+        go_read, go_write = os.pipe() if probe else (None, None)
+        try:
+            cmd = [
+                sys.executable,
+                str(SERVE_SCRIPT),
+                f"{self.app_module_path.stem}:app",
+                "--app-dir", str(self.app_module_path.parent),
+                "--timeout-graceful-shutdown", str(self.drain_timeout),
+                "--ready-fd", str(ready_write)
+            ]
+            probe_port = None
+            if probe_sock is not None:
+                probe_port = probe_sock.getsockname()[1]
+                fds = [probe_sock.fileno(), self._listen_sock.fileno(), go_read]
+                cmd += ["--fd", str(probe_sock.fileno()),
+                        "--standby-fd", str(self._listen_sock.fileno()),
+                        "--go-fd", str(go_read)]
+            else:
+                fds = [self._listen_sock.fileno()]
+                cmd += ["--fd", str(self._listen_sock.fileno())]
+            
+            process = subprocess.Popen(
+                cmd,
+                cwd=str(self.app_module_path.parent),
+                env=self._child_env(),
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                pass_fds=fds + [ready_write]
+            )
+            drain_stream(process.stdout, self.logs, source=f"gen-{self.generation + 1}")
+        except BaseException:
+            os.close(ready_read)
+            if go_write is not None:
+                os.close(go_write)
+            raise
+        finally:
+            # The child holds its own copies; keeping the write end open here
+            # would hide the EOF that signals a dead child
+            os.close(ready_write)
+            if go_read is not None:
+                os.close(go_read)
+            if probe_sock is not None:
+                probe_sock.close()
+        
+        return process, probe_port, ready_read, go_write
+    
+    def _child_env(self) -> Dict[str, str]:
+        """Environment for server processes, with the app directory importable."""
+        env = os.environ.copy()
+        env["PYTHONPATH"] = str(self.app_module_path.parent) + os.pathsep + env.get("PYTHONPATH", "")
+        return env
+    
+    def _close_listen_socket(self) -> None:
+        """Release the shared listening socket."""
+        if self._listen_sock is not None:
+            self._listen_sock.close()
+            self._listen_sock = None
+    
+    def _wait_for_ready(self, process: subprocess.Popen, ready_fd: int, timeout: float,
+                        close: bool = True) -> bool:
+        """
+        Block until a server process signals readiness on its pipe.
+        
+        Args:
+            process: Server process
+            ready_fd: Read end of the process's readiness pipe
+            timeout: Maximum time to wait (seconds)
+            close: Close ``ready_fd`` on return
+            
+        Returns:
+            True if the process reported that it is serving, False if it
+            exited, failed its startup or timed out
+        """
+        started_at = time.perf_counter()
+        try:
+            if self._wait_for_message(process, ready_fd, timeout) is None:
+                return False
+            self.ready_ms = (time.perf_counter() - started_at) * 1000
+            logger.info(f"Server process {process.pid} ready in {self.ready_ms:.1f} ms")
+            return True
+        finally:
+            if close:
+                os.close(ready_fd)
+    
+    def _wait_for_message(self, process: subprocess.Popen, fd: int, timeout: float) -> Optional[bytes]:
+        """
+        Read the next message a server process writes to its readiness pipe.
+        
+        Returns:
+            The message, or None on EOF (the child gave up or died) or timeout
+        """
+        deadline = time.perf_counter() + timeout
+        while True:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                return None
+            readable, _, _ = select.select([fd], [], [], remaining)
+            if readable:
+                message = os.read(fd, 64)
+                if not message:
+                    logger.error(f"Server process {process.pid} exited or failed to start serving")
+                    return None
+                return message
+    
+    def _probe(self, port: int) -> bool:
+        """
+        Send one request to a generation's private probe port.
+        
+        Args:
+            port: Probe port
+            
+        Returns:
+            True if the generation answered successfully
+        """
+        import requests
+        
+        try:
+            return requests.get(f"http://127.0.0.1:{port}/openapi.json", timeout=2).status_code == 200
+        except requests.RequestException:
+            return False
+    
     def _wait_for_server(self, timeout: int) -> bool:
         """
-        Wait for the server to be ready to accept connections.
+        Poll until the server accepts connections (``reload`` mode only).
         
         Args:
             timeout: Maximum time to wait (seconds)
@@ -221,14 +507,16 @@ class APIServerRunner:
         Returns:
             True if server is ready, False if timeout
         """
-        import socket
         import requests
         
+        process = self._process
+        host = "127.0.0.1" if self.host in ("0.0.0.0", "::") else self.host
+        port = self.port
         start_time = time.time()
         
         while time.time() - start_time < timeout:
             # Check if process is still running
-            if not self.is_running():
+            if process is None or process.poll() is not None:
                 return False
             
             # Try to connect to the server
@@ -236,13 +524,13 @@ class APIServerRunner:
                 # Check if port is open
                 sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
                 sock.settimeout(1)
-                result = sock.connect_ex((self.host, self.port))
+                result = sock.connect_ex((host, port))
                 sock.close()
                 
                 if result == 0:
                     # Try HTTP request
                     try:
-                        response = requests.get(f"http://{self.host}:{self.port}/docs", timeout=2)
+                        response = requests.get(f"http://{host}:{port}/docs", timeout=2)
                         if response.status_code == 200:
                             return True
                     except requests.RequestException:
@@ -265,15 +553,24 @@ class APIServerRunner:
         Returns:
             Recent log output as string
         """
-        if not self.is_running() or self._process is None:
-            return "Server is not running"
+        entries = self.logs.tail(lines)
+        if not entries:
+            return "No server output captured yet"
+        return "\n".join(f"[{entry['source']}] {entry['line']}" for entry in entries)
+    
+    def follow_logs(self, since: int = 0, timeout: float = 0.0, limit: int = 1000) -> Dict[str, Any]:
+        """
+        Get server output newer than a sequence number.
         
-        try:
-            # This is a simplified version - in practice, you might want to
-            # implement a more sophisticated log collection mechanism
-            return f"Server running (PID: {self._process.pid}) - logs not available in this implementation"
-        except Exception as e:
-            return f"Error retrieving logs: {e}"
+        Args:
+            since: Sequence number to continue from (``next`` of the previous call)
+            timeout: Seconds to wait for new output if there is none yet
+            limit: Maximum number of lines to return
+            
+        Returns:
+            Dictionary with ``lines``, ``next`` and ``skipped`` (see ``LogBuffer.follow``)
+        """
+        return self.logs.follow(since, timeout=timeout, limit=limit)
     
     def health_check(self) -> Dict[str, Any]:
         """
@@ -337,7 +634,9 @@ class APIServerRunner:
         self.stop()
 
 
-def create_server_runner(app_path: str, port: int = 8001, host: str = "0.0.0.0") -> APIServerRunner:
+def create_server_runner(app_path: str, port: int = 8001, host: str = "0.0.0.0",
+                         blue_green: bool = False, reload: bool = False,
+                         log_file: Optional[str] = None) -> APIServerRunner:
     """
     Create a new API server runner instance.
     
@@ -345,6 +644,9 @@ def create_server_runner(app_path: str, port: int = 8001, host: str = "0.0.0.0")
         app_path: Path to the FastAPI app file
         port: Port to run the server on
         host: Host to bind the server to
+        blue_green: Use zero-downtime blue/green restarts
+        reload: Let uvicorn restart the server when the app file changes
+        log_file: Optional file to also write server output to
         
     Returns:
         Configured APIServerRunner instance
@@ -352,10 +654,36 @@ def create_server_runner(app_path: str, port: int = 8001, host: str = "0.0.0.0")
     return APIServerRunner(
         app_module_path=Path(app_path),
         port=port,
-        host=host
+        host=host,
+        blue_green=blue_green,
+        reload=reload,
+        log_file=Path(log_file) if log_file else None
     )
 
 
+def _bind_listen_socket(host: str, port: int) -> socket.socket:
+    """
+    Create a listening TCP socket that can be handed to server processes.
+    
+    Args:
+        host: Host to bind
+        port: Port to bind (0 for an ephemeral port)
+        
+    Returns:
+        Bound, listening socket
+    """
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    try:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind((host, port))
+        sock.listen(2048)
+    except OSError:
+        sock.close()
+        raise
+    return sock
+
+
 def check_port_available(host: str, port: int) -> bool:
     """
     Check if a port is available for binding.
@@ -367,8 +695,6 @@ def check_port_available(host: str, port: int) -> bool:
     Returns:
         True if port is available, False otherwise
     """
-    import socket
-    
     try:
         with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
             sock.settimeout(1)
@@ -0,0 +1,179 @@
+"""
+Generated App Server Bootstrap
+=============================
+
+Child-process entry point used by APIServerRunner. Serves an ASGI app
+with uvicorn on listening sockets inherited from the runner instead of
+binding its own, so consecutive server generations can share one public
+socket while each keeps a private probe socket for health checks.
+
+With ``--ready-fd`` the bootstrap writes ``READY_MESSAGE`` to an inherited
+pipe as soon as the app's lifespan startup has completed and the sockets
+are being served, then closes it. The runner blocks on the other end of
+the pipe instead of polling; if the child dies first, the runner sees EOF.
+
+Sockets given with ``--standby-fd`` are not served at startup: the child
+waits for ``GO_MESSAGE`` on the ``--go-fd`` pipe (sent once the runner has
+health-checked it), starts accepting on them, and only then writes
+``LIVE_MESSAGE`` and closes the readiness pipe. EOF on the go pipe means
+the runner rejected this generation; the standby sockets stay untouched.
+
+Usage:
+    python serve.py generated_api:app --app-dir . --fd 5 --fd 6 --ready-fd 7
+    python serve.py generated_api:app --fd 6 --standby-fd 5 --ready-fd 7 --go-fd 8
+"""
+
+import os
+import sys
+import socket
+import asyncio
+import argparse
+from typing import List, Optional
+
+import uvicorn
+
+# Time between closing the listeners and closing idle connections on shutdown,
+# so connections accepted just before the signal still get their request served
+ACCEPT_GRACE_SECONDS = 0.25
+
+# Written to the readiness pipe once the app is serving
+READY_MESSAGE = b"ready\n"
+
+# Read from the go pipe to start serving the standby sockets
+GO_MESSAGE = b"go\n"
+
+# Written to the readiness pipe once the standby sockets are being served
+LIVE_MESSAGE = b"live\n"
+
+
+class _DrainingServer(uvicorn.Server):
+    """
+    uvicorn server that reports readiness over a pipe, serves its standby
+    sockets only when told to, and stops accepting before it starts
+    closing connections.
+    """
+
+    def __init__(self, config: uvicorn.Config, ready_fd: Optional[int] = None,
+                 go_fd: Optional[int] = None, standby: Optional[List[socket.socket]] = None):
+        super().__init__(config)
+        self.ready_fd = ready_fd
+        self.go_fd = go_fd
+        self.standby = standby or []
+        self._go_task: Optional[asyncio.Task] = None
+
+    async def startup(self, sockets: Optional[List[socket.socket]] = None) -> None:
+        try:
+            await super().startup(sockets=sockets)
+        finally:
+            if self.ready_fd is not None:
+                # Kept open to report going live on the standby sockets
+                self._signal(READY_MESSAGE if self.started else None,
+                             keep_open=self.started and bool(self.standby))
+        if self.started and self.standby:
+            asyncio.get_running_loop().add_reader(self.go_fd, self._on_go)
+
+    def _signal(self, message: Optional[bytes], keep_open: bool = False) -> None:
+        # Closing the pipe without a message tells the runner to stop
+        # waiting right away (failed startup, or standby sockets not served)
+        try:
+            if message is not None:
+                os.write(self.ready_fd, message)
+        except OSError:
+            pass
+        finally:
+            if not keep_open:
+                os.close(self.ready_fd)
+                self.ready_fd = None
+
+    def _on_go(self) -> None:
+        loop = asyncio.get_running_loop()
+        loop.remove_reader(self.go_fd)
+        try:
+            message = os.read(self.go_fd, 64)
+        except OSError:
+            message = b""
+        os.close(self.go_fd)
+        self.go_fd = None
+        if message == GO_MESSAGE:
+            self._go_task = loop.create_task(self._serve_standby())
+        elif self.ready_fd is not None:
+            self._signal(None)
+
+    async def _serve_standby(self) -> None:
+        """Start accepting on the standby sockets, as uvicorn's startup does for the others."""
+        config = self.config
+        loop = asyncio.get_running_loop()
+
+        def create_protocol(_loop: Optional[asyncio.AbstractEventLoop] = None) -> asyncio.Protocol:
+            return config.http_protocol_class(
+                config=config,
+                server_state=self.server_state,
+                app_state=self.lifespan.state,
+                _loop=_loop
+            )
+
+        try:
+            for sock in self.standby:
+                self.servers.append(await loop.create_server(
+                    create_protocol, sock=sock, ssl=config.ssl, backlog=config.backlog
+                ))
+        except OSError:
+            self._signal(None)
+            return
+        self._signal(LIVE_MESSAGE)
+
+    async def shutdown(self, sockets: Optional[List[socket.socket]] = None) -> None:
+        for server in getattr(self, "servers", []):
+            server.close()
+        await asyncio.sleep(ACCEPT_GRACE_SECONDS)
+        await super().shutdown(sockets=sockets)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Serve an app on inherited sockets.
+
+    Args:
+        argv: Command line arguments (defaults to ``sys.argv[1:]``)
+
+    Returns:
+        Process exit code
+    """
+    parser = argparse.ArgumentParser(description="Serve an ASGI app on inherited sockets")
+    parser.add_argument("app", help="App import string, e.g. generated_api:app")
+    parser.add_argument("--app-dir", default=".", help="Directory to import the app from")
+    parser.add_argument("--fd", type=int, action="append", default=[],
+                        help="Inherited listening socket file descriptor (repeatable)")
+    parser.add_argument("--log-level", default="info")
+    parser.add_argument("--timeout-graceful-shutdown", type=int, default=None,
+                        help="Seconds to let in-flight requests finish on shutdown")
+    parser.add_argument("--ready-fd", type=int, default=None,
+                        help="Inherited pipe file descriptor to signal readiness on")
+    parser.add_argument("--standby-fd", type=int, action="append", default=[],
+                        help="Inherited listening socket served only after --go-fd says go (repeatable)")
+    parser.add_argument("--go-fd", type=int, default=None,
+                        help="Inherited pipe file descriptor to read the go signal from")
+    args = parser.parse_args(argv)
+
+    if not args.fd:
+        parser.error("at least one --fd is required")
+    if args.standby_fd and (args.go_fd is None or args.ready_fd is None):
+        parser.error("--standby-fd requires --go-fd and --ready-fd")
+
+    sockets = [socket.socket(fileno=fd) for fd in args.fd]
+    standby = [socket.socket(fileno=fd) for fd in args.standby_fd]
+    sys.path.insert(0, args.app_dir)
+
+    config = uvicorn.Config(
+        args.app,
+        log_level=args.log_level,
+        timeout_graceful_shutdown=args.timeout_graceful_shutdown
+    )
+    server = _DrainingServer(config, ready_fd=args.ready_fd, go_fd=args.go_fd, standby=standby)
+    server.run(sockets=sockets)
+
+    return 0 if server.started else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
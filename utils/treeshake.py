@@ -0,0 +1,362 @@
+"""
+User Code Tree Shaker
+====================
+
+Reduce an uploaded module to what its exposed functions need before it is
+inlined into a generated app, so reloading the app doesn't redo the
+module's unrelated work.
+
+Top-level statements are sorted into three groups:
+
+* kept: the exposed functions and the functions, classes, imports and
+  constants they reference, transitively, plus whatever those need while
+  the module is being imported (decorators, defaults, annotations, class
+  bodies, constant expressions)
+* deferred: computations (assignments that call something, and bare
+  statements such as ``assert factorial(3) == 6`` or ``print(...)``) that
+  nothing needs at import time. They move into ``_user_module_init()``,
+  which the generated app runs once before the first call.
+* removed: definitions nothing references, the module docstring and
+  ``if __name__ == "__main__":`` blocks (which never run in a generated app)
+
+Modules that look names up dynamically (``globals()``, ``eval``, ...) are
+left as they are.
+"""
+
+import ast
+import hashlib
+import textwrap
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+# Builtins through which code can reach module globals by name
+DYNAMIC_NAMES = frozenset({"globals", "locals", "vars", "eval", "exec", "__import__"})
+
+# Name of the function holding deferred statements in the emitted source
+INIT_FUNCTION = "_user_module_init"
+
+_SCOPES = (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef, ast.Lambda)
+_DEFINITIONS = (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)
+_COMPREHENSIONS = (ast.ListComp, ast.SetComp, ast.DictComp, ast.GeneratorExp)
+_COMPUTATIONS = _COMPREHENSIONS + (ast.Call, ast.Await)
+
+
+def shake_module_source(source: str, exposed: Iterable[str],
+                        include_effects: bool = True) -> Tuple[str, Dict[str, Any]]:
+    """
+    Tree-shake module source down to what exposed functions need.
+
+    Args:
+        source: Python source of the uploaded module
+        exposed: Names of the functions the generated app calls
+        include_effects: Keep (deferred) the statements run for their
+            effects; without them only ``exposed`` and what it references
+            remain
+
+    Returns:
+        Tuple of (source to inline, report). The source defines
+        ``_user_module_init`` when statements were deferred. The report has
+        ``shaken`` (False if the module was left as is, with ``reason``),
+        the names ``kept``, ``deferred`` and ``removed``, and the number of
+        ``deferred_statements`` and ``removed_statements``.
+    """
+    return ModuleShaker(source).shake(exposed, include_effects)
+
+
+class ModuleShaker:
+    """
+    Dependency analysis of one module, shared by every shake and fingerprint
+    taken of it (e.g. one per generated function).
+    """
+
+    def __init__(self, source: str):
+        """
+        Parse a module and index which statements bind and read which names.
+
+        Args:
+            source: Python source of the module
+        """
+        self.source = source
+        self.reason: Optional[str] = None
+        self.body: List[ast.stmt] = []
+        self._dumps: Dict[int, bytes] = {}
+        try:
+            tree = ast.parse(source)
+        except SyntaxError as e:
+            self.reason = f"syntax error: {e}"
+            return
+
+        dynamic = sorted({node.id for node in ast.walk(tree)
+                          if isinstance(node, ast.Name) and node.id in DYNAMIC_NAMES})
+        if dynamic:
+            self.reason = f"uses {', '.join(dynamic)}"
+            return
+
+        body = self.body = tree.body
+        future_annotations = any(
+            isinstance(stmt, ast.ImportFrom) and stmt.module == "__future__"
+            and any(alias.name == "annotations" for alias in stmt.names)
+            for stmt in body
+        )
+        self.binds = [_bound_names(stmt) for stmt in body]
+        self.refs = [_loaded_names(stmt) for stmt in body]
+        self.import_refs = [_import_time_names(stmt, future_annotations) for stmt in body]
+
+        self.binders: Dict[str, List[int]] = {}
+        for index, names in enumerate(self.binds):
+            for name in names:
+                self.binders.setdefault(name, []).append(index)
+
+        self.removable = [_is_removable(stmt, index) for index, stmt in enumerate(body)]
+        self.pinned = [i for i, stmt in enumerate(body) if not self.removable[i] and _is_pinned(stmt)]
+        self.effects = [i for i, stmt in enumerate(body)
+                        if not self.removable[i] and not _is_pinned(stmt) and not _is_definition(stmt)]
+
+    @property
+    def shakeable(self) -> bool:
+        """False if the module must be left as is (see ``reason``)."""
+        return self.reason is None
+
+    def shake(self, exposed: Iterable[str], include_effects: bool = True,
+              init_function: str = INIT_FUNCTION) -> Tuple[str, Dict[str, Any]]:
+        """
+        Tree-shake the module down to what exposed functions need.
+
+        Args:
+            exposed: Names of the functions the generated app calls
+            include_effects: Keep (deferred) the statements run for their effects
+            init_function: Name of the function holding deferred statements
+
+        Returns:
+            See ``shake_module_source``
+        """
+        if not self.shakeable:
+            return self.source, _unshaken(self.reason)
+
+        body, binds, binders = self.body, self.binds, self.binders
+        needed = self._needed(exposed, include_effects)
+
+        # Defer computations unless something evaluated at import time needs them
+        deferred = {index for index in needed if _is_deferrable(body[index], binds[index])}
+        changed = True
+        while changed:
+            changed = False
+            for index in sorted(needed - deferred):
+                for name in self.import_refs[index]:
+                    for binder in binders.get(name, []):
+                        if binder in deferred and binder < index:
+                            deferred.discard(binder)
+                            changed = True
+            for index in sorted(deferred):
+                # A deferred statement must neither see values bound later at
+                # import time nor overwrite them after the import
+                if any(binder > index and binder in needed and binder not in deferred
+                       for name in self.import_refs[index] | binds[index] for binder in binders.get(name, [])):
+                    deferred.discard(index)
+                    changed = True
+
+        eager = sorted(needed - deferred)
+        emitted = _emit(self.source, body, eager, sorted(deferred), binds, init_function)
+
+        kept_names = {name for index in eager for name in binds[index]}
+        deferred_names = {name for index in deferred for name in binds[index]} - kept_names
+        removed = [index for index in range(len(body)) if index not in needed]
+        return emitted, {
+            "shaken": True,
+            "reason": None,
+            "kept": sorted(kept_names),
+            "deferred": sorted(deferred_names),
+            "removed": sorted({name for index in removed for name in binds[index]} - kept_names - deferred_names),
+            "deferred_statements": len(deferred),
+            "removed_statements": len(removed)
+        }
+
+    def fingerprint(self, exposed: Iterable[str], include_effects: bool = False) -> str:
+        """
+        Hash the statements exposed functions depend on.
+
+        Formatting, comments and unrelated statements don't change it, so
+        equal fingerprints across two versions of a module mean the exposed
+        functions behave the same. Modules that can't be shaken hash whole.
+
+        Args:
+            exposed: Names of the functions to fingerprint
+            include_effects: Also hash the statements run for their effects
+
+        Returns:
+            Hex SHA-256 digest
+        """
+        digest = hashlib.sha256()
+        if not self.shakeable:
+            digest.update(self.source.encode("utf-8"))
+            return digest.hexdigest()
+        for index in sorted(self._needed(exposed, include_effects)):
+            if index not in self._dumps:
+                self._dumps[index] = ast.dump(self.body[index]).encode("utf-8")
+            digest.update(self._dumps[index])
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def _needed(self, exposed: Iterable[str], include_effects: bool) -> Set[int]:
+        """Indexes of the statements to keep for ``exposed``."""
+        binders = self.binders
+
+        # Statements that always stay, and statements run for their effects
+        needed: Set[int] = set(self.pinned)
+        if include_effects:
+            needed.update(self.effects)
+
+        # Everything those and the exposed functions reference, transitively
+        pending = list(needed) + [i for name in exposed for i in binders.get(name, [])]
+        while pending:
+            index = pending.pop()
+            needed.add(index)
+            for name in self.refs[index]:
+                for binder in binders.get(name, []):
+                    if binder not in needed and not self.removable[binder]:
+                        needed.add(binder)
+                        pending.append(binder)
+        return needed
+
+
+def _unshaken(reason: str) -> Dict[str, Any]:
+    return {"shaken": False, "reason": reason, "kept": [], "deferred": [], "removed": [],
+            "deferred_statements": 0, "removed_statements": 0}
+
+
+def _is_removable(stmt: ast.stmt, index: int) -> bool:
+    """Module docstrings and ``if __name__ == "__main__":`` blocks."""
+    if index == 0 and isinstance(stmt, ast.Expr) and isinstance(stmt.value, ast.Constant) \
+            and isinstance(stmt.value.value, str):
+        return True
+    if isinstance(stmt, ast.If) and isinstance(stmt.test, ast.Compare):
+        test = stmt.test
+        operands = [test.left] + test.comparators
+        return (len(test.ops) == 1 and isinstance(test.ops[0], ast.Eq)
+                and any(isinstance(op, ast.Name) and op.id == "__name__" for op in operands)
+                and any(isinstance(op, ast.Constant) and op.value == "__main__" for op in operands))
+    return False
+
+
+def _is_pinned(stmt: ast.stmt) -> bool:
+    """Statements kept whatever they bind: ``__future__`` and star imports."""
+    if isinstance(stmt, ast.ImportFrom):
+        return stmt.module == "__future__" or any(alias.name == "*" for alias in stmt.names)
+    return False
+
+
+def _is_definition(stmt: ast.stmt) -> bool:
+    """
+    Statements that only bind names: definitions, imports, assignments, and
+    ``if``/``try`` blocks made of those (e.g. optional imports).
+    """
+    if isinstance(stmt, _DEFINITIONS + (ast.Import, ast.ImportFrom, ast.Assign, ast.AnnAssign,
+                                        ast.AugAssign, ast.Pass)):
+        return True
+    if isinstance(stmt, ast.If):
+        return all(_is_definition(child) for child in stmt.body + stmt.orelse)
+    if isinstance(stmt, ast.Try):
+        blocks = stmt.body + stmt.orelse + stmt.finalbody
+        blocks += [child for handler in stmt.handlers for child in handler.body]
+        return all(_is_definition(child) for child in blocks)
+    return False
+
+
+def _is_deferrable(stmt: ast.stmt, binds: Set[str]) -> bool:
+    """Statements run for their effects, and assignments whose value computes something."""
+    if not _is_definition(stmt):
+        return not _is_pinned(stmt)
+    if isinstance(stmt, (ast.Assign, ast.AnnAssign, ast.AugAssign)) and stmt.value is not None:
+        return any(isinstance(node, _COMPUTATIONS) for node in _walk_scope(stmt.value))
+    return False
+
+
+def _walk_scope(node: ast.AST, include_scopes: bool = False, scopes: Tuple[type, ...] = _SCOPES):
+    """
+    Walk a node without entering nested function, class or lambda bodies.
+
+    With ``include_scopes`` the nested scope nodes themselves are yielded.
+    """
+    yield node
+    for child in ast.iter_child_nodes(node):
+        if isinstance(child, scopes):
+            if include_scopes:
+                yield child
+            continue
+        yield from _walk_scope(child, include_scopes, scopes)
+
+
+def _bound_names(stmt: ast.stmt) -> Set[str]:
+    """Module-level names a top-level statement binds."""
+    if isinstance(stmt, _DEFINITIONS):
+        return {stmt.name}
+    names = set()
+    # Comprehension variables are local to the comprehension
+    for node in _walk_scope(stmt, include_scopes=True, scopes=_SCOPES + _COMPREHENSIONS):
+        if isinstance(node, _DEFINITIONS):
+            names.add(node.name)
+        elif isinstance(node, ast.Name) and isinstance(node.ctx, (ast.Store, ast.Del)):
+            names.add(node.id)
+        elif isinstance(node, (ast.Import, ast.ImportFrom)):
+            for alias in node.names:
+                if alias.name != "*":
+                    names.add(alias.asname or alias.name.split(".")[0])
+        elif isinstance(node, ast.ExceptHandler) and node.name:
+            names.add(node.name)
+    return names
+
+
+def _loaded_names(stmt: ast.stmt) -> Set[str]:
+    """Every name a statement reads, including inside function bodies."""
+    return {node.id for node in ast.walk(stmt) if isinstance(node, ast.Name) and isinstance(node.ctx, ast.Load)}
+
+
+def _import_time_names(stmt: ast.stmt, future_annotations: bool) -> Set[str]:
+    """Names a statement reads while the module is being imported."""
+    if isinstance(stmt, (ast.FunctionDef, ast.AsyncFunctionDef)):
+        nodes = list(stmt.decorator_list) + list(stmt.args.defaults) + [d for d in stmt.args.kw_defaults if d]
+        if not future_annotations:
+            arguments = stmt.args.posonlyargs + stmt.args.args + stmt.args.kwonlyargs
+            arguments += [arg for arg in (stmt.args.vararg, stmt.args.kwarg) if arg]
+            nodes += [arg.annotation for arg in arguments if arg.annotation]
+            if stmt.returns:
+                nodes.append(stmt.returns)
+        return {name for node in nodes for name in _names_in_scope(node)}
+    if isinstance(stmt, ast.ClassDef):
+        names = set()
+        for node in stmt.decorator_list + stmt.bases + [keyword.value for keyword in stmt.keywords]:
+            names |= _names_in_scope(node)
+        for child in stmt.body:
+            names |= _import_time_names(child, future_annotations)
+        return names
+    return _names_in_scope(stmt)
+
+
+def _names_in_scope(node: ast.AST) -> Set[str]:
+    return {child.id for child in _walk_scope(node) if isinstance(child, ast.Name) and isinstance(child.ctx, ast.Load)}
+
+
+def _emit(source: str, body: List[ast.stmt], eager: List[int], deferred: List[int],
+          binds: List[Set[str]], init_function: str = INIT_FUNCTION) -> str:
+    """Render the kept statements, then the deferred ones inside the init function."""
+    lines = source.splitlines()
+    starts = [min([stmt.lineno] + [d.lineno for d in getattr(stmt, "decorator_list", [])]) for stmt in body]
+    # Statements sharing a line (a; b) can't be cut out by line
+    shared = any(starts[i + 1] <= body[i].end_lineno for i in range(len(body) - 1))
+
+    parts = []
+    for index in eager:
+        if shared:
+            parts.append(ast.unparse(body[index]))
+        else:
+            parts.append("\n".join(lines[starts[index] - 1:body[index].end_lineno]))
+
+    if deferred:
+        globals_ = sorted({name for index in deferred for name in binds[index]})
+        init = [f"def {init_function}():"]
+        if globals_:
+            init.append(f"    global {', '.join(globals_)}")
+        for index in deferred:
+            init.append(textwrap.indent(ast.unparse(body[index]), "    "))
+        parts.append("\n".join(init))
+
+    return "\n\n".join(parts) + "\n"
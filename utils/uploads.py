@@ -0,0 +1,315 @@
+"""
+Upload Store
+===========
+
+Content-addressed store of uploaded source files.
+
+Uploads are consumed in a single pass: each chunk is hashed, counted
+against the size limit, decoded as UTF-8 (for source files) and spooled to
+a temporary file as it arrives, so oversized or non-UTF-8 uploads are
+rejected after the offending chunk rather than after the whole body was
+buffered. Committed uploads are renamed to their SHA-256 digest; identical
+uploads share one file.
+
+Layout::
+
+    <root>/<digest[:2]>/<digest><suffix>   uploaded file (e.g. .py, .zip)
+    <root>/tmp/                       uploads still being received
+"""
+
+import os
+import codecs
+import hashlib
+import logging
+import tempfile
+import threading
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, Optional, Sequence
+
+# python-multipart renamed its import package in 0.0.13
+try:
+    import python_multipart as multipart
+except ImportError:
+    import multipart
+
+logger = logging.getLogger(__name__)
+
+
+class UploadRejectedError(ValueError):
+    """Raised when an upload is refused; ``status_code`` is the HTTP status to answer with."""
+
+    status_code = 400
+
+
+class UploadTooLargeError(UploadRejectedError):
+    """Raised as soon as an upload passes the size limit."""
+
+    status_code = 413
+
+
+class UploadEncodingError(UploadRejectedError):
+    """Raised as soon as an upload turns out not to be UTF-8."""
+
+
+class UploadWriter:
+    """
+    Single-pass sink for one upload, created by ``UploadStore.open``.
+
+    Feed it with ``write``, then ``commit`` to store the upload or
+    ``abort`` to discard it. Rejections abort automatically.
+    """
+
+    def __init__(self, store: "UploadStore", max_bytes: int, suffix: str = ".py", text: bool = True):
+        self.store = store
+        self.max_bytes = max_bytes
+        self.suffix = suffix
+        self.size = 0
+        self._digest = hashlib.sha256()
+        self._decoder = codecs.getincrementaldecoder("utf-8")() if text else None
+        self._text = []
+        fd, tmp_name = tempfile.mkstemp(suffix=".part", dir=store.tmp_dir)
+        self._tmp_path = Path(tmp_name)
+        self._file = os.fdopen(fd, "wb")
+
+    def write(self, chunk: bytes) -> None:
+        """
+        Take the next chunk of the upload.
+
+        Raises:
+            UploadTooLargeError: If the upload now exceeds the size limit
+            UploadEncodingError: If a text upload's chunk is not valid UTF-8
+        """
+        self.size += len(chunk)
+        if self.size > self.max_bytes:
+            self.abort()
+            self.store._count_rejection()
+            raise UploadTooLargeError(f"Upload exceeds {self.max_bytes} bytes")
+        try:
+            if self._decoder is not None:
+                self._text.append(self._decoder.decode(chunk))
+        except UnicodeDecodeError as e:
+            self.abort()
+            self.store._count_rejection()
+            raise UploadEncodingError(f"Upload is not UTF-8 text (byte {self.size - len(chunk) + e.start})") from None
+        self._digest.update(chunk)
+        self._file.write(chunk)
+
+    def commit(self) -> Dict[str, Any]:
+        """
+        Store the upload under its digest.
+
+        Returns:
+            Dictionary with ``digest``, ``path``, ``size``, the decoded
+            ``source`` (None for binary uploads) and whether an identical
+            upload was already stored (``deduplicated``)
+
+        Raises:
+            UploadEncodingError: If the upload ends inside a UTF-8 sequence
+        """
+        try:
+            if self._decoder is not None:
+                self._text.append(self._decoder.decode(b"", final=True))
+        except UnicodeDecodeError:
+            self.abort()
+            self.store._count_rejection()
+            raise UploadEncodingError("Upload is not UTF-8 text (truncated at the end)") from None
+        self._file.close()
+
+        digest = self._digest.hexdigest()
+        path = self.store.path_for(digest, self.suffix)
+        deduplicated = path.exists()
+        if deduplicated:
+            self._tmp_path.unlink(missing_ok=True)
+        else:
+            path.parent.mkdir(exist_ok=True)
+            os.replace(self._tmp_path, path)
+        self.store._count_commit(self.size, deduplicated)
+        logger.debug(f"Stored upload {digest[:12]} ({self.size} bytes{', deduplicated' if deduplicated else ''})")
+
+        return {
+            "digest": digest,
+            "path": path,
+            "size": self.size,
+            "source": "".join(self._text) if self._decoder is not None else None,
+            "deduplicated": deduplicated
+        }
+
+    def abort(self) -> None:
+        """Discard the upload."""
+        if not self._file.closed:
+            self._file.close()
+        self._tmp_path.unlink(missing_ok=True)
+
+
+class UploadStore:
+    """
+    Content-addressed store of uploaded source files.
+    """
+
+    def __init__(self, root_dir: Path, max_bytes: int = 10 * 1024 * 1024,
+                 text_suffixes: Sequence[str] = (".py",)):
+        """
+        Initialize the upload store.
+
+        Args:
+            root_dir: Directory holding the stored uploads
+            max_bytes: Largest accepted upload
+            text_suffixes: Suffixes of uploads that must be UTF-8 text
+        """
+        self.root_dir = Path(root_dir)
+        self.tmp_dir = self.root_dir / "tmp"
+        self.tmp_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.text_suffixes = tuple(text_suffixes)
+        self._lock = threading.Lock()
+        self.stored = 0
+        self.deduplicated = 0
+        self.rejected = 0
+        self.bytes_received = 0
+
+    def open(self, suffix: str = ".py") -> UploadWriter:
+        """Start receiving an upload stored with a file suffix."""
+        return UploadWriter(self, self.max_bytes, suffix, text=suffix in self.text_suffixes)
+
+    def put(self, content: bytes, suffix: str = ".py") -> Dict[str, Any]:
+        """
+        Store an upload that is already in memory.
+
+        Args:
+            content: Uploaded bytes
+            suffix: File suffix to store it with
+
+        Returns:
+            See ``UploadWriter.commit``
+        """
+        writer = self.open(suffix)
+        writer.write(content)
+        return writer.commit()
+
+    def path_for(self, digest: str, suffix: str = ".py") -> Path:
+        """Where the upload with a digest and suffix is stored."""
+        return self.root_dir / digest[:2] / f"{digest}{suffix}"
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get store statistics.
+
+        Returns:
+            Dictionary of upload counters and the size limit
+        """
+        with self._lock:
+            return {
+                "stored": self.stored,
+                "deduplicated": self.deduplicated,
+                "rejected": self.rejected,
+                "bytes_received": self.bytes_received,
+                "max_bytes": self.max_bytes
+            }
+
+    def _count_commit(self, size: int, deduplicated: bool) -> None:
+        with self._lock:
+            self.bytes_received += size
+            if deduplicated:
+                self.deduplicated += 1
+            else:
+                self.stored += 1
+
+    def _count_rejection(self) -> None:
+        with self._lock:
+            self.rejected += 1
+
+
+async def receive_multipart_upload(stream: AsyncIterator[bytes], content_type: str,
+                                   store: UploadStore, field: str = "file",
+                                   suffixes: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+    """
+    Stream one file field of a ``multipart/form-data`` body into the store.
+
+    Unlike parsing the form first, the file is never held in memory or
+    written twice, and rejections happen while the body is still arriving.
+
+    Args:
+        stream: Request body chunks (e.g. ``request.stream()``)
+        content_type: The request's Content-Type header
+        store: Store to spool the file into
+        field: Form field holding the file
+        suffixes: Accepted file name suffixes (e.g. ``.py``), checked
+            before any of the file is read; the file is stored with the one
+            it matched
+
+    Returns:
+        The stored upload (see ``UploadWriter.commit``) plus its ``filename``
+
+    Raises:
+        UploadRejectedError: If the body is not multipart, has no such
+            field, the file name has none of ``suffixes``, or the file is too large
+            or not UTF-8
+    """
+    media_type, params = multipart.multipart.parse_options_header(content_type)
+    boundary = params.get(b"boundary")
+    if media_type != b"multipart/form-data" or not boundary:
+        raise UploadRejectedError("Expected a multipart/form-data body")
+
+    state: Dict[str, Any] = {"header_field": b"", "header_value": b"", "headers": {},
+                             "writer": None, "filename": None, "upload": None}
+
+    def on_part_begin():
+        state["headers"] = {}
+
+    def on_header_field(data, start, end):
+        state["header_field"] += data[start:end]
+
+    def on_header_value(data, start, end):
+        state["header_value"] += data[start:end]
+
+    def on_header_end():
+        state["headers"][state["header_field"].lower()] = state["header_value"]
+        state["header_field"] = state["header_value"] = b""
+
+    def on_headers_finished():
+        _, options = multipart.multipart.parse_options_header(state["headers"].get(b"content-disposition", b""))
+        if options.get(b"name") == field.encode() and state["upload"] is None and state["writer"] is None:
+            filename = options.get(b"filename", b"").decode("utf-8", "replace")
+            suffix = ".py"
+            if suffixes:
+                matches = [suffix for suffix in suffixes if filename.lower().endswith(suffix)]
+                if not matches:
+                    raise UploadRejectedError(f"Only {', '.join(suffixes)} files are accepted")
+                suffix = max(matches, key=len)
+            state["filename"] = filename
+            state["writer"] = store.open(suffix)
+
+    def on_part_data(data, start, end):
+        if state["writer"] is not None:
+            state["writer"].write(data[start:end])
+
+    def on_part_end():
+        if state["writer"] is not None:
+            state["upload"] = state["writer"].commit()
+            state["writer"] = None
+
+    parser = multipart.MultipartParser(boundary, {
+        "on_part_begin": on_part_begin,
+        "on_header_field": on_header_field,
+        "on_header_value": on_header_value,
+        "on_header_end": on_header_end,
+        "on_headers_finished": on_headers_finished,
+        "on_part_data": on_part_data,
+        "on_part_end": on_part_end
+    })
+
+    try:
+        async for chunk in stream:
+            parser.write(chunk)
+        parser.finalize()
+    except UploadRejectedError:
+        raise
+    except Exception as e:
+        raise UploadRejectedError(f"Malformed multipart body: {e}") from None
+    finally:
+        if state["writer"] is not None:
+            state["writer"].abort()
+
+    if state["upload"] is None:
+        raise UploadRejectedError(f"Missing form field: {field}")
+    return dict(state["upload"], filename=state["filename"])
@@ -0,0 +1,132 @@
+"""
+Worker Pool
+==========
+
+Bounded thread pool for blocking work started from async handlers, such as
+the parse -> generate -> deploy pipeline of uploads.
+
+At most ``max_workers`` jobs run at once and at most ``max_queue`` more wait
+for a worker; further submissions are rejected immediately instead of piling
+up behind a large upload while the event loop keeps serving other requests.
+"""
+
+import time
+import asyncio
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class WorkerPoolFullError(RuntimeError):
+    """Raised when every worker is busy and the wait queue is full."""
+
+
+class WorkerPool:
+    """
+    Thread pool with a concurrency limit and a bounded wait queue.
+
+    Jobs are run with ``await pool.run(func, *args)``, which also reports
+    how long the job waited for a worker.
+    """
+
+    def __init__(self, max_workers: int = 2, max_queue: int = 16, name: str = "worker"):
+        """
+        Initialize the pool.
+
+        Args:
+            max_workers: Jobs that run concurrently
+            max_queue: Jobs that may wait for a worker before new ones are rejected
+            name: Thread name prefix
+        """
+        self.max_workers = max(1, max_workers)
+        self.max_queue = max(0, max_queue)
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix=name)
+        self._lock = threading.Lock()
+        self._active = 0
+        self._queued = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+
+    async def run(self, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Tuple[Any, float]:
+        """
+        Run a blocking function on a worker thread.
+
+        Args:
+            func: Function to call
+            *args: Positional arguments for ``func``
+            **kwargs: Keyword arguments for ``func``
+
+        Returns:
+            Tuple of (the function's result, milliseconds spent waiting for a worker)
+
+        Raises:
+            WorkerPoolFullError: If the pool is saturated and its queue is full
+        """
+        with self._lock:
+            if self._active + self._queued >= self.max_workers + self.max_queue:
+                self.rejected += 1
+                raise WorkerPoolFullError(
+                    f"All {self.max_workers} workers are busy and {self._queued} jobs are queued"
+                )
+            self._queued += 1
+
+        submitted_at = time.perf_counter()
+        # Whether a worker took the job, or the caller gave up on it first
+        state = {"started": False, "abandoned": False, "waited_ms": 0.0}
+
+        def job():
+            with self._lock:
+                if state["abandoned"]:
+                    return None
+                state["started"] = True
+                self._queued -= 1
+                self._active += 1
+            state["waited_ms"] = (time.perf_counter() - submitted_at) * 1000
+            try:
+                return func(*args, **kwargs)
+            finally:
+                with self._lock:
+                    self._active -= 1
+
+        loop = asyncio.get_running_loop()
+        try:
+            result = await loop.run_in_executor(self._executor, job)
+        except BaseException:
+            with self._lock:
+                if not state["started"]:
+                    # Cancelled or shut down before a worker picked it up
+                    state["abandoned"] = True
+                    self._queued -= 1
+                self.failed += 1
+            raise
+
+        with self._lock:
+            self.completed += 1
+        return result, round(state["waited_ms"], 3)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get pool statistics.
+
+        Returns:
+            Dictionary with limits, current load and job counters
+        """
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "active": self._active,
+                "queued": self._queued,
+                "completed": self.completed,
+                "failed": self.failed,
+                "rejected": self.rejected
+            }
+
+    def shutdown(self) -> None:
+        """Stop accepting jobs; running jobs finish in the background."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        logger.info("Worker pool shut down")